@@ -0,0 +1,47 @@
+import bm
+
+from ddtrace.internal import core
+
+
+CUSTOM_EVENT_NAME = "CoreAPIScenario.event"
+
+
+class CoreAPIScenario(bm.Scenario):
+    listeners = bm.var(type=int)
+    other_listeners = bm.var(type=int)
+    context_with_data = bm.var_bool()
+    get_set = bm.var_bool()
+
+    def run(self):
+        # Listeners of other events, as registered by the enabled products
+        for i in range(self.other_listeners):
+            core.on("%s.%d" % (CUSTOM_EVENT_NAME, i), lambda *args: None)
+
+        for _ in range(self.listeners):
+            core.on(CUSTOM_EVENT_NAME, lambda *args: None)
+            core.on("context.started.%s" % CUSTOM_EVENT_NAME, lambda ctx: None)
+            core.on("context.ended.%s" % CUSTOM_EVENT_NAME, lambda ctx: None)
+
+        if self.context_with_data:
+
+            def _(loops):
+                for _ in range(loops):
+                    with core.context_with_data(CUSTOM_EVENT_NAME, key="value"):
+                        if self.get_set:
+                            core.set_item("other_key", "other_value")
+                            core.get_item("key")
+
+        elif self.get_set:
+
+            def _(loops):
+                for _ in range(loops):
+                    core.set_item("key", "value")
+                    core.get_item("key")
+
+        else:
+
+            def _(loops):
+                for _ in range(loops):
+                    core.dispatch(CUSTOM_EVENT_NAME, [5, "hello"])
+
+        yield _
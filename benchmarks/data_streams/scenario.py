@@ -0,0 +1,45 @@
+import time
+
+import bm
+
+from ddtrace import config
+from ddtrace.internal.datastreams.processor import DataStreamsProcessor
+
+
+class DataStreams(bm.Scenario):
+    high_throughput = bm.var_bool()
+    ntopics = bm.var(type=int)
+    batch_size = bm.var(type=int)
+    batched = bm.var_bool()
+
+    def run(self):
+        config._data_streams_high_throughput_enabled = self.high_throughput
+        processor = DataStreamsProcessor("http://localhost:8126")
+        # Do not flush the stats during the benchmark
+        processor.stop()
+
+        topics = [("topic:in-%d" % i, "topic:out-%d" % i) for i in range(self.ntopics)]
+        ntopics = self.ntopics
+        batched = self.batched
+        now = time.time()
+
+        # The pathway contexts of the messages received from an upstream service
+        upstream = processor.new_pathway(now_sec=now - 10)
+        upstream.set_checkpoint(["direction:out", "topic:upstream", "type:kafka"], now_sec=now - 5)
+        pathways = [upstream.encode()] * self.batch_size
+        payload_sizes = [100] * self.batch_size
+
+        def _(loops):
+            for i in range(loops):
+                # A consumer processing a batch of messages and producing the result to another topic
+                topic_in, topic_out = topics[i % ntopics]
+                tags = ["direction:in", topic_in, "type:kafka"]
+                if batched:
+                    ctx = processor.set_consume_checkpoints(tags, pathways, payload_sizes, now_sec=now)
+                else:
+                    for pathway in pathways:
+                        ctx = processor.decode_pathway(pathway)
+                        ctx.set_checkpoint(tags, now_sec=now, payload_size=100)
+                ctx.set_checkpoint(["direction:out", topic_out, "type:kafka"], now_sec=now)
+
+        yield _
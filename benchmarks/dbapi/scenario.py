@@ -0,0 +1,62 @@
+import bm
+import bm.utils as utils
+
+from ddtrace import config
+from ddtrace import tracer
+from ddtrace.filters import TraceFilter
+from ddtrace.internal.encoding import MSGPACK_ENCODERS
+
+
+QUERIES = [
+    "SELECT id, name, email, created_at FROM users WHERE id = {0} LIMIT 1",
+    "SELECT o.id, o.total, o.status FROM orders o JOIN users u ON u.id = o.user_id "
+    "WHERE u.email = 'user{0}@example.com' AND o.status IN ('paid', 'shipped') ORDER BY o.created_at DESC",
+    "UPDATE users SET last_login = '2023-10-{1:02d} 12:00:00', login_count = login_count + 1 WHERE id = {0}",
+    "INSERT INTO events (user_id, kind, payload) VALUES ({0}, 'click', '{{\"x\": {0}, \"y\": {1}}}')",
+    "SELECT p.id, p.name, p.price FROM products p WHERE p.category_id = {1} AND p.price BETWEEN {0}.5 AND 1e3",
+]
+
+
+class _Cursor(object):
+    rowcount = 1
+
+    def execute(self, query, *args, **kwargs):
+        return None
+
+
+class _EncodeTraces(TraceFilter):
+    def __init__(self, encoder):
+        self.encoder = encoder
+
+    def process_trace(self, trace):
+        self.encoder.put(trace)
+        return
+
+
+class DBAPI(bm.Scenario):
+    nqueries = bm.var(type=int)
+    nvalues = bm.var(type=int)
+    obfuscation = bm.var_bool()
+    encoding = bm.var(type=str)
+
+    def run(self):
+        from ddtrace import Pin
+        from ddtrace.contrib.dbapi import TracedCursor
+
+        config._sql_obfuscation_enabled = self.obfuscation
+        # Encode the traces as they would be sent to the agent instead of sending them
+        encoder = MSGPACK_ENCODERS[self.encoding](8 << 20, 8 << 20)
+        tracer.configure(settings={"FILTERS": [_EncodeTraces(encoder)]})
+        utils.drop_telemetry_events()
+
+        queries = [QUERIES[i % len(QUERIES)].format(i % self.nvalues, i % 28 + 1) for i in range(self.nqueries)]
+        cursor = TracedCursor(_Cursor(), Pin(service="db", tracer=tracer), None)
+
+        def _(loops):
+            for _ in range(loops):
+                with tracer.trace("request"):
+                    for query in queries:
+                        cursor.execute(query)
+                encoder.encode()
+
+        yield _
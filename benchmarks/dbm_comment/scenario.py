@@ -0,0 +1,32 @@
+import bm
+import bm.utils as utils
+
+from ddtrace import config
+from ddtrace import tracer
+from ddtrace.propagation._database_monitoring import _DBM_Propagator
+from ddtrace.settings._database_monitoring import dbm_config
+
+
+class DBMComment(bm.Scenario):
+    mode = bm.var(type=str)
+    nqueries = bm.var(type=int)
+    nservices = bm.var(type=int)
+
+    def run(self):
+        dbm_config.propagation_mode = self.mode
+        config.service = "orders-app"
+        config.env = "staging"
+        config.version = "v7343437-d7ac743"
+        utils.drop_traces(tracer)
+        utils.drop_telemetry_events()
+
+        propagator = _DBM_Propagator(0, "query")
+        spans = [tracer.trace("db.query", service="orders-db-%d" % i) for i in range(self.nservices)]
+        args, kwargs = ("SELECT * FROM orders WHERE id = %s",), {}
+
+        def _(loops):
+            for _ in range(loops):
+                for i in range(self.nqueries):
+                    propagator.inject(spans[i % self.nservices], args, kwargs)
+
+        yield _
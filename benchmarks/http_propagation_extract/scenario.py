@@ -2,6 +2,7 @@ import json
 
 import bm
 
+from ddtrace import config
 from ddtrace.propagation import _utils as utils
 from ddtrace.propagation import http
 
@@ -10,6 +11,8 @@ class HTTPPropagationExtract(bm.Scenario):
     headers = bm.var(type=str)
     extra_headers = bm.var(type=int)
     wsgi_style = bm.var(type=bool)
+    environ = bm.var_bool(default=False)
+    styles = bm.var(type=str, default=None)
 
     def generate_headers(self):
         headers = json.loads(self.headers)
@@ -22,9 +25,27 @@ class HTTPPropagationExtract(bm.Scenario):
                 header = utils.get_wsgi_header(header)
             headers[header] = str(i)
 
+        if self.environ:
+            # A WSGI environ, as with Django's request.META
+            headers.update(
+                {
+                    "wsgi.version": (1, 0),
+                    "wsgi.url_scheme": "http",
+                    "REQUEST_METHOD": "GET",
+                    "PATH_INFO": "/",
+                    "QUERY_STRING": "",
+                    "SERVER_NAME": "localhost",
+                    "SERVER_PORT": "8000",
+                    "SERVER_PROTOCOL": "HTTP/1.1",
+                    "REMOTE_ADDR": "127.0.0.1",
+                }
+            )
+
         return headers
 
     def run(self):
+        if self.styles:
+            config._propagation_style_extract = self.styles.split(",")
         headers = self.generate_headers()
 
         def _(loops):
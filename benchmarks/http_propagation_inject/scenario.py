@@ -4,12 +4,14 @@ import bm
 
 from ddtrace.context import Context
 from ddtrace.propagation import http
+from ddtrace.span import Span
 
 
 class HTTPPropagationInject(bm.Scenario):
     sampling_priority = bm.var(type=str)
     dd_origin = bm.var(type=str)
     meta = bm.var(type=str)
+    fanout = bm.var(type=int)
 
     def run(self):
         sampling_priority = None
@@ -29,9 +31,15 @@ class HTTPPropagationInject(bm.Scenario):
             meta=meta,
         )
 
+        # The contexts of the downstream calls made while handling a request
+        contexts = [
+            ctx._with_span(Span("child", trace_id=ctx.trace_id, span_id=ctx.span_id + i)) for i in range(self.fanout)
+        ]
+
         def _(loops):
             for _ in range(loops):
-                # Just pass in a new/empty dict, we don't care about the result
-                http.HTTPPropagator.inject(ctx, {})
+                for context in contexts:
+                    # Just pass in a new/empty dict, we don't care about the result
+                    http.HTTPPropagator.inject(context, {})
 
         yield _
@@ -0,0 +1,82 @@
+import random
+import threading
+import time
+
+import bm
+
+from ddtrace.profiling import event
+from ddtrace.profiling.collector import stack_event
+from ddtrace.profiling.exporter import http
+
+
+class _Exporter(http.PprofHTTPExporter):
+    # Serialize, compress and encode the profile like the HTTP exporter does, without sending it
+    def _upload(self, client, path, body, headers):
+        pass
+
+
+def _make_events(nevents, nframes):
+    rnd = random.Random(0)
+    return {
+        stack_event.StackSampleEvent: [
+            stack_event.StackSampleEvent(
+                thread_id=i % 16,
+                thread_name="thread-%d" % (i % 16),
+                frames=[
+                    event.DDFrame(
+                        "/app/module%d.py" % rnd.randrange(100), rnd.randrange(1000), "func%d" % rnd.randrange(300), ""
+                    )
+                    for _ in range(nframes)
+                ],
+                nframes=nframes,
+                wall_time_ns=10000000,
+                cpu_time_ns=1000000,
+                sampling_period=10000000,
+            )
+            for i in range(nevents)
+        ]
+    }
+
+
+class ProfilingExport(bm.Scenario):
+    nevents = bm.var(type=int)
+    nframes = bm.var(type=int)
+    # Measure how long an application thread waits for the GIL while profiles are being exported instead of the
+    # duration of an export
+    gil_probe = bm.var_bool()
+    nprobes = bm.var(type=int)
+
+    def run(self):
+        events = _make_events(self.nevents, self.nframes)
+        exporter = _Exporter(enable_code_provenance=False)
+
+        if not self.gil_probe:
+
+            def _(loops):
+                for _ in range(loops):
+                    exporter.export(events, 0, 60000000000)
+
+            yield _
+            return
+
+        stopped = threading.Event()
+
+        def export():
+            while not stopped.is_set():
+                exporter.export(events, 0, 60000000000)
+
+        exporting = threading.Thread(target=export, daemon=True)
+        exporting.start()
+        nprobes = self.nprobes
+
+        def _(loops):
+            for _ in range(loops):
+                for _ in range(nprobes):
+                    # Release the GIL and wait to get it back from the exporting thread
+                    time.sleep(0)
+
+        try:
+            yield _
+        finally:
+            stopped.set()
+            exporting.join()
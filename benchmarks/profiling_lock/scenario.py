@@ -0,0 +1,49 @@
+import queue
+import threading
+
+import bm
+
+from ddtrace.profiling import recorder
+from ddtrace.profiling.collector import threading as collector_threading
+
+
+class ProfilingLock(bm.Scenario):
+    profiled = bm.var_bool()
+    contention_only = bm.var_bool()
+    capture_pct = bm.var(type=float)
+    nthreads = bm.var(type=int)
+    nitems = bm.var(type=int)
+
+    def run(self):
+        if self.profiled:
+            collector = collector_threading.ThreadingLockCollector(
+                recorder.Recorder(), capture_pct=self.capture_pct, contention_only=self.contention_only
+            )
+            collector.start()
+
+        # queue.Queue is built on top of threading.Lock and is a common source of lock activity
+        q = queue.Queue()
+        nthreads = self.nthreads
+        nitems = self.nitems
+
+        def consume():
+            while q.get() is not None:
+                pass
+
+        def _(loops):
+            for _ in range(loops):
+                consumers = [threading.Thread(target=consume) for _ in range(nthreads)]
+                for consumer in consumers:
+                    consumer.start()
+                for i in range(nitems):
+                    q.put(i)
+                for _ in consumers:
+                    q.put(None)
+                for consumer in consumers:
+                    consumer.join()
+
+        try:
+            yield _
+        finally:
+            if self.profiled:
+                collector.stop()
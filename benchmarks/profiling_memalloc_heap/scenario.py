@@ -0,0 +1,26 @@
+import bm
+
+from ddtrace.profiling.collector import _memalloc
+
+
+class ProfilingMemallocHeap(bm.Scenario):
+    ntracked = bm.var(type=int)
+    nallocs = bm.var(type=int)
+
+    def run(self):
+        # Every allocation of 1KiB or more is tracked by the heap profiler, the small ones only once in a while
+        _memalloc.start(64, 1, 64)
+        tracked = [b"x" * 1024 + bytes([i & 0xFF]) for i in range(self.ntracked)]
+        nallocs = self.nallocs
+
+        def _(loops):
+            for _ in range(loops):
+                # Every free goes through the heap profiler, whether the freed memory is tracked or not
+                for _ in range(nallocs):
+                    object()
+
+        try:
+            yield _
+        finally:
+            del tracked
+            _memalloc.stop()
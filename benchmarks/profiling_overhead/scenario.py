@@ -0,0 +1,57 @@
+import threading
+
+import bm
+
+from ddtrace.profiling import recorder
+from ddtrace.profiling.collector import stack
+from ddtrace.profiling.exporter import pprof
+
+
+class _Worker(object):
+    def __init__(self, depth, started, stopped):
+        self.depth = depth
+        self.started = started
+        self.stopped = stopped
+
+    def run(self, depth=0):
+        if depth < self.depth:
+            return self.run(depth + 1)
+        self.started.release()
+        self.stopped.wait()
+
+
+class ProfilingOverhead(bm.Scenario):
+    nthreads = bm.var(type=int)
+    depth = bm.var(type=int)
+    nsamples = bm.var(type=int)
+
+    def run(self):
+        started = threading.Semaphore(0)
+        stopped = threading.Event()
+        workers = [
+            threading.Thread(target=_Worker(self.depth, started, stopped).run, daemon=True)
+            for _ in range(self.nthreads)
+        ]
+        for worker in workers:
+            worker.start()
+        for _ in workers:
+            started.acquire()
+
+        r = recorder.Recorder()
+        collector = stack.StackCollector(r)
+        collector._init()
+        exporter = pprof.PprofExporter(enable_code_provenance=False)
+        nsamples = self.nsamples
+
+        def _(loops):
+            for _ in range(loops):
+                # Sample the stacks of all the threads, then export them like the scheduler does
+                for _ in range(nsamples):
+                    for events in collector.collect():
+                        r.push_events(events)
+                exporter.export(r.reset(), 0, 60000000000)
+
+        try:
+            yield _
+        finally:
+            stopped.set()
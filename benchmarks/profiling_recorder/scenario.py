@@ -0,0 +1,44 @@
+import bm
+
+from ddtrace.profiling import recorder
+from ddtrace.profiling.collector import stack_event
+from ddtrace.profiling.exporter import pprof
+
+
+class ProfilingRecorder(bm.Scenario):
+    aggregate = bm.var_bool()
+    nstacks = bm.var(type=int)
+    nsamples = bm.var(type=int)
+
+    def run(self):
+        recorder_class = recorder.AggregatingRecorder if self.aggregate else recorder.Recorder
+        r = recorder_class(default_max_events=self.nsamples)
+        exporter = pprof.PprofExporter(enable_code_provenance=False)
+        stacks = [
+            [("module_%d.py" % (i % 10), 10 + j, "func_%d_%d" % (i, j), "") for j in range(20)]
+            for i in range(self.nstacks)
+        ]
+        nstacks = self.nstacks
+        nsamples = self.nsamples
+
+        def _(loops):
+            for _ in range(loops):
+                # The samples collected by the stack collector for 10 threads between two exports
+                for i in range(0, nsamples, 10):
+                    r.push_events(
+                        [
+                            stack_event.StackSampleEvent(
+                                thread_id=t,
+                                thread_name="Thread-%d" % t,
+                                frames=list(stacks[(i + t) % nstacks]),
+                                nframes=20,
+                                wall_time_ns=10000000,
+                                cpu_time_ns=1000000,
+                                sampling_period=10000000,
+                            )
+                            for t in range(10)
+                        ]
+                    )
+                exporter.export(r.reset(), 0, 60000000000)
+
+        yield _
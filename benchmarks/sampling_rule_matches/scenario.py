@@ -5,6 +5,7 @@ import string
 import bm
 
 from ddtrace import Span
+from ddtrace.internal.sampling import SamplingRuleIndex
 from ddtrace.sampling_rule import SamplingRule
 
 
@@ -29,6 +30,7 @@ class SamplingRules(bm.Scenario):
     num_operations = bm.var(type=int)
     num_resources = bm.var(type=int)
     num_tags = bm.var(type=int)
+    num_rules = bm.var(type=int)
 
     def run(self):
         # Generate random service and operation names for the counts we requested
@@ -38,24 +40,42 @@ class SamplingRules(bm.Scenario):
         tag_names = [rands() for _ in range(self.num_tags)]
 
         # Generate all possible permutations of service and operation names
-        spans = [
-            Span(service=service, name=name, resource=resource, tags={tag: tag})
-            for service, name, resource, tag in itertools.product(services, operation_names, resource_names, tag_names)
-        ]
+        spans = []
+        for service, name, resource, tag in itertools.product(services, operation_names, resource_names, tag_names):
+            span = Span(service=service, name=name, resource=resource)
+            span.set_tag(tag, tag)
+            spans.append(span)
 
         # Create a single rule to use for all matches
         # Pick a random service/operation name
+        tag = random.choice(tag_names)
         rule = SamplingRule(
             service=random.choice(services),
             name=random.choice(operation_names),
             resource=random.choice(resource_names),
-            tags=random.choice(tag_names),
+            tags={tag: tag},
             sample_rate=1.0,
         )
 
-        def _(loops):
-            for _ in range(loops):
-                for span in iter_n(spans, n=self.num_iterations):
-                    rule.matches(span)
+        if self.num_rules <= 1:
+
+            def _(loops):
+                for _ in range(loops):
+                    for span in iter_n(spans, n=self.num_iterations):
+                        rule.matches(span)
+
+        else:
+            # Evaluate the rule last, after rules for other services and
+            # operations, as a sampler configured with many rules would.
+            other_rules = [
+                SamplingRule(service=rands(), name=random.choice(operation_names), sample_rate=0.5)
+                for _ in range(self.num_rules - 1)
+            ]
+            index = SamplingRuleIndex(other_rules + [rule])
+
+            def _(loops):
+                for _ in range(loops):
+                    for span in iter_n(spans, n=self.num_iterations):
+                        index.match(span)
 
         yield _
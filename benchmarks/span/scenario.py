@@ -13,6 +13,8 @@ class Span(bm.Scenario):
     finishspan = bm.var_bool()
     traceid128 = bm.var_bool()
     telemetry = bm.var_bool()
+    keepspans = bm.var_bool()
+    metricsastags = bm.var_bool()
 
     def run(self):
         # run scenario to also set tags on spans
@@ -22,11 +24,18 @@ class Span(bm.Scenario):
         # run scenario to also set metrics on spans
         metrics = utils.gen_metrics(self)
         setmetrics = len(metrics) > 0
+        # run scenario to set numeric values with set_tag like most integrations do
+        if self.metricsastags:
+            tags.update(metrics)
+            settags, setmetrics = len(tags) > 0, False
 
         # run scenario to include finishing spans
         # Note - if finishspan is False the span will be gc'd when the SpanAggregrator._traces is reset
         # (ex: tracer.configure(filter) is called)
         finishspan = self.finishspan
+        # run scenario keeping all the spans of a loop alive, as with large traces,
+        # to account for the memory footprint of spans and the resulting GC pressure
+        keepspans = self.keepspans
         config._128_bit_trace_id_enabled = self.traceid128
         config._telemetry_enabled = config._telemetry_metrics_enabled = self.telemetry
         # Recreate span processors and configure global tracer to avoid sending traces to the agent
@@ -35,6 +44,7 @@ class Span(bm.Scenario):
 
         def _(loops):
             for _ in range(loops):
+                spans = []
                 for i in range(self.nspans):
                     s = tracer.start_span("test." + str(i))
                     if settags:
@@ -43,5 +53,7 @@ class Span(bm.Scenario):
                         s.set_metrics(metrics)
                     if finishspan:
                         s.finish()
+                    if keepspans:
+                        spans.append(s)
 
         yield _
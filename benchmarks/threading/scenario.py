@@ -7,6 +7,7 @@ from typing import Optional
 
 import bm
 
+from ddtrace.filters import TraceFilter
 from ddtrace.internal.writer import TraceWriter
 from ddtrace.span import Span
 from ddtrace.tracer import Tracer
@@ -30,10 +31,21 @@ class NoopWriter(TraceWriter):
         pass
 
 
+class TagFilter(TraceFilter):
+    """Trace filter doing some work on each span of the trace"""
+
+    def process_trace(self, trace):
+        # type: (List[Span]) -> Optional[List[Span]]
+        for span in trace:
+            span.set_tag("filtered", span.name)
+        return trace
+
+
 class Threading(bm.Scenario):
     nthreads = bm.var(type=int)
     ntraces = bm.var(type=int)
     nspans = bm.var(type=int)
+    nfilters = bm.var(type=int)
 
     def create_trace(self, tracer):
         # type: (Tracer) -> None
@@ -48,7 +60,7 @@ class Threading(bm.Scenario):
         from ddtrace import tracer
 
         # configure global tracer to drop traces rather
-        tracer.configure(writer=NoopWriter())
+        tracer.configure(writer=NoopWriter(), settings={"FILTERS": [TagFilter() for _ in range(self.nfilters)]})
 
         def _(loops):
             # type: (int) -> None
@@ -4,6 +4,7 @@ import bm.utils as utils
 
 class Tracer(bm.Scenario):
     depth = bm.var(type=int)
+    fanout = bm.var(type=int)
 
     def run(self):
         # configure global tracer to drop traces rather than encoded and sent to
@@ -18,6 +19,9 @@ class Tracer(bm.Scenario):
                 spans = []
                 for i in range(self.depth):
                     spans.append(tracer.trace(str(i)))
+                # create short-lived children of the innermost span
+                for i in range(self.fanout):
+                    tracer.trace("child").finish()
                 while len(spans) > 0:
                     span = spans.pop()
                     span.finish()
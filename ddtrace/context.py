@@ -9,6 +9,7 @@ from typing import Text
 from .constants import ORIGIN_KEY
 from .constants import SAMPLING_PRIORITY_KEY
 from .constants import USER_ID_KEY
+from .internal._propagation import get_propagated_tags as _get_propagated_tags
 from .internal.compat import PY2
 from .internal.compat import NumericType
 from .internal.constants import W3C_TRACEPARENT_KEY
@@ -18,6 +19,7 @@ from .internal.utils.http import w3c_get_dd_list_member as _w3c_get_dd_list_memb
 
 
 if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict
     from typing import Tuple
 
     from .span import Span
@@ -48,6 +50,7 @@ class Context(object):
         "_lock",
         "_meta",
         "_metrics",
+        "_encoded_headers",
     ]
 
     def __init__(
@@ -62,6 +65,8 @@ class Context(object):
     ):
         self._meta = meta if meta is not None else {}  # type: _MetaDictType
         self._metrics = metrics if metrics is not None else {}  # type: _MetricDictType
+        # The encoded propagation header values, with the values they were encoded from
+        self._encoded_headers = {}  # type: Dict[str, Tuple[Any, str]]
 
         self.trace_id = trace_id  # type: Optional[int]
         self.span_id = span_id  # type: Optional[int]
@@ -94,13 +99,17 @@ class Context(object):
         self.trace_id, self.span_id, self._meta, self._metrics = state
         # We cannot serialize and lock, so we must recreate it unless we already have one
         self._lock = threading.RLock()
+        self._encoded_headers = {}
 
     def _with_span(self, span):
         # type: (Span) -> Context
         """Return a shallow copy of the context with the given span."""
-        return self.__class__(
+        context = self.__class__(
             trace_id=span.trace_id, span_id=span.span_id, meta=self._meta, metrics=self._metrics, lock=self._lock
         )
+        # The encoded headers are derived from the shared meta and metrics
+        context._encoded_headers = self._encoded_headers
+        return context
 
     def _update_tags(self, span):
         # type: (Span) -> None
@@ -152,6 +161,17 @@ class Context(object):
     @property
     def _tracestate(self):
         # type: () -> str
+        # The tracestate is reused until the values of its dd list member change
+        key = (
+            self.sampling_priority,
+            self._meta.get(ORIGIN_KEY),
+            self._meta.get(W3C_TRACESTATE_KEY),
+            _get_propagated_tags(self._meta),
+        )
+        cached = self._encoded_headers.get(W3C_TRACESTATE_KEY)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
         dd_list_member = _w3c_get_dd_list_member(self)
 
         # if there's a preexisting tracestate we need to update it to preserve other vendor data
@@ -166,6 +186,7 @@ class Context(object):
         # if there is no original tracestate value then tracestate is just the dd list member we created
         elif dd_list_member:
             ts = "dd={}".format(dd_list_member)
+        self._encoded_headers[W3C_TRACESTATE_KEY] = (key, ts)
         return ts
 
     @property
@@ -17,6 +17,7 @@ from ...ext import db
 from ...ext import sql
 from ...internal.compat import PY2
 from ...internal.logger import get_logger
+from ...internal.sql import obfuscate_sql
 from ...internal.utils import ArgumentError
 from ...internal.utils import get_argument_value
 from ...pin import Pin
@@ -81,7 +82,8 @@ class TracedCursor(wrapt.ObjectProxy):
         Internal function to trace the call to the underlying cursor method
         :param method: The callable to be wrapped
         :param name: The name of the resulting span.
-        :param resource: The sql query. Sql queries are obfuscated on the agent side.
+        :param resource: The sql query. Sql queries are obfuscated on the agent side, unless
+            ``DD_TRACE_SQL_OBFUSCATION_ENABLED`` is set.
         :param extra_tags: A dict of tags to store into the span's meta
         :param dbm_propagator: _DBM_Propagator, prepends dbm comments to sql statements
         :param args: The args that will be passed as positional args to the wrapped method
@@ -93,6 +95,10 @@ class TracedCursor(wrapt.ObjectProxy):
             return method(*args, **kwargs)
         measured = name == self._self_datadog_name
 
+        query_hash = None
+        if config._sql_obfuscation_enabled and isinstance(resource, six.string_types):
+            resource, query_hash = obfuscate_sql(resource)
+
         with pin.tracer.trace(
             name, service=ext_service(pin, self._self_config), resource=resource, span_type=SpanTypes.SQL
         ) as s:
@@ -102,6 +108,8 @@ class TracedCursor(wrapt.ObjectProxy):
             # https://github.com/DataDog/datadog-trace-agent/blob/bda1ebbf170dd8c5879be993bdd4dbae70d10fda/obfuscate/sql.go#L232
             s.set_tags(pin.tags)
             s.set_tags(extra_tags)
+            if query_hash is not None:
+                s.set_tag_str(sql.QUERY_HASH, query_hash)
 
             s.set_tag_str(COMPONENT, self._self_config.integration_name)
 
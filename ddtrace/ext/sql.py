@@ -8,6 +8,7 @@ log = get_logger(__name__)
 
 # tags
 DB = "sql.db"  # the name of the database
+QUERY_HASH = "sql.query_hash"  # the hash of the obfuscated query
 
 
 def normalize_vendor(vendor):
@@ -36,6 +36,7 @@ class MsgpackEncoderBase(BufferedEncoder):
     def _decode(self, data: Union[str, bytes]) -> Any: ...
 
 class MsgpackEncoderV03(MsgpackEncoderBase): ...
-class MsgpackEncoderV05(MsgpackEncoderBase): ...
+class MsgpackEncoderV05(MsgpackEncoderBase):
+    def __init__(self, max_size: int, max_item_size: int, max_interned_strings: int = 0) -> None: ...
 
 def packb(o: Any, **kwargs) -> bytes: ...
@@ -1,9 +1,11 @@
 from cpython cimport *
 from cpython.bytearray cimport PyByteArray_CheckExact
 from libc cimport stdint
+from libc.string cimport memset
 from libc.string cimport strlen
 
 from json import dumps as json_dumps
+from operator import itemgetter
 import threading
 
 from ._utils cimport PyBytesLike_Check
@@ -56,6 +58,8 @@ cdef extern from "pack.h":
 
 cdef long long ITEM_LIMIT = (2**32)-1
 
+cdef object _first_item = itemgetter(0)
+
 
 cdef inline int PyBytesLike_CheckExact(object o):
     return PyBytes_CheckExact(o) or PyByteArray_CheckExact(o)
@@ -90,6 +94,17 @@ cdef inline int array_prefix_size(stdint.uint32_t l):
     return MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
 
 
+cdef inline int update_array_len(msgpack_packer *pk, stdint.uint32_t count):
+    """Update the array size prefix of a trace buffer and return its offset"""
+    cdef int offset = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE - array_prefix_size(count)
+    cdef size_t old_pos = pk.length
+
+    pk.length = offset
+    msgpack_pack_array(pk, count)
+    pk.length = old_pos
+    return offset
+
+
 cdef inline int pack_bytes(msgpack_packer *pk, char *bs, Py_ssize_t l):
     cdef int ret
 
@@ -227,8 +242,19 @@ cdef class MsgpackStringTable(StringTable):
     cdef stdint.uint32_t _sp_id
     cdef object _lock
     cdef size_t _reset_size
-
-    def __init__(self, max_size):
+    cdef dict _reset_table
+    cdef stdint.uint32_t _reset_id
+    cdef size_t _raw_offset
+    # Interned strings are strings, up to ``_max_interned``, that a table
+    # starts with after a flush. They take the first ids and their packed form
+    # is kept at the start of ``pk`` so that a reset only has to restore the
+    # length of the buffer. ``_last_used`` holds the flush generation in which
+    # each of them was last used, to evict the least recently used ones.
+    cdef stdint.uint32_t _max_interned
+    cdef stdint.uint32_t *_last_used
+    cdef stdint.uint32_t _generation
+
+    def __init__(self, max_size, max_interned=0):
         self.pk.buf_size = min(max_size, 1 << 20)
         self.pk.buf = <char*> PyMem_Malloc(self.pk.buf_size)
         if self.pk.buf == NULL:
@@ -237,15 +263,36 @@ cdef class MsgpackStringTable(StringTable):
         self._max_string_length = int(0.1*max_size)
         self.pk.length = MSGPACK_STRING_TABLE_LENGTH_PREFIX_SIZE
         self._sp_len = 0
+        self._raw_offset = 0
         self._lock = threading.RLock()
         super(MsgpackStringTable, self).__init__()
 
         self.index(ORIGIN_KEY)
         self._reset_size = self.pk.length
+        self._reset_table = self._table.copy()
+        self._reset_id = self._next_id
+
+        self._max_interned = max_interned
+        self._generation = 0
+        if max_interned > 0:
+            # The empty string and the origin key are always in the table
+            self._last_used = <stdint.uint32_t*> PyMem_Malloc((max_interned + 2) * sizeof(stdint.uint32_t))
+            if self._last_used == NULL:
+                raise MemoryError("Unable to allocate internal buffer.")
+            memset(self._last_used, 0, (max_interned + 2) * sizeof(stdint.uint32_t))
 
     def __dealloc__(self):
         PyMem_Free(self.pk.buf)
         self.pk.buf = NULL
+        PyMem_Free(self._last_used)
+        self._last_used = NULL
+
+    cdef stdint.uint32_t _index(self, object string) except? -1:
+        cdef stdint.uint32_t _id = StringTable._index(self, string)
+
+        if _id < self._reset_id and self._last_used != NULL:
+            self._last_used[_id] = self._generation
+        return _id
 
     cdef insert(self, object string):
         cdef int ret
@@ -310,11 +357,22 @@ cdef class MsgpackStringTable(StringTable):
                         self.size, self.max_size
                     )
                 )
+            self._raw_offset = self.pk.length
             res = msgpack_pack_raw_body(&self.pk, <char *>PyLong_AsLong(src), size)
             if res != 0:
                 raise RuntimeError("Failed to append raw bytes to msgpack string table")
 
     cdef reset(self):
+        if self._max_interned > 0:
+            self._update_interned()
+            PyDict_Clear(self._table)
+            PyDict_Update(self._table, self._reset_table)
+            self._next_id = self._reset_id
+            self.pk.length = self._reset_size
+            self._sp_len = 0
+            self._raw_offset = 0
+            return
+
         StringTable.reset(self)
         assert self._next_id == 1
 
@@ -322,6 +380,55 @@ cdef class MsgpackStringTable(StringTable):
         self._next_id = 2
         self.pk.length = self._reset_size
         self._sp_len = 0
+        self._raw_offset = 0
+
+    cdef _update_interned(self):
+        """Intern the strings added since the last reset."""
+        cdef stdint.uint32_t _id
+        cdef size_t strings_size = self._raw_offset or self.pk.length
+        cdef size_t max_interned_size = self.max_size // 4
+
+        self._generation += 1
+        if self._next_id == self._reset_id:
+            # Nothing new: the packed interned strings are reused as they are
+            return
+
+        if (
+            self._next_id - 2 <= self._max_interned
+            and strings_size <= max_interned_size
+            # Rolled back strings are left in the table with ids that are reused
+            and len(self._table) == self._next_id
+        ):
+            # The new strings fit: the whole table becomes the interned strings
+            for _id in range(self._reset_id, self._next_id):
+                self._last_used[_id] = self._generation - 1
+            self._reset_table = self._table.copy()
+            self._reset_id = self._next_id
+            self._reset_size = strings_size
+            return
+
+        # Keep the most recently used strings, leaving room for new ones so
+        # that the strings do not have to be packed again on every flush.
+        ranked = []
+        for string, _id in self._table.items():
+            if 1 < _id < self._next_id and len(string) <= self._max_string_length:
+                ranked.append(
+                    (self._last_used[_id] if _id < self._reset_id else self._generation - 1, string)
+                )
+        ranked.sort(key=_first_item, reverse=True)
+
+        self.pk.length = MSGPACK_STRING_TABLE_LENGTH_PREFIX_SIZE
+        StringTable.reset(self)
+        StringTable._index(self, ORIGIN_KEY)
+        for last_used, string in ranked[:self._max_interned * 3 // 4]:
+            if self.pk.length + len(string) > max_interned_size:
+                break
+            _id = StringTable._index(self, string)
+            self._last_used[_id] = last_used
+
+        self._reset_table = self._table.copy()
+        self._reset_id = self._next_id
+        self._reset_size = self.pk.length
 
     cpdef flush(self):
         with self._lock:
@@ -338,7 +445,7 @@ cdef class BufferedEncoder(object):
     cdef public size_t max_item_size
     cdef object _lock
 
-    def __cinit__(self, size_t max_size, size_t max_item_size):
+    def __cinit__(self, size_t max_size, size_t max_item_size, *args, **kwargs):
         self.max_size = max_size
         self.max_item_size = max_item_size
         self._lock = threading.Lock()
@@ -403,22 +510,38 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
 
     cdef msgpack_packer pk
     cdef stdint.uint32_t _count
-
-    def __cinit__(self, size_t max_size, size_t max_item_size):
+    # Traces are always packed into ``pk``. On flush, ``pk`` is swapped with
+    # ``_flush_pk`` while holding ``_lock`` and the payload is then produced
+    # from ``_flush_pk`` while holding ``_flush_lock`` only. This way threads
+    # calling ``put`` never have to wait for a payload to be copied out.
+    cdef msgpack_packer _flush_pk
+    cdef stdint.uint32_t _flush_count
+    cdef object _flush_lock
+
+    def __cinit__(self, size_t max_size, size_t max_item_size, *args, **kwargs):
         cdef int buf_size = 1024*1024
         self.pk.buf = <char*> PyMem_Malloc(buf_size)
         if self.pk.buf == NULL:
             raise MemoryError("Unable to allocate internal buffer.")
+        self._flush_pk.buf = <char*> PyMem_Malloc(buf_size)
+        if self._flush_pk.buf == NULL:
+            raise MemoryError("Unable to allocate internal buffer.")
 
         self.max_size = max_size
         self.pk.buf_size = buf_size
+        self._flush_pk.buf_size = buf_size
         self.max_item_size = max_item_size if max_item_size < max_size else max_size
         self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
         self._reset_buffer()
+        self._flush_pk.length = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
+        self._flush_count = 0
 
     def __dealloc__(self):
         PyMem_Free(self.pk.buf)
         self.pk.buf = NULL
+        PyMem_Free(self._flush_pk.buf)
+        self._flush_pk.buf = NULL
 
     def __len__(self):  # TODO: Use a better name?
         return self._count
@@ -433,33 +556,46 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
         self._count = 0
         self.pk.length = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE  # Leave room for array length prefix
 
+    cdef _swap_buffers(self):
+        """Make the active buffer the flush buffer and start over with an empty active buffer.
+
+        Must be called with ``_lock`` held.
+        """
+        cdef msgpack_packer pk = self._flush_pk
+
+        self._flush_pk = self.pk
+        self._flush_count = self._count
+        self.pk = pk
+        self._reset_buffer()
+
     cpdef encode(self):
-        with self._lock:
-            if not self._count:
-                return None
+        with self._flush_lock:
+            with self._lock:
+                if not self._count:
+                    return None
+                self._swap_buffers()
 
-            return self.flush()
+            return self._flush_buffer()
 
-    cdef inline int _update_array_len(self):
-        """Update traces array size prefix"""
-        cdef int offset = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE - array_prefix_size(self._count)
-        cdef int old_pos = self.pk.length
+    cpdef flush(self):
+        with self._flush_lock:
+            with self._lock:
+                self._swap_buffers()
 
-        with self._lock:
-            self.pk.length = offset
-            msgpack_pack_array(&self.pk, self._count)
-            self.pk.length = old_pos
-            return offset
+            return self._flush_buffer()
 
     cdef get_bytes(self):
-        """Return internal buffer contents as bytes object"""
-        cdef int offset = self._update_array_len()
-        with self._lock:
-            return PyBytes_FromStringAndSize(self.pk.buf + offset, self.pk.length - offset)
+        """Return flush buffer contents as bytes object"""
+        cdef int offset = update_array_len(&self._flush_pk, self._flush_count)
+        return PyBytes_FromStringAndSize(self._flush_pk.buf + offset, self._flush_pk.length - offset)
 
     cdef char * get_buffer(self):
-        """Return internal buffer."""
-        return self.pk.buf + self._update_array_len()
+        """Return flush buffer."""
+        return self._flush_pk.buf + update_array_len(&self._flush_pk, self._flush_count)
+
+    cdef size_t get_buffer_size(self):
+        """Return the size in bytes of the flush buffer."""
+        return self._flush_pk.length + array_prefix_size(self._flush_count) - MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
 
     cdef void * get_dd_origin_ref(self, str dd_origin):
         raise NotImplementedError()
@@ -529,7 +665,7 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
 
     # ---- Abstract methods ----
 
-    cpdef flush(self):
+    cdef _flush_buffer(self):
         raise NotImplementedError()
 
     cdef int pack_span(self, object span, void *dd_origin) except? -1:
@@ -537,12 +673,12 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
 
 
 cdef class MsgpackEncoderV03(MsgpackEncoderBase):
-    cpdef flush(self):
-        with self._lock:
-            try:
-                return self.get_bytes()
-            finally:
-                self._reset_buffer()
+    cdef _flush_buffer(self):
+        try:
+            return self.get_bytes()
+        finally:
+            self._flush_count = 0
+            self._flush_pk.length = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
 
     cdef void * get_dd_origin_ref(self, str dd_origin):
         return string_to_buff(dd_origin)
@@ -608,10 +744,13 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
         cdef int has_meta
         cdef int has_metrics
 
+        # Spans only allocate their meta and metrics dicts on first write
+        meta = span._meta_dict
+        metrics = span._metrics_dict
         has_error = <bint> (span.error != 0)
         has_span_type = <bint> (span.span_type is not None)
-        has_meta = <bint> (len(span._meta) > 0 or dd_origin is not NULL)
-        has_metrics = <bint> (len(span._metrics) > 0)
+        has_meta = <bint> (meta or dd_origin is not NULL)
+        has_metrics = <bint> (bool(metrics))
         has_parent_id = <bint> (span.parent_id is not None)
 
         L = 7 + has_span_type + has_meta + has_metrics + has_error + has_parent_id
@@ -697,7 +836,7 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
                 if ret != 0:
                     return ret
 
-                ret = self._pack_meta(span._meta, <char *> dd_origin)
+                ret = self._pack_meta(meta if meta is not None else {}, <char *> dd_origin)
                 if ret != 0:
                     return ret
 
@@ -705,7 +844,7 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
                 ret = pack_bytes(&self.pk, <char *> b"metrics", 7)
                 if ret != 0:
                     return ret
-                ret = self._pack_metrics(span._metrics)
+                ret = self._pack_metrics(metrics)
                 if ret != 0:
                     return ret
 
@@ -714,20 +853,32 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
 
 cdef class MsgpackEncoderV05(MsgpackEncoderBase):
     cdef MsgpackStringTable _st
+    cdef MsgpackStringTable _flush_st
 
-    def __cinit__(self, size_t max_size, size_t max_item_size):
-        self._st = MsgpackStringTable(max_size)
+    def __cinit__(self, size_t max_size, size_t max_item_size, int max_interned_strings=0):
+        # Each string table keeps up to ``max_interned_strings`` of the most
+        # recently used strings across flushes, as services, operation names,
+        # resources and tag keys hardly change from one payload to the next.
+        self._st = MsgpackStringTable(max_size, max_interned_strings)
+        self._flush_st = MsgpackStringTable(max_size, max_interned_strings)
 
-    cpdef flush(self):
-        with self._lock:
-            try:
-                self._st.append_raw(
-                    PyLong_FromLong(<long> self.get_buffer()),
-                    <Py_ssize_t> super(MsgpackEncoderV05, self).size,
-                )
-                return self._st.flush()
-            finally:
-                self._reset_buffer()
+    cdef _swap_buffers(self):
+        cdef MsgpackStringTable st = self._flush_st
+
+        MsgpackEncoderBase._swap_buffers(self)
+        self._flush_st = self._st
+        self._st = st
+
+    cdef _flush_buffer(self):
+        try:
+            self._flush_st.append_raw(
+                PyLong_FromLong(<long> self.get_buffer()),
+                <Py_ssize_t> self.get_buffer_size(),
+            )
+            return self._flush_st.flush()
+        finally:
+            self._flush_count = 0
+            self._flush_pk.length = MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
 
     @property
     def size(self):
@@ -801,11 +952,17 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
         if span._links:
             span_links = json_dumps([link.to_dict() for link in span._links])
 
-        ret = msgpack_pack_map(&self.pk, len(span._meta) + (dd_origin is not NULL) + (len(span_links) > 0))
+        # Spans only allocate their meta and metrics dicts on first write
+        meta = span._meta_dict
+        metrics = span._metrics_dict
+
+        ret = msgpack_pack_map(
+            &self.pk, (len(meta) if meta else 0) + (dd_origin is not NULL) + (len(span_links) > 0)
+        )
         if ret != 0:
             return ret
-        if span._meta:
-            for k, v in span._meta.items():
+        if meta:
+            for k, v in meta.items():
                 ret = self._pack_string(k)
                 if ret != 0:
                     return ret
@@ -827,11 +984,11 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
             if ret != 0:
                 return ret
 
-        ret = msgpack_pack_map(&self.pk, len(span._metrics))
+        ret = msgpack_pack_map(&self.pk, len(metrics) if metrics else 0)
         if ret != 0:
             return ret
-        if span._metrics:
-            for k, v in span._metrics.items():
+        if metrics:
+            for k, v in metrics.items():
                 ret = self._pack_string(k)
                 if ret != 0:
                     return ret
@@ -0,0 +1,9 @@
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+def decode_traceparent(traceparent: str) -> Tuple[str, int, int, int, Optional[str]]: ...
+def decode_tracestate(members: List[str]) -> Tuple[Optional[int], Dict[str, str], Optional[str]]: ...
+def get_propagated_tags(meta: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]: ...
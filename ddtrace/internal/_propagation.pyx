@@ -0,0 +1,152 @@
+"""
+Codec for the values of the trace propagation headers.
+
+traceparent eBNF (https://www.w3.org/TR/trace-context/#traceparent-header)::
+
+    traceparent = version, "-", trace-id, "-", parent-id, "-", trace-flags, [ "-", future-values ];
+    version = 2 * lower hex digit;
+    trace-id = 32 * lower hex digit;
+    parent-id = 16 * lower hex digit;
+    trace-flags = 2 * lower hex digit;
+
+The ``dd`` list member of tracestate is a ``;`` separated list of ``key:value`` pairs.
+"""
+
+
+cdef inline bint is_lower_hex(Py_UCS4 c):
+    # "0"-"9" or "a"-"f"
+    return (48 <= c <= 57) or (97 <= c <= 102)
+
+
+cdef inline bint is_dash(Py_UCS4 c):
+    # "-"
+    return c == 45
+
+
+cdef bint _is_lower_hex(str value, Py_ssize_t start, Py_ssize_t end):
+    """Helper to ensure a slice of the given string only contains lower case hex digits"""
+    cdef Py_ssize_t i
+
+    for i in range(start, end):
+        if not is_lower_hex(value[i]):
+            return 0
+    return 1
+
+
+cpdef tuple decode_traceparent(str traceparent):
+    # type: (str) -> Tuple[str, int, int, int, Optional[str]]
+    """Parse the fields of a traceparent header value
+
+    Example::
+
+        >>> decode_traceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01")
+        ("00", 14566130262006540530440327713405333916, 13235353014750950193, 1, None)
+
+    :param str traceparent: The traceparent header value, leading and trailing whitespaces are ignored
+    :rtype: tuple
+    :returns: the version, trace id, span id, trace flags and future values (or ``None``)
+    :raises ValueError: When the value is not a valid traceparent
+    """
+    cdef str tp = traceparent.strip()
+    cdef Py_ssize_t size = len(tp)
+    cdef str future_values = None
+
+    # DEV: Validate the fixed size part of the value in a single pass instead of matching a regex
+    if (
+        size < 55
+        or not is_dash(tp[2])
+        or not is_dash(tp[35])
+        or not is_dash(tp[52])
+        or not _is_lower_hex(tp, 0, 2)
+        or not _is_lower_hex(tp, 3, 35)
+        or not _is_lower_hex(tp, 36, 52)
+        or not _is_lower_hex(tp, 53, 55)
+    ):
+        raise ValueError("Invalid traceparent version: %s" % traceparent)
+
+    if size > 55:
+        future_values = tp[55:]
+        if size == 56 or not is_dash(tp[55]) or "\n" in future_values:
+            raise ValueError("Invalid traceparent version: %s" % traceparent)
+
+    return tp[0:2], int(tp[3:35], 16), int(tp[36:52], 16), int(tp[53:55], 16), future_values
+
+
+cdef str _decode_tag_value(str value):
+    # "=" is encoded as "~" in tracestate
+    return value.replace("~", "=")
+
+
+cpdef tuple decode_tracestate(object members):
+    # type: (List[str]) -> Tuple[Optional[int], Dict[str, str], Optional[str]]
+    """Parse the Datadog values from the list members of a tracestate header value
+
+    Example::
+
+        >>> decode_tracestate(["dd=s:2;o:rum;t.dm:-4", "congo=t61rcWkgMzE"])
+        (2, {"_dd.p.dm": "-4"}, "rum")
+
+    :param list members: The list members of the tracestate header value
+    :rtype: tuple
+    :returns: the sampling priority, the propagated tags and the origin
+    :raises ValueError: When the ``dd`` list member is not valid
+    """
+    cdef dict dd = None
+    cdef dict tags
+    cdef str member
+    cdef str item
+    cdef str key
+    cdef str value
+    cdef str origin
+    cdef Py_ssize_t sep
+    cdef object sampling_priority = None
+
+    for member in members:
+        if member.startswith("dd="):
+            dd = {}
+            for item in member[3:].split(";"):
+                # Values can contain a ":", only split on the first one
+                sep = item.find(":")
+                if sep < 0:
+                    raise ValueError("Invalid dd list member in tracestate: {!r}".format(member))
+                dd[item[:sep]] = item[sep + 1:]
+
+    if not dd:
+        return None, {}, None
+
+    tags = {}
+    for key, value in dd.items():
+        if key.startswith("t."):
+            # Convert the "t." prefix back to "_dd.p."
+            tags["_dd.p." + key[2:]] = _decode_tag_value(value)
+
+    value = dd.get("s")
+    if value is not None:
+        sampling_priority = int(value)
+
+    origin = dd.get("o")
+    if origin:
+        origin = _decode_tag_value(origin)
+
+    return sampling_priority, tags, origin
+
+
+cpdef tuple get_propagated_tags(dict meta):
+    # type: (Dict[str, Any]) -> Tuple[Tuple[str, str], ...]
+    """Return the ``_dd.p.`` prefixed trace tags of the given meta
+
+    The result can be compared with a previous one to know if the
+    propagated tags, and so their encoded header values, changed.
+
+    :param dict meta: The meta of a context
+    :rtype: tuple
+    :returns: the ``(key, value)`` pairs of the propagated tags
+    """
+    cdef list res = []
+
+    for key, value in meta.items():
+        if isinstance(key, str) and key.startswith("_dd.p."):
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            res.append((key, value))
+    return tuple(res)
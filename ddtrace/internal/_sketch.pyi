@@ -0,0 +1,11 @@
+from typing import Any
+
+class SketchAccumulator(object):
+    relative_accuracy: float
+    count: int
+    def __init__(self, relative_accuracy: float) -> None: ...
+    def __len__(self) -> int: ...
+    def add(self, value: float) -> None: ...
+    def merge(self, other: SketchAccumulator) -> None: ...
+    def flush_into(self, sketch: Any) -> None: ...
+    def to_proto(self, bin_limit: int = 2048) -> bytes: ...
@@ -0,0 +1,270 @@
+"""
+Compiled accumulation of values into DDSketch bins.
+
+Adding a value to a pure-Python DDSketch goes through several Python calls to
+compute the index of its bin and to update the store and the summary
+statistics. ``SketchAccumulator`` only computes the index of the bin in C and
+increments its count, and adds the accumulated bins to an actual sketch once
+per bin when the sketch is needed, or encodes them directly as a DDSketch
+protobuf message.
+"""
+import struct
+
+from cpython.mem cimport PyMem_Free
+from cpython.mem cimport PyMem_Realloc
+from libc cimport stdint
+from libc.float cimport DBL_MIN
+from libc.math cimport ceil
+from libc.math cimport log
+from libc.math cimport log1p
+from libc.math cimport pow
+from libc.string cimport memmove
+from libc.string cimport memset
+
+
+# Extra bins allocated when the range of bins has to grow
+DEF GROW_BY = 64
+# Values which would grow the range of bins beyond this are kept as is
+DEF MAX_BINS = 1 << 16
+
+cdef double LN2 = log(2.0)
+
+
+cdef class SketchAccumulator(object):
+    """Accumulate values into logarithmic bins with the given relative accuracy.
+
+    The bins match the ones of a DDSketch with a logarithmic mapping with the
+    same relative accuracy, so that :meth:`flush_into` adds each value to the
+    same bin of the sketch as if it had been added to the sketch directly.
+    """
+    cdef readonly double relative_accuracy
+    cdef double _gamma
+    cdef double _multiplier
+    cdef double _min_possible
+    cdef stdint.uint64_t *_bins
+    cdef long _min_key
+    cdef Py_ssize_t _length
+    cdef readonly stdint.uint64_t count
+    # Values too close to zero to be mapped to a bin
+    cdef stdint.uint64_t _zero_count
+    # Values that do not map to a bin, e.g. negative values
+    cdef list _other
+
+    def __cinit__(self, double relative_accuracy):
+        cdef double gamma_mantissa
+
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        # DEV: Same computations as the logarithmic mapping of DDSketch, so
+        # that values are mapped to exactly the same keys
+        gamma_mantissa = 2 * relative_accuracy / (1 - relative_accuracy)
+        self._gamma = 1 + gamma_mantissa
+        self._multiplier = (1 / log1p(gamma_mantissa)) * LN2
+        self._min_possible = DBL_MIN * self._gamma
+        self._bins = NULL
+        self._min_key = 0
+        self._length = 0
+        self.count = 0
+        self._zero_count = 0
+        self._other = []
+
+    def __dealloc__(self):
+        PyMem_Free(self._bins)
+        self._bins = NULL
+
+    def __len__(self):
+        return self.count
+
+    cdef int _extend(self, long key) except -1:
+        cdef long min_key
+        cdef Py_ssize_t length
+        cdef stdint.uint64_t *bins
+
+        if self._length and self._min_key <= key < self._min_key + self._length:
+            return 0
+        if self._length == 0:
+            min_key = key - GROW_BY // 2
+            length = GROW_BY
+        elif key < self._min_key:
+            min_key = key - GROW_BY
+            length = self._length + (self._min_key - min_key)
+        else:
+            min_key = self._min_key
+            length = key - min_key + GROW_BY
+
+        bins = <stdint.uint64_t *> PyMem_Realloc(self._bins, length * sizeof(stdint.uint64_t))
+        if bins == NULL:
+            raise MemoryError("Unable to allocate sketch bins.")
+        if self._length and min_key < self._min_key:
+            memmove(bins + (self._min_key - min_key), bins, self._length * sizeof(stdint.uint64_t))
+            memset(bins, 0, (self._min_key - min_key) * sizeof(stdint.uint64_t))
+            memset(bins + (self._min_key - min_key) + self._length, 0, (length - self._length - (self._min_key - min_key)) * sizeof(stdint.uint64_t))
+        else:
+            memset(bins + self._length, 0, (length - self._length) * sizeof(stdint.uint64_t))
+        self._bins = bins
+        self._min_key = min_key
+        self._length = length
+        return 0
+
+    cdef inline long _key(self, double value):
+        return <long> ceil((log(value) / LN2) * self._multiplier)
+
+    cdef inline bint _fits(self, long key):
+        """Whether the bin of the key is allocated, or can be without exceeding the max number of bins."""
+        if self._length == 0:
+            return 1
+        if key < self._min_key:
+            return self._min_key + self._length - key <= MAX_BINS
+        return key - self._min_key < MAX_BINS
+
+    cpdef add(self, double value):
+        """Add a value."""
+        cdef long key
+
+        self.count += 1
+        if not value > self._min_possible:
+            if -self._min_possible <= value:
+                self._zero_count += 1
+            else:
+                self._other.append(value)
+            return
+
+        key = self._key(value)
+        if key < self._min_key or key >= self._min_key + self._length:
+            if not self._fits(key):
+                self._other.append(value)
+                return
+            self._extend(key)
+        self._bins[key - self._min_key] += 1
+
+    cpdef merge(self, SketchAccumulator other):
+        """Add the values accumulated by another accumulator with the same relative accuracy."""
+        cdef Py_ssize_t i
+
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge accumulators with different relative accuracies.")
+
+        for i in range(other._length):
+            if other._bins[i]:
+                self._merge_bin(other._min_key + i, other._bins[i])
+
+        self._zero_count += other._zero_count
+        self._other.extend(other._other)
+        self.count += other.count
+
+    cdef _merge_bin(self, long key, stdint.uint64_t count):
+        cdef stdint.uint64_t i
+        cdef double center
+
+        if key < self._min_key or key >= self._min_key + self._length:
+            if not self._fits(key):
+                center = pow(self._gamma, key) * 2.0 / (1 + self._gamma)
+                for i in range(count):
+                    self._other.append(center)
+                return
+            self._extend(key)
+        self._bins[key - self._min_key] += count
+
+    def flush_into(self, sketch):
+        """Add the accumulated values to the given sketch and reset the accumulator."""
+        cdef Py_ssize_t i
+        # The center of a bin maps back to the same bin with a logarithmic mapping
+        cdef double center = 2.0 / (1 + self._gamma)
+
+        for i in range(self._length):
+            if self._bins[i]:
+                sketch.add(pow(self._gamma, self._min_key + i) * center, <double> self._bins[i])
+        if self._zero_count:
+            sketch.add(0.0, <double> self._zero_count)
+        for value in self._other:
+            sketch.add(value)
+
+        self._reset()
+
+    def to_proto(self, int bin_limit=2048):
+        """Encode the accumulated values as a serialized DDSketch protobuf message and reset the accumulator.
+
+        The message is equivalent to the one of a ``LogCollapsingLowestDenseDDSketch``
+        with the same relative accuracy and bin limit to which the values were added.
+        """
+        cdef Py_ssize_t i
+        cdef long key
+        cdef dict positive = {}
+        cdef dict negative = {}
+        cdef double zero_count = <double> self._zero_count
+
+        for i in range(self._length):
+            if self._bins[i]:
+                positive[self._min_key + i] = <double> self._bins[i]
+        for value in self._other:
+            if value > self._min_possible:
+                key = self._key(value)
+                positive[key] = positive.get(key, 0.0) + 1.0
+            elif value < -self._min_possible:
+                key = self._key(-value)
+                negative[key] = negative.get(key, 0.0) + 1.0
+            else:
+                zero_count += 1.0
+
+        self._reset()
+
+        # IndexMapping: gamma, the index offset is 0 and the interpolation is NONE
+        mapping = b"\x09" + struct.pack("<d", self._gamma)
+        sketch = _encode_field(1, mapping) + _encode_field(2, _encode_store(positive, bin_limit))
+        sketch += _encode_field(3, _encode_store(negative, bin_limit))
+        if zero_count:
+            sketch += b"\x21" + struct.pack("<d", zero_count)
+        return sketch
+
+    cdef _reset(self):
+        PyMem_Free(self._bins)
+        self._bins = NULL
+        self._min_key = 0
+        self._length = 0
+        self.count = 0
+        self._zero_count = 0
+        self._other = []
+
+
+cdef bytes _encode_varint(stdint.uint64_t value):
+    cdef bytearray res = bytearray()
+
+    while value >= 0x80:
+        res.append((value & 0x7F) | 0x80)
+        value >>= 7
+    res.append(value)
+    return bytes(res)
+
+
+cdef bytes _encode_field(int number, bytes message):
+    """Encode a length delimited field."""
+    return _encode_varint((number << 3) | 2) + _encode_varint(len(message)) + message
+
+
+cdef bytes _encode_store(dict counts, int bin_limit):
+    """Encode the counts of the bins of a CollapsingLowestDenseStore as a Store message."""
+    cdef long min_key
+    cdef long max_key
+    cdef long key
+    cdef long offset
+    cdef list bins
+    cdef bytes res
+
+    if not counts:
+        return b""
+
+    min_key = min(counts)
+    max_key = max(counts)
+    # The lowest bins are collapsed into the lowest one when there are too many of them
+    offset = max(min_key, max_key - bin_limit + 1)
+    bins = [0.0] * (max_key - offset + 1)
+    for key, count in counts.items():
+        bins[max(key, offset) - offset] += count
+
+    # Packed contiguousBinCounts
+    res = _encode_field(2, struct.pack("<%dd" % len(bins), *bins))
+    if offset:
+        # contiguousBinIndexOffset, a zigzag encoded sint32
+        res += b"\x18" + _encode_varint((<stdint.uint64_t> offset << 1) ^ <stdint.uint64_t> (offset >> 63))
+    return res
@@ -0,0 +1,8 @@
+from typing import Any
+
+TAG_KIND_META: int
+TAG_KIND_METRIC: int
+TAG_KIND_SPECIAL: int
+
+def tag_kind(key: Any, value: Any) -> int: ...
+def is_real_number(value: Any) -> bool: ...
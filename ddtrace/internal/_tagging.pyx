@@ -0,0 +1,73 @@
+"""
+Compiled type dispatch for span tags and metrics.
+
+Integrations set dozens of tags on every span, the vast majority of them
+plain strings. These helpers resolve the keys that need special handling
+with a precomputed table so that ``Span.set_tag`` and ``Span.set_metric``
+only go through their full chain of checks when needed.
+"""
+from cpython.float cimport PyFloat_AS_DOUBLE
+from libc.math cimport isfinite
+
+# Do not use absolute imports, see the note in _encoding.pyx
+from ..constants import ANALYTICS_SAMPLE_RATE_KEY
+from ..constants import MANUAL_DROP_KEY
+from ..constants import MANUAL_KEEP_KEY
+from ..constants import SERVICE_KEY
+from ..constants import SERVICE_VERSION_KEY
+from ..constants import SPAN_MEASURED_KEY
+from ..ext import http
+from ..ext import net
+
+
+# The tag value can be stored as is in the span meta
+TAG_KIND_META = 0
+# The tag value is a number to store in the span metrics
+TAG_KIND_METRIC = 1
+# The tag needs the full handling of Span.set_tag
+TAG_KIND_SPECIAL = 2
+
+# Keys that either have side effects or require their value to be converted
+cdef frozenset _SPECIAL_KEYS = frozenset(
+    (
+        ANALYTICS_SAMPLE_RATE_KEY,
+        MANUAL_DROP_KEY,
+        MANUAL_KEEP_KEY,
+        SERVICE_KEY,
+        SERVICE_VERSION_KEY,
+        SPAN_MEASURED_KEY,
+        http.STATUS_CODE,
+        net.TARGET_PORT,
+    )
+)
+
+# Larger integers cannot be represented exactly as metrics
+cdef object _MAX_INT_METRIC = 2 ** 53
+
+
+cpdef int tag_kind(object key, object value):
+    """Return how the given tag should be set on a span."""
+    if type(key) is not str or key in _SPECIAL_KEYS:
+        return TAG_KIND_SPECIAL
+
+    value_type = type(value)
+    if value_type is str:
+        return TAG_KIND_META
+    # DEV: bool is a subclass of int but is not matched by the exact type check
+    if value_type is int:
+        if -_MAX_INT_METRIC <= value <= _MAX_INT_METRIC:
+            return TAG_KIND_METRIC
+        return TAG_KIND_SPECIAL
+    if value_type is float:
+        return TAG_KIND_METRIC
+    return TAG_KIND_SPECIAL
+
+
+cpdef bint is_real_number(object value):
+    """Return whether the value can be set as a metric without conversion."""
+    value_type = type(value)
+    if value_type is int:
+        return True
+    if value_type is float:
+        return isfinite(PyFloat_AS_DOUBLE(value))
+    return False
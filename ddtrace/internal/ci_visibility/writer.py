@@ -147,7 +147,7 @@ class CIVisibilityWriter(HTTPWriter):
         return self.__class__(
             intake_url=self.intake_url,
             sampler=self._sampler,
-            processing_interval=self._interval,
+            processing_interval=self._processing_interval,
             timeout=self._timeout,
             dogstatsd=self.dogstatsd,
             sync_mode=self._sync_mode,
@@ -35,7 +35,12 @@ SPAN_API_OPENTRACING = "opentracing"
 DEFAULT_BUFFER_SIZE = 20 << 20  # 20 MB
 DEFAULT_MAX_PAYLOAD_SIZE = 20 << 20  # 20 MB
 DEFAULT_PROCESSING_INTERVAL = 1.0
+DEFAULT_MAX_PROCESSING_INTERVAL = 10.0
+DEFAULT_FLUSH_WATERMARK = 0.5
 DEFAULT_REUSE_CONNECTIONS = False
+DEFAULT_MIN_COMPRESSION_SIZE = 8 << 10  # 8 KB
+DEFAULT_SPILL_MAX_SIZE = 64 << 20  # 64 MB
+DEFAULT_SPAN_AGGREGATOR_MAX_SPANS = 100000
 BLOCKED_RESPONSE_HTML = """
 <!DOCTYPE html><html lang="en"><head> <meta charset="UTF-8"> <meta name="viewport"
 content="width=device-width,initial-scale=1"> <title>You've been blocked</title>
@@ -100,9 +100,10 @@ like this::
 
 The names of these events follow the pattern ``context.[started|ended].<context_name>``.
 """
-from collections import defaultdict
 from contextlib import contextmanager
 import logging
+import sys
+import threading
 from typing import TYPE_CHECKING
 
 
@@ -127,12 +128,19 @@ log = logging.getLogger(__name__)
 
 
 _CURRENT_CONTEXT = None
-_EVENT_HUB = None
 ROOT_CONTEXT_ID = "__root"
 
 
 class EventHub:
+    """Registry of the listeners of the Core API events.
+
+    The listeners of an event are stored in a tuple that is replaced, never
+    mutated, when a listener is registered. Dispatching an event therefore
+    needs neither a lock nor a copy of its listeners.
+    """
+
     def __init__(self):
+        self._lock = threading.Lock()
         self.reset()
 
     def has_listeners(self, event_id):
@@ -141,28 +149,31 @@ class EventHub:
 
     def on(self, event_id, callback):
         # type: (str, Callable) -> None
-        if callback not in self._listeners[event_id]:
-            self._listeners[event_id].append(callback)
+        with self._lock:
+            listeners = self._listeners.get(event_id, ())
+            if callback not in listeners:
+                self._listeners[event_id] = listeners + (callback,)
 
     def reset(self):
-        if hasattr(self, "_listeners"):
-            del self._listeners
-        self._listeners = defaultdict(list)
+        with self._lock:
+            self._listeners = {}  # type: Dict[str, Tuple[Callable, ...]]
 
     def dispatch(self, event_id, args, *other_args):
         # type: (...) -> Tuple[List[Optional[Any]], List[Optional[Exception]]]
         if not isinstance(args, list):
-            args = [args] + list(other_args)
-        else:
-            if other_args:
-                raise TypeError(
-                    "When the first argument expected by the event handler is a list, all arguments "
-                    "must be passed in a list. For example, use dispatch('foo', [[l1, l2], arg2]) "
-                    "instead of dispatch('foo', [l1, l2], arg2)."
-                )
-        results = []
-        exceptions = []
-        for listener in self._listeners.get(event_id, []):
+            args = (args,) + other_args
+        elif other_args:
+            raise TypeError(
+                "When the first argument expected by the event handler is a list, all arguments "
+                "must be passed in a list. For example, use dispatch('foo', [[l1, l2], arg2]) "
+                "instead of dispatch('foo', [l1, l2], arg2)."
+            )
+        results = []  # type: List[Optional[Any]]
+        exceptions = []  # type: List[Optional[Exception]]
+        listeners = self._listeners.get(event_id)
+        if not listeners:
+            return results, exceptions
+        for listener in listeners:
             result = None
             exception = None
             try:
@@ -174,27 +185,45 @@ class EventHub:
         return results, exceptions
 
 
-_EVENT_HUB = contextvars.ContextVar("EventHub_var", default=EventHub())
+# DEV: The hub is never replaced, so it is not looked up in a contextvar on every dispatch
+_EVENT_HUB = EventHub()
 
 
 def has_listeners(event_id):
     # type: (str) -> bool
-    return _EVENT_HUB.get().has_listeners(event_id)  # type: ignore
+    return _EVENT_HUB.has_listeners(event_id)
 
 
 def on(event_id, callback):
     # type: (str, Callable) -> None
-    return _EVENT_HUB.get().on(event_id, callback)  # type: ignore
+    return _EVENT_HUB.on(event_id, callback)
 
 
 def reset_listeners():
     # type: () -> None
-    _EVENT_HUB.get().reset()  # type: ignore
+    _EVENT_HUB.reset()
 
 
 def dispatch(event_id, args, *other_args):
     # type: (...) -> Tuple[List[Optional[Any]], List[Optional[Exception]]]
-    return _EVENT_HUB.get().dispatch(event_id, args, *other_args)  # type: ignore
+    return _EVENT_HUB.dispatch(event_id, args, *other_args)
+
+
+# DEV: Context identifiers are static names, there are as many of them as the places creating contexts
+_CONTEXT_EVENT_IDS = {}  # type: Dict[str, Tuple[str, str]]
+
+
+def _context_event_ids(identifier):
+    # type: (str) -> Tuple[str, str]
+    """Return the ids of the started and ended events of the contexts with the given identifier."""
+    try:
+        return _CONTEXT_EVENT_IDS[identifier]
+    except KeyError:
+        event_ids = _CONTEXT_EVENT_IDS[identifier] = (
+            sys.intern("context.started.%s" % identifier),
+            sys.intern("context.ended.%s" % identifier),
+        )
+        return event_ids
 
 
 class ExecutionContext:
@@ -202,15 +231,17 @@ class ExecutionContext:
 
     def __init__(self, identifier, parent=None, span=None, **kwargs):
         self.identifier = identifier
-        self._data = {}
+        # DEV: kwargs is always a new dictionary
+        self._data = kwargs
         self._parents = []
         self._span = span
         if parent is not None:
             self.addParent(parent)
-        self._data.update(kwargs)
         if self._span is None and _CURRENT_CONTEXT is not None:
             self._token = _CURRENT_CONTEXT.set(self)
-        dispatch("context.started.%s" % self.identifier, [self])
+        event_id = _context_event_ids(identifier)[0]
+        if _EVENT_HUB.has_listeners(event_id):
+            _EVENT_HUB.dispatch(event_id, [self])
 
     def __repr__(self):
         return self.__class__.__name__ + " '" + self.identifier + "' @ " + str(id(self))
@@ -224,7 +255,11 @@ class ExecutionContext:
         return self._parents[0] if self._parents else None
 
     def end(self):
-        dispatch_result = dispatch("context.ended.%s" % self.identifier, [self])
+        event_id = _context_event_ids(self.identifier)[1]
+        if _EVENT_HUB.has_listeners(event_id):
+            dispatch_result = _EVENT_HUB.dispatch(event_id, [self])
+        else:
+            dispatch_result = ([], [])
         if self._span is None:
             try:
                 _CURRENT_CONTEXT.reset(self._token)
@@ -59,6 +59,7 @@ IF UNAME_SYSNAME == "Linux":
         void ddup_push_frame(const char *_name, const char *_filename, uint64_t address, int64_t line)
         void ddup_flush_sample()
         void ddup_set_runtime_id(const char *_id, size_t sz)
+        void ddup_upload_wait() nogil
         void ddup_upload()
 
     def init(
@@ -92,77 +93,174 @@ IF UNAME_SYSNAME == "Linux":
                 ddup_config_user_tag(key, val)
         ddup_init()
 
-    def start_sample(nframes: int) -> None:
-        ddup_start_sample(nframes)
+    cdef class SampleHandle:
+        """A sample of the native profile.
 
-    def push_cputime(value: int, count: int) -> None:
-        ddup_push_cputime(value, count)
+        The values are collected, and converted, by the ``push_*`` methods, then
+        ``flush_sample`` writes the whole sample to the profile. The profile has
+        a single in-progress sample shared by all the threads: writing it in one
+        call that never runs Python code means the GIL cannot be handed over to
+        another thread writing its own sample in the meantime.
+        """
 
-    def push_walltime(value: int, count: int) -> None:
-        ddup_push_walltime(value, count)
+        cdef bint has_walltime
+        cdef int64_t walltime
+        cdef int64_t walltime_count
+        cdef bint has_cputime
+        cdef int64_t cputime
+        cdef int64_t cputime_count
+        cdef bint has_acquire
+        cdef int64_t acquire
+        cdef int64_t acquire_count
+        cdef bint has_release
+        cdef int64_t release
+        cdef int64_t release_count
+        cdef bint has_alloc
+        cdef uint64_t alloc
+        cdef uint64_t alloc_count
+        cdef bint has_heap
+        cdef uint64_t heap
+        cdef bint has_threadinfo
+        cdef int64_t thread_id
+        cdef int64_t thread_native_id
+        cdef bytes thread_name
+        cdef bint has_task_id
+        cdef int64_t task_id
+        cdef bytes task_name
+        cdef bytes lock_name
+        cdef bytes exception_type
+        cdef int64_t exception_count
+        cdef bytes class_name
+        cdef uint64_t span_id
+        cdef uint64_t local_root_span_id
+        cdef bytes trace_type
+        cdef bytes trace_resource_container
+        cdef list frames
 
-    def push_acquire(value: int, count: int) -> None:
-        ddup_push_acquire(value, count)
+        def __cinit__(self):
+            self.frames = []
 
-    def push_release(value: int, count: int) -> None:
-        ddup_push_release(value, count)
+        def push_cputime(self, value: int, count: int) -> None:
+            self.has_cputime = True
+            self.cputime = value
+            self.cputime_count = count
 
-    def push_alloc(value: int, count: int) -> None:
-        ddup_push_alloc(value, count)
+        def push_walltime(self, value: int, count: int) -> None:
+            self.has_walltime = True
+            self.walltime = value
+            self.walltime_count = count
 
-    def push_heap(value: int) -> None:
-        ddup_push_heap(value)
+        def push_acquire(self, value: int, count: int) -> None:
+            self.has_acquire = True
+            self.acquire = value
+            self.acquire_count = count
 
-    def push_lock_name(lock_name: str) -> None:
-        ddup_push_lock_name(ensure_binary(lock_name))
+        def push_release(self, value: int, count: int) -> None:
+            self.has_release = True
+            self.release = value
+            self.release_count = count
 
-    def push_frame(name: str, filename: str, address: int, line: int) -> None:
-        name = sanitize_string(name)
-        filename = sanitize_string(filename)
-        ddup_push_frame(ensure_binary(name), ensure_binary(filename), address, line)
+        def push_alloc(self, value: int, count: int) -> None:
+            self.has_alloc = True
+            self.alloc = value
+            self.alloc_count = count
 
-    def push_threadinfo(thread_id: int, thread_native_id: int, thread_name: Optional[str]) -> None:
-        # Type hints don't preclude the possibility of a None being propagated
-        thread_id = thread_id if thread_id is not None else 0
-        thread_native_id = thread_native_id if thread_native_id is not None else 0
-        thread_name = thread_name if thread_name is not None else ""
+        def push_heap(self, value: int) -> None:
+            self.has_heap = True
+            self.heap = value
 
-        ddup_push_threadinfo(thread_id, thread_native_id, ensure_binary(thread_name))
+        def push_lock_name(self, lock_name: str) -> None:
+            self.lock_name = ensure_binary(lock_name)
 
-    def push_task_id(task_id: int) -> None:
-        ddup_push_task_id(task_id)
+        def push_frame(self, name: str, filename: str, address: int, line: int) -> None:
+            # The address is not used by the profile
+            self.frames.append(
+                (ensure_binary(sanitize_string(name)), ensure_binary(sanitize_string(filename)), line)
+            )
 
-    def push_task_name(task_name: str) -> None:
-        if task_name:
-            ddup_push_task_name(ensure_binary(task_name))
+        def push_threadinfo(self, thread_id: int, thread_native_id: int, thread_name: Optional[str]) -> None:
+            # Type hints don't preclude the possibility of a None being propagated
+            self.has_threadinfo = True
+            self.thread_id = thread_id if thread_id is not None else 0
+            self.thread_native_id = thread_native_id if thread_native_id is not None else 0
+            self.thread_name = ensure_binary(thread_name if thread_name is not None else "")
 
-    def push_exceptioninfo(exc_type: type, count: int) -> None:
-        if exc_type is not None:
-            exc_name = exc_type.__module__ + "." + exc_type.__name__
-            ddup_push_exceptioninfo(ensure_binary(exc_name), count)
+        def push_task_id(self, task_id: int) -> None:
+            self.has_task_id = True
+            self.task_id = task_id
 
-    def push_class_name(class_name: str) -> None:
-        class_name = class_name if class_name is not None else ""
-        ddup_push_class_name(ensure_binary(class_name))
+        def push_task_name(self, task_name: str) -> None:
+            if task_name:
+                self.task_name = ensure_binary(task_name)
 
-    def push_span(span: typing.Optional[Span], endpoint_collection_enabled: bool) -> None:
-        if not span:
-            return
-        if span.span_id:
-            ddup_push_span_id(span.span_id)
-        if not span._local_root:
-            return
-        if span._local_root.span_id:
-            ddup_push_local_root_span_id(span._local_root.span_id)
-        if span._local_root.span_type:
-            ddup_push_trace_type(span._local_root.span_type)
-        if endpoint_collection_enabled:
-            ddup_push_trace_resource_container(span._local_root._resource)
+        def push_exceptioninfo(self, exc_type: type, count: int) -> None:
+            if exc_type is not None:
+                self.exception_type = ensure_binary(exc_type.__module__ + "." + exc_type.__name__)
+                self.exception_count = count
 
-    def flush_sample() -> None:
-        ddup_flush_sample()
+        def push_class_name(self, class_name: str) -> None:
+            self.class_name = ensure_binary(class_name if class_name is not None else "")
+
+        def push_span(self, span: typing.Optional[Span], endpoint_collection_enabled: bool) -> None:
+            if not span:
+                return
+            if span.span_id:
+                self.span_id = span.span_id
+            if not span._local_root:
+                return
+            if span._local_root.span_id:
+                self.local_root_span_id = span._local_root.span_id
+            if span._local_root.span_type:
+                self.trace_type = ensure_binary(span._local_root.span_type)
+            if endpoint_collection_enabled:
+                self.trace_resource_container = ensure_binary(span._local_root._resource[0])
+
+        def flush_sample(self) -> None:
+            # DEV: Only C calls from here, see the class docstring
+            cdef tuple frame
+
+            ddup_start_sample(len(self.frames))
+            if self.has_walltime:
+                ddup_push_walltime(self.walltime, self.walltime_count)
+            if self.has_cputime:
+                ddup_push_cputime(self.cputime, self.cputime_count)
+            if self.has_acquire:
+                ddup_push_acquire(self.acquire, self.acquire_count)
+            if self.has_release:
+                ddup_push_release(self.release, self.release_count)
+            if self.has_alloc:
+                ddup_push_alloc(self.alloc, self.alloc_count)
+            if self.has_heap:
+                ddup_push_heap(self.heap)
+            if self.lock_name is not None:
+                ddup_push_lock_name(self.lock_name)
+            if self.has_threadinfo:
+                ddup_push_threadinfo(self.thread_id, self.thread_native_id, self.thread_name)
+            if self.has_task_id:
+                ddup_push_task_id(self.task_id)
+            if self.task_name is not None:
+                ddup_push_task_name(self.task_name)
+            if self.exception_type is not None:
+                ddup_push_exceptioninfo(self.exception_type, self.exception_count)
+            if self.class_name is not None:
+                ddup_push_class_name(self.class_name)
+            for frame in self.frames:
+                ddup_push_frame(<bytes>frame[0], <bytes>frame[1], 0, <int64_t>frame[2])
+            if self.span_id:
+                ddup_push_span_id(self.span_id)
+            if self.local_root_span_id:
+                ddup_push_local_root_span_id(self.local_root_span_id)
+            if self.trace_type is not None:
+                ddup_push_trace_type(self.trace_type)
+            if self.trace_resource_container is not None:
+                ddup_push_trace_resource_container(self.trace_resource_container)
+            ddup_flush_sample()
 
     def upload() -> None:
         runtime_id = ensure_binary(runtime.get_runtime_id())
         ddup_set_runtime_id(runtime_id, len(runtime_id))
+        # The profile is serialized, compressed and sent by a native thread, the previous one might still be running:
+        # wait for it without holding the GIL so that the application threads are not stalled by a slow upload.
+        with nogil:
+            ddup_upload_wait()
         ddup_upload()
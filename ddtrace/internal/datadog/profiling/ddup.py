@@ -14,6 +14,8 @@ except ImportError:
         def wrapper(*args, **kwargs):
             raise NotImplementedError("{} is not implemented on this platform".format(func.__name__))
 
+        return wrapper
+
     @not_implemented
     def init(
         env,  # type: Optional[str]
@@ -25,65 +27,66 @@ except ImportError:
     ):
         pass
 
-    @not_implemented
-    def start_sample(nframes):  # type: (int) -> None
-        pass
+    class SampleHandle(object):
+        @not_implemented
+        def push_cputime(self, value, count):  # type: (int, int) -> None
+            pass
 
-    @not_implemented
-    def push_cputime(value, count):  # type: (int, int) -> None
-        pass
+        @not_implemented
+        def push_walltime(self, value, count):  # type: (int, int) -> None
+            pass
 
-    @not_implemented
-    def push_walltime(value, count):  # type: (int, int) -> None
-        pass
+        @not_implemented
+        def push_acquire(self, value, count):  # type: (int, int) -> None
+            pass
 
-    @not_implemented
-    def push_acquire(value, count):  # type: (int, int) -> None
-        pass
+        @not_implemented
+        def push_release(self, value, count):  # type: (int, int) -> None
+            pass
 
-    @not_implemented
-    def push_release(value, count):  # type: (int, int) -> None
-        pass
+        @not_implemented
+        def push_alloc(self, value, count):  # type: (int, int) -> None
+            pass
 
-    @not_implemented
-    def push_alloc(value, count):  # type: (int, int) -> None
-        pass
+        @not_implemented
+        def push_heap(self, value):  # type: (int) -> None
+            pass
 
-    @not_implemented
-    def push_heap(value):  # type: (int) -> None
-        pass
+        @not_implemented
+        def push_lock_name(self, lock_name):  # type: (str) -> None
+            pass
 
-    @not_implemented
-    def push_lock_name(lock_name):  # type: (str) -> None
-        pass
+        @not_implemented
+        def push_frame(self, name, filename, address, line):  # type: (str, str, int, int) -> None
+            pass
 
-    @not_implemented
-    def push_frame(name, filename, address, line):  # type: (str, str, int, int) -> None
-        pass
+        @not_implemented
+        def push_threadinfo(self, thread_id, thread_native_id, thread_name):  # type: (int, int, Optional[str]) -> None
+            pass
 
-    @not_implemented
-    def push_threadinfo(thread_id, thread_native_id, thread_name):  # type: (int, int, Optional[str]) -> None
-        pass
+        @not_implemented
+        def push_task_id(self, task_id):  # type: (int) -> None
+            pass
 
-    @not_implemented
-    def push_taskinfo(task_id, task_name):  # type: (int, str) -> None
-        pass
+        @not_implemented
+        def push_task_name(self, task_name):  # type: (str) -> None
+            pass
 
-    @not_implemented
-    def push_exceptioninfo(exc_type, count):  # type: (type, int) -> None
-        pass
+        @not_implemented
+        def push_exceptioninfo(self, exc_type, count):  # type: (type, int) -> None
+            pass
 
-    @not_implemented
-    def push_class_name(class_name):  # type: (str) -> None
-        pass
+        @not_implemented
+        def push_class_name(self, class_name):  # type: (str) -> None
+            pass
 
-    @not_implemented
-    def push_span(span, endpoint_collection_enabled):  # type: (Optional[Span], bool) -> None
-        pass
+        @not_implemented
+        def push_span(self, span, endpoint_collection_enabled):  # type: (Optional[Span], bool) -> None
+            pass
 
-    @not_implemented
-    def flush_sample():  # type: () -> None
-        pass
+        @not_implemented
+        def flush_sample(self):  # type: () -> None
+            pass
 
     @not_implemented
     def upload():  # type: () -> None
@@ -286,19 +286,27 @@ ddup_upload_impl(Datadog::Profile* prof)
     g_uploader->upload(prof);
 }
 
+// The profile is serialized, compressed and sent by this thread
+std::thread upload_thread;
+
+void
+ddup_upload_wait()
+{
+    if (upload_thread.joinable()) {
+        upload_thread.join();
+    }
+}
+
 void
 ddup_upload()
 {
-    static std::thread upload_thread;
     if (!is_initialized) {
         // Rationalize return for interface
         std::cout << "WHOA NOT INITIALIZED" << std::endl;
     }
 
-    if (upload_thread.joinable()) {
-        // The upload thread is still going.  We'll block on it.
-        upload_thread.join();
-    }
+    // The previous upload thread might still be going.  We'll block on it.
+    ddup_upload_wait();
     upload_thread = std::thread(ddup_upload_impl, g_profile);
 
     g_prof_flag ^= true;
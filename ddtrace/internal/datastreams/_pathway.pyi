@@ -0,0 +1,9 @@
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+def fnv1_64(data: bytes) -> int: ...
+def pathway_hash(node_hash: int, parent_hash: int) -> int: ...
+def decode_pathway(data: bytes) -> Tuple[int, int, int]: ...
+def decode_pathways(values: Iterable[Optional[bytes]]) -> List[Optional[Tuple[int, int, int]]]: ...
@@ -0,0 +1,127 @@
+"""
+Native codec for the data streams pathway contexts.
+
+An encoded pathway context is the little endian 64 bit hash of the pathway
+followed by the start of the pathway and the start of the current edge, in
+milliseconds, encoded as zigzag variable length integers.
+"""
+from libc.stdint cimport int64_t
+from libc.stdint cimport uint64_t
+
+
+cdef uint64_t FNV_64_PRIME = 0x100000001B3
+cdef uint64_t FNV1_64_INIT = 0xCBF29CE484222325
+cdef Py_ssize_t HASH_SIZE = 8
+cdef Py_ssize_t MAX_VAR_LEN_64 = 9
+
+
+cdef inline uint64_t _fnv1_64(const unsigned char *data, Py_ssize_t size, uint64_t hval):
+    cdef Py_ssize_t i
+
+    for i in range(size):
+        hval = hval * FNV_64_PRIME
+        hval = hval ^ data[i]
+    return hval
+
+
+cpdef uint64_t fnv1_64(const unsigned char[:] data):
+    """Return the 64 bit FNV-1 hash value for the given data.
+
+    See http://isthe.com/chongo/tech/comp/fnv/
+    """
+    if data.shape[0] == 0:
+        return FNV1_64_INIT
+    return _fnv1_64(&data[0], data.shape[0], FNV1_64_INIT)
+
+
+cpdef uint64_t pathway_hash(uint64_t node_hash, uint64_t parent_hash):
+    """Return the hash of a pathway from the hash of its last node and the hash of its parent.
+
+    This is the 64 bit FNV-1 hash of both hashes packed as little endian 64 bit integers.
+    """
+    cdef unsigned char data[16]
+    cdef int i
+
+    for i in range(8):
+        data[i] = (node_hash >> (8 * i)) & 0xFF
+        data[8 + i] = (parent_hash >> (8 * i)) & 0xFF
+    return _fnv1_64(data, 16, FNV1_64_INIT)
+
+
+cdef inline Py_ssize_t _decode_var_int_64(const unsigned char[:] data, Py_ssize_t pos, int64_t *value):
+    # Decode the zigzag variable length integer at the given position and
+    # return the position of the next one, or -1 if the data is too short.
+    cdef uint64_t x = 0
+    cdef uint64_t n
+    cdef int s = 0
+    cdef Py_ssize_t i
+
+    for i in range(MAX_VAR_LEN_64):
+        if pos + i >= data.shape[0]:
+            return -1
+        n = data[pos + i]
+        if n < 0x80 or i == MAX_VAR_LEN_64 - 1:
+            x |= n << s
+            value[0] = <int64_t>((x >> 1) ^ (-(x & 1)))
+            return pos + i + 1
+        x |= (n & 0x7F) << s
+        s += 7
+    return -1
+
+
+cdef tuple _decode_pathway(const unsigned char[:] data):
+    cdef uint64_t hash_value = 0
+    cdef int64_t pathway_start_ms
+    cdef int64_t current_edge_start_ms
+    cdef Py_ssize_t pos
+    cdef int i
+
+    if data.shape[0] < HASH_SIZE:
+        return None
+    for i in range(HASH_SIZE):
+        hash_value |= (<uint64_t>data[i]) << (8 * i)
+
+    pos = _decode_var_int_64(data, HASH_SIZE, &pathway_start_ms)
+    if pos < 0:
+        return None
+    pos = _decode_var_int_64(data, pos, &current_edge_start_ms)
+    if pos < 0:
+        return None
+    return hash_value, pathway_start_ms, current_edge_start_ms
+
+
+cpdef tuple decode_pathway(object data):
+    # type: (bytes) -> Tuple[int, int, int]
+    """Decode an encoded pathway context
+
+    :param bytes data: The encoded pathway context
+    :rtype: tuple
+    :returns: the hash of the pathway, the start of the pathway and the start of the current edge in milliseconds
+    :raises TypeError: When the data is not a bytes-like object
+    :raises EOFError: When the data is too short
+    """
+    if data is None:
+        raise TypeError("Cannot decode a pathway context from None")
+    decoded = _decode_pathway(data)
+    if decoded is None:
+        raise EOFError()
+    return decoded
+
+
+cpdef list decode_pathways(object values):
+    # type: (Iterable[Optional[bytes]]) -> List[Optional[Tuple[int, int, int]]]
+    """Decode the encoded pathway contexts of a batch of messages in a single pass
+
+    :param values: The encoded pathway contexts, ``None`` for the messages without one
+    :rtype: list
+    :returns: the decoded pathway contexts, as returned by :func:`decode_pathway`,
+        or ``None`` for the values that are missing or invalid
+    """
+    cdef list res = []
+
+    for value in values:
+        if isinstance(value, bytes) and len(value) > 0:
+            res.append(_decode_pathway(value))
+        else:
+            res.append(None)
+    return res
@@ -1,4 +1,8 @@
 import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 from confluent_kafka import TopicPartition
 
@@ -78,13 +82,7 @@ def dsm_kafka_message_produce(instance, args, kwargs):
         kwargs[on_delivery_kwarg] = wrapped_callback
 
 
-def dsm_kafka_message_consume(instance, message):
-    from . import data_streams_processor as processor
-
-    headers = {header[0]: header[1] for header in (message.headers() or [])}
-    topic = core.get_item("kafka_topic")
-    group = instance._group_id
-
+def _calculate_message_size(message, headers):
     payload_size = 0
     if hasattr(message, "len"):
         # message.len() is only supported for some versions of confluent_kafka
@@ -94,6 +92,17 @@ def dsm_kafka_message_consume(instance, message):
 
     payload_size += _calculate_byte_size(message.key())
     payload_size += _calculate_byte_size(headers)
+    return payload_size
+
+
+def dsm_kafka_message_consume(instance, message):
+    from . import data_streams_processor as processor
+
+    headers = {header[0]: header[1] for header in (message.headers() or [])}
+    topic = core.get_item("kafka_topic")
+    group = instance._group_id
+
+    payload_size = _calculate_message_size(message, headers)
 
     ctx = processor().decode_pathway(headers.get(PROPAGATION_KEY, None))
     ctx.set_checkpoint(["direction:in", "group:" + group, "topic:" + topic, "type:kafka"], payload_size=payload_size)
@@ -107,6 +116,43 @@ def dsm_kafka_message_consume(instance, message):
         )
 
 
+def dsm_kafka_messages_consume(instance, messages):
+    from . import data_streams_processor as processor
+
+    group = instance._group_id
+
+    # The pathway contexts and sizes of the messages, by topic
+    batches = {}  # type: Dict[str, Tuple[List[Optional[bytes]], List[int]]]
+    # The latest offset read from each partition
+    offsets = {}  # type: Dict[Tuple[str, int], int]
+    for message in messages:
+        if message.error() is not None:
+            continue
+        headers = {header[0]: header[1] for header in (message.headers() or [])}
+        topic = message.topic()
+        batch = batches.get(topic)
+        if batch is None:
+            batch = batches[topic] = ([], [])
+        batch[0].append(headers.get(PROPAGATION_KEY, None))
+        batch[1].append(_calculate_message_size(message, headers))
+
+        if instance._auto_commit:
+            reported_offset = message.offset() if isinstance(message.offset(), INT_TYPES) else -1
+            key = (topic, message.partition())
+            offsets[key] = max(reported_offset, offsets.get(key, -1))
+
+    now_sec = time.time()
+    for topic, (pathways, payload_sizes) in batches.items():
+        processor().set_consume_checkpoints(
+            ["direction:in", "group:" + group, "topic:" + topic, "type:kafka"], pathways, payload_sizes, now_sec=now_sec
+        )
+
+    # If auto commit is enabled, we consider that a message is acknowledged when it's read,
+    # so only the latest offset read from each partition needs to be tracked.
+    for (topic, partition), offset in offsets.items():
+        processor().track_kafka_commit(group, topic, partition, offset, now_sec)
+
+
 def dsm_kafka_message_commit(instance, args, kwargs):
     from . import data_streams_processor as processor
 
@@ -133,4 +179,5 @@ def dsm_kafka_message_commit(instance, args, kwargs):
 if config._data_streams_enabled:
     core.on("kafka.produce.start", dsm_kafka_message_produce)
     core.on("kafka.consume.start", dsm_kafka_message_consume)
+    core.on("kafka.consume_batch.start", dsm_kafka_messages_consume)
     core.on("kafka.commit.start", dsm_kafka_message_commit)
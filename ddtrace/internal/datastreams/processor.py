@@ -6,6 +6,7 @@ import gzip
 import os
 import struct
 import threading
+from threading import get_ident
 import time
 import typing
 from typing import DefaultDict
@@ -25,16 +26,20 @@ from ddtrace.internal.atexit import register_on_exit_signal
 from ddtrace.internal.utils.retry import fibonacci_backoff_with_jitter
 
 from .._encoding import packb
+from .._sketch import SketchAccumulator
 from ..agent import get_connection
 from ..compat import get_connection_response
 from ..forksafe import Lock
 from ..hostname import get_hostname
 from ..logger import get_logger
 from ..periodic import PeriodicService
+from ..utils.cache import cached
 from ..writer import _human_size
-from .encoding import decode_var_int_64
+from ._pathway import decode_pathway
+from ._pathway import decode_pathways
+from ._pathway import fnv1_64
+from ._pathway import pathway_hash
 from .encoding import encode_var_int_64
-from .fnv import fnv1_64
 
 
 if six.PY3:
@@ -72,6 +77,16 @@ PROPAGATION_KEY = "dd-pathway-ctx"
 PROPAGATION_KEY_BASE_64 = "dd-pathway-ctx-base64"
 SHUTDOWN_TIMEOUT = 5
 
+# Match the relative accuracy of the sketch implementation used in the backend
+# which is 0.775%.
+_SKETCH_RELATIVE_ACCURACY = 0.00775
+_SKETCH_BIN_LIMIT = 2048
+
+# Number of independently locked shards the pathway stats are accumulated into
+# in high-throughput mode. Checkpoints are assigned to a shard by the thread
+# that creates them, so that threads rarely contend on the same lock.
+_STATS_SHARDS = 11
+
 """
 PathwayAggrKey uniquely identifies a pathway to aggregate stats on.
 """
@@ -88,9 +103,37 @@ class PathwayStats(object):
     __slots__ = ("full_pathway_latency", "edge_latency", "payload_size")
 
     def __init__(self):
-        self.full_pathway_latency = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
-        self.edge_latency = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
-        self.payload_size = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
+        self.full_pathway_latency = LogCollapsingLowestDenseDDSketch(
+            _SKETCH_RELATIVE_ACCURACY, bin_limit=_SKETCH_BIN_LIMIT
+        )
+        self.edge_latency = LogCollapsingLowestDenseDDSketch(_SKETCH_RELATIVE_ACCURACY, bin_limit=_SKETCH_BIN_LIMIT)
+        self.payload_size = LogCollapsingLowestDenseDDSketch(_SKETCH_RELATIVE_ACCURACY, bin_limit=_SKETCH_BIN_LIMIT)
+
+
+class PathwayStatsAccumulator(object):
+    """Pathway statistics accumulated by the threads in high-throughput mode.
+
+    The values are only accumulated into bins when checkpoints are created and
+    encoded as sketches when the stats are serialized.
+    """
+
+    __slots__ = ("full_pathway_latency", "edge_latency", "payload_size")
+
+    def __init__(self):
+        self.full_pathway_latency = SketchAccumulator(_SKETCH_RELATIVE_ACCURACY)
+        self.edge_latency = SketchAccumulator(_SKETCH_RELATIVE_ACCURACY)
+        self.payload_size = SketchAccumulator(_SKETCH_RELATIVE_ACCURACY)
+
+    def merge(self, other):
+        # type: (PathwayStatsAccumulator) -> None
+        self.full_pathway_latency.merge(other.full_pathway_latency)
+        self.edge_latency.merge(other.edge_latency)
+        self.payload_size.merge(other.payload_size)
+
+
+def _new_shard_stats():
+    # type: () -> DefaultDict[int, Dict[PathwayAggrKey, PathwayStatsAccumulator]]
+    return defaultdict(dict)
 
 
 PartitionKey = NamedTuple("PartitionKey", [("topic", str), ("partition", int)])
@@ -131,6 +174,11 @@ class DataStreamsProcessor(PeriodicService):
         self._hostname = six.ensure_text(get_hostname())
         self._service = six.ensure_text(config._get_service("unnamed-python-service"))
         self._lock = Lock()
+        self._high_throughput = config._data_streams_high_throughput_enabled
+        self._shard_locks = [Lock() for _ in range(_STATS_SHARDS)]
+        self._shard_stats = [
+            _new_shard_stats() for _ in range(_STATS_SHARDS)
+        ]  # type: List[DefaultDict[int, Dict[PathwayAggrKey, PathwayStatsAccumulator]]]
         self._current_context = threading.local()
         self._enabled = True
 
@@ -165,16 +213,66 @@ class DataStreamsProcessor(PeriodicService):
             return
 
         now_ns = int(now_sec * 1e9)
+        # Align the checkpoint into the corresponding stats bucket
+        bucket_time_ns = now_ns - (now_ns % self._bucket_size_ns)
+        aggr_key = (",".join(edge_tags), hash_value, parent_hash)
+
+        if self._high_throughput:
+            shard = get_ident() % _STATS_SHARDS
+            with self._shard_locks[shard]:
+                bucket = self._shard_stats[shard][bucket_time_ns]
+                accumulator = bucket.get(aggr_key)
+                if accumulator is None:
+                    accumulator = bucket[aggr_key] = PathwayStatsAccumulator()
+                accumulator.full_pathway_latency.add(full_pathway_latency_sec)
+                accumulator.edge_latency.add(edge_latency_sec)
+                accumulator.payload_size.add(payload_size)
+            return
 
         with self._lock:
-            # Align the span into the corresponding stats bucket
-            bucket_time_ns = now_ns - (now_ns % self._bucket_size_ns)
-            aggr_key = (",".join(edge_tags), hash_value, parent_hash)
             stats = self._buckets[bucket_time_ns].pathway_stats[aggr_key]
             stats.full_pathway_latency.add(full_pathway_latency_sec)
             stats.edge_latency.add(edge_latency_sec)
             stats.payload_size.add(payload_size)
-            self._buckets[bucket_time_ns].pathway_stats[aggr_key] = stats
+
+    def on_checkpoints_creation(
+        self, hash_value, parent_hash, edge_tags, now_sec, edge_latencies_sec, full_pathway_latencies_sec, payload_sizes
+    ):
+        # type: (int, int, List[str], float, List[float], List[float], List[int]) -> None
+        """
+        on_checkpoints_creation is called when checkpoints are created at the same time on the same pathway
+        by a batch of messages. It is equivalent to calling on_checkpoint_creation for each message, but the
+        stats of the pathway are only looked up, and their lock only acquired, once for the whole batch.
+
+        :param hash_value: hash of the pathway
+        :param parent_hash: hash of the previous step in the pathway
+        :param edge_tags: all tags associated with the edge leading to this step in the pathway
+        :param now_sec: current time
+        :param edge_latencies_sec: the edge latency of each message
+        :param full_pathway_latencies_sec: the full pathway latency of each message
+        :param payload_sizes: the payload size of each message
+        :return: Nothing
+        """
+        if not self._enabled:
+            return
+
+        now_ns = int(now_sec * 1e9)
+        bucket_time_ns = now_ns - (now_ns % self._bucket_size_ns)
+        aggr_key = (",".join(edge_tags), hash_value, parent_hash)
+
+        if self._high_throughput:
+            shard = get_ident() % _STATS_SHARDS
+            with self._shard_locks[shard]:
+                bucket = self._shard_stats[shard][bucket_time_ns]
+                accumulator = bucket.get(aggr_key)
+                if accumulator is None:
+                    accumulator = bucket[aggr_key] = PathwayStatsAccumulator()
+                _add_checkpoints(accumulator, edge_latencies_sec, full_pathway_latencies_sec, payload_sizes)
+            return
+
+        with self._lock:
+            stats = self._buckets[bucket_time_ns].pathway_stats[aggr_key]
+            _add_checkpoints(stats, edge_latencies_sec, full_pathway_latencies_sec, payload_sizes)
 
     def track_kafka_produce(self, topic, partition, offset, now_sec):
         now_ns = int(now_sec * 1e9)
@@ -194,26 +292,62 @@ class DataStreamsProcessor(PeriodicService):
                 offset, self._buckets[bucket_time_ns].latest_commit_offsets[key]
             )
 
+    def _take_shard_stats(self):
+        # type: () -> Dict[int, Dict[PathwayAggrKey, PathwayStatsAccumulator]]
+        """Take the pathway stats accumulated by the threads out of all the shards.
+
+        Each shard is only locked for the time it takes to swap its stats with
+        empty ones. The stats of the same pathway in different shards are merged.
+        """
+        stats = defaultdict(dict)  # type: DefaultDict[int, Dict[PathwayAggrKey, PathwayStatsAccumulator]]
+        for shard, lock in enumerate(self._shard_locks):
+            with lock:
+                shard_stats = self._shard_stats[shard]
+                if not shard_stats:
+                    continue
+                self._shard_stats[shard] = _new_shard_stats()
+
+            for bucket_time_ns, bucket in shard_stats.items():
+                merged = stats[bucket_time_ns]
+                for aggr_key, accumulator in bucket.items():
+                    if aggr_key in merged:
+                        merged[aggr_key].merge(accumulator)
+                    else:
+                        merged[aggr_key] = accumulator
+        return stats
+
     def _serialize_buckets(self):
         # type: () -> List[Dict]
         """Serialize and update the buckets."""
         serialized_buckets = []
         serialized_bucket_keys = []
+        shard_stats = self._take_shard_stats() if self._high_throughput else {}
+        for bucket_time_ns in shard_stats:
+            # Make sure the buckets with accumulated stats are serialized
+            self._buckets[bucket_time_ns]
+
         for bucket_time_ns, bucket in self._buckets.items():
             bucket_aggr_stats = []
             backlogs = []
             serialized_bucket_keys.append(bucket_time_ns)
 
             for aggr_key, stat_aggr in bucket.pathway_stats.items():
-                edge_tags, hash_value, parent_hash = aggr_key
-                serialized_bucket = {
-                    u"EdgeTags": [six.ensure_text(tag) for tag in edge_tags.split(",")],
-                    u"Hash": hash_value,
-                    u"ParentHash": parent_hash,
-                    u"PathwayLatency": DDSketchProto.to_proto(stat_aggr.full_pathway_latency).SerializeToString(),
-                    u"EdgeLatency": DDSketchProto.to_proto(stat_aggr.edge_latency).SerializeToString(),
-                }
-                bucket_aggr_stats.append(serialized_bucket)
+                bucket_aggr_stats.append(
+                    _serialize_pathway_stats(
+                        aggr_key,
+                        DDSketchProto.to_proto(stat_aggr.full_pathway_latency).SerializeToString(),
+                        DDSketchProto.to_proto(stat_aggr.edge_latency).SerializeToString(),
+                    )
+                )
+            for aggr_key, accumulator in shard_stats.get(bucket_time_ns, {}).items():
+                # The accumulated bins are encoded directly, without building sketches
+                bucket_aggr_stats.append(
+                    _serialize_pathway_stats(
+                        aggr_key,
+                        accumulator.full_pathway_latency.to_proto(_SKETCH_BIN_LIMIT),
+                        accumulator.edge_latency.to_proto(_SKETCH_BIN_LIMIT),
+                    )
+                )
             for consumer_key, offset in bucket.latest_commit_offsets.items():
                 backlogs.append(
                     {
@@ -312,10 +446,7 @@ class DataStreamsProcessor(PeriodicService):
     def decode_pathway(self, data):
         # type: (bytes) -> DataStreamsCtx
         try:
-            hash_value = struct.unpack("<Q", data[:8])[0]
-            data = data[8:]
-            pathway_start_ms, data = decode_var_int_64(data)
-            current_edge_start_ms, data = decode_var_int_64(data)
+            hash_value, pathway_start_ms, current_edge_start_ms = decode_pathway(data)
             ctx = DataStreamsCtx(self, hash_value, float(pathway_start_ms) / 1e3, float(current_edge_start_ms) / 1e3)
             # reset context of current thread every time we decode
             self._current_context.value = ctx
@@ -367,6 +498,116 @@ class DataStreamsProcessor(PeriodicService):
         ctx.set_checkpoint(tags, now_sec=now_sec, payload_size=payload_size)
         return ctx
 
+    def set_consume_checkpoints(self, tags, pathways, payload_sizes, now_sec=None):
+        # type: (List[str], List[Optional[bytes]], List[int], Optional[float]) -> Optional[DataStreamsCtx]
+        """
+        Create the checkpoints of a batch of messages consumed at the same time.
+
+        This is equivalent to decoding the pathway context of each message and setting a checkpoint on it,
+        but the contexts are decoded natively in a single pass, and the hash and stats of each distinct
+        parent pathway are only computed and recorded once for the whole batch.
+
+        :param tags: a list of strings identifying the pathway and direction
+        :param pathways: the encoded pathway context of each message, None for the messages without one
+        :param payload_sizes: the size of each message in bytes
+        :param now_sec: The time in seconds to count as "now" when computing latencies
+        :return: the context of the last message of the batch, which becomes the current context
+        """
+        if not pathways:
+            return None
+        if not now_sec:
+            now_sec = time.time()
+        tags = sorted(tags)
+        direction = next((t for t in tags if t.startswith("direction:")), "")
+
+        # The edge latencies, full pathway latencies and payload sizes of the messages by parent hash
+        checkpoints = {}  # type: Dict[int, typing.Tuple[List[float], List[float], List[int]]]
+        parent_hash, pathway_start_sec = 0, now_sec
+        for decoded, payload_size in zip(decode_pathways(pathways), payload_sizes):
+            if decoded is None or not direction:
+                # Same as a checkpoint on a new pathway
+                parent_hash, pathway_start_sec, current_edge_start_sec = 0, now_sec, now_sec
+            else:
+                parent_hash, pathway_start_ms, current_edge_start_ms = decoded
+                pathway_start_sec = float(pathway_start_ms) / 1e3
+                current_edge_start_sec = float(current_edge_start_ms) / 1e3
+            stats = checkpoints.get(parent_hash)
+            if stats is None:
+                stats = checkpoints[parent_hash] = ([], [], [])
+            stats[0].append(now_sec - current_edge_start_sec)
+            stats[1].append(now_sec - pathway_start_sec)
+            stats[2].append(payload_size)
+
+        ctx = DataStreamsCtx(self, 0, pathway_start_sec, now_sec)
+        key = (ctx.service, ctx.env, tuple(tags))
+        for parent, (edge_latencies_sec, full_pathway_latencies_sec, sizes) in checkpoints.items():
+            hash_value = _cached_pathway_hash(key + (parent,))
+            if parent == parent_hash:
+                ctx.hash = hash_value
+            self.on_checkpoints_creation(
+                hash_value, parent, tags, now_sec, edge_latencies_sec, full_pathway_latencies_sec, sizes
+            )
+
+        # Leave the context of the last message as it would be after setting its checkpoint
+        ctx.previous_direction = direction
+        ctx.closest_opposite_direction_hash = parent_hash
+        ctx.closest_opposite_direction_edge_start = now_sec
+        self._current_context.value = ctx
+        return ctx
+
+
+def _serialize_pathway_stats(aggr_key, pathway_latency, edge_latency):
+    # type: (PathwayAggrKey, bytes, bytes) -> Dict
+    edge_tags, hash_value, parent_hash = aggr_key
+    return {
+        u"EdgeTags": [six.ensure_text(tag) for tag in edge_tags.split(",")],
+        u"Hash": hash_value,
+        u"ParentHash": parent_hash,
+        u"PathwayLatency": pathway_latency,
+        u"EdgeLatency": edge_latency,
+    }
+
+
+def _compute_pathway_hash(service, env, tags, parent_hash):
+    # type: (str, str, typing.Iterable[str], int) -> int
+    if six.PY3:
+
+        def get_bytes(s):
+            return bytes(s, encoding="utf-8")
+
+    else:
+
+        def get_bytes(s):
+            return bytes(s)
+
+    b = get_bytes(service) + get_bytes(env)
+    for t in tags:
+        b += get_bytes(t)
+    return pathway_hash(fnv1_64(b), parent_hash)
+
+
+def _add_checkpoints(stats, edge_latencies_sec, full_pathway_latencies_sec, payload_sizes):
+    # type: (Union[PathwayStats, PathwayStatsAccumulator], List[float], List[float], List[int]) -> None
+    add = stats.edge_latency.add
+    for value in edge_latencies_sec:
+        add(value)
+    add = stats.full_pathway_latency.add
+    for value in full_pathway_latencies_sec:
+        add(value)
+    add = stats.payload_size.add
+    for value in payload_sizes:
+        add(value)
+
+
+@cached(maxsize=1024)
+def _cached_pathway_hash(key):
+    # type: (typing.Tuple[str, str, typing.Tuple[str, ...], int]) -> int
+    """Return the hash of the edge identified by the given service, env, tags and parent hash.
+
+    Services create checkpoints on a few edges only, so their hash is computed once per edge.
+    """
+    return _compute_pathway_hash(*key)
+
 
 class DataStreamsCtx:
     def __init__(self, processor, hash_value, pathway_start_sec, current_edge_start_sec):
@@ -398,21 +639,7 @@ class DataStreamsCtx:
         return data_streams_context
 
     def _compute_hash(self, tags, parent_hash):
-        if six.PY3:
-
-            def get_bytes(s):
-                return bytes(s, encoding="utf-8")
-
-        else:
-
-            def get_bytes(s):
-                return bytes(s)
-
-        b = get_bytes(self.service) + get_bytes(self.env)
-        for t in tags:
-            b += get_bytes(t)
-        node_hash = fnv1_64(b)
-        return fnv1_64(struct.pack("<Q", node_hash) + struct.pack("<Q", parent_hash))
+        return _compute_pathway_hash(self.service, self.env, tags, parent_hash)
 
     def set_checkpoint(
         self, tags, now_sec=None, edge_start_sec_override=None, pathway_start_sec_override=None, payload_size=0
@@ -454,7 +681,7 @@ class DataStreamsCtx:
             self.pathway_start_sec = pathway_start_sec_override
 
         parent_hash = self.hash
-        hash_value = self._compute_hash(tags, parent_hash)
+        hash_value = _cached_pathway_hash((self.service, self.env, tuple(tags), parent_hash))
         edge_latency_sec = now_sec - self.current_edge_start_sec
         pathway_latency_sec = now_sec - self.pathway_start_sec
         self.hash = hash_value
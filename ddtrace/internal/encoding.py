@@ -76,11 +76,11 @@ class _EncoderBase(object):
         if span.duration_ns:
             d["duration"] = span.duration_ns
 
-        if span._meta:
-            d["meta"] = span._meta
+        if span._meta_dict:
+            d["meta"] = span._meta_dict
 
-        if span._metrics:
-            d["metrics"] = span._metrics
+        if span._metrics_dict:
+            d["metrics"] = span._metrics_dict
 
         if span.span_type:
             d["type"] = span.span_type
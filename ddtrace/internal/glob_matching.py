@@ -1,3 +1,7 @@
+import re
+from typing import Optional
+from typing import Pattern
+
 from .utils.cache import cachedmethod
 
 
@@ -5,15 +9,33 @@ class GlobMatcher(object):
     """This is a backtracking implementation of the glob matching algorithm.
     The glob pattern language supports `*` as a multiple character wildcard which includes matches on `""`
     and `?` as a single character wildcard, but no escape sequences.
-    The match method will be cached for quicker matching and is in a class to keep it from being global.
+    Patterns without wildcards are compared directly and patterns with at most
+    one `*` are compiled to a regular expression, which cannot backtrack
+    excessively. Other patterns use the backtracking algorithm, whose results
+    are cached for quicker matching.
     """
 
     def __init__(self, pattern):
         # type: (str) -> None
         self.pattern = pattern
+        self._literal = "*" not in pattern and "?" not in pattern
+        self._regex = None  # type: Optional[Pattern[str]]
+        if not self._literal and pattern.count("*") <= 1:
+            self._regex = re.compile(
+                "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern) + r"\Z",
+                re.DOTALL,
+            )
 
-    @cachedmethod()
     def match(self, subject):
+        # type: (str) -> bool
+        if self._literal:
+            return subject == self.pattern
+        if self._regex is not None:
+            return self._regex.match(subject) is not None
+        return self._match_backtracking(subject)
+
+    @cachedmethod()
+    def _match_backtracking(self, subject):
         # type: (str) -> bool
         pattern = self.pattern
         px = 0  # [p]attern inde[x]
@@ -99,6 +99,49 @@ class AwakeablePeriodicThread(PeriodicThread):
             self._on_shutdown()
 
 
+class WakeablePeriodicThread(PeriodicThread):
+    """Periodic thread that can be woken up to run its target early.
+
+    Unlike :class:`AwakeablePeriodicThread`, waking up the thread does not
+    wait for the target function to have run, so it is cheap enough to be
+    done from any thread.
+    """
+
+    def __init__(
+        self,
+        interval,  # type: float
+        target,  # type: typing.Callable[[], typing.Any]
+        name=None,  # type: typing.Optional[str]
+        on_shutdown=None,  # type: typing.Optional[typing.Callable[[], typing.Any]]
+    ):
+        # type: (...) -> None
+        """Create a periodic thread that can be woken up early."""
+        super(WakeablePeriodicThread, self).__init__(interval, target, name, on_shutdown)
+        self.wakeup_request = forksafe.Event()
+
+    def wakeup(self):
+        # type: () -> None
+        """Run the target function as soon as possible."""
+        self.wakeup_request.set()
+
+    def stop(self):
+        """Stop the thread."""
+        if self.is_alive():
+            self.quit.set()
+            self.wakeup_request.set()
+
+    def run(self):
+        """Run the target function periodically or when woken up."""
+        while True:
+            self.wakeup_request.wait(self.interval)
+            self.wakeup_request.clear()
+            if self.quit.is_set():
+                break
+            self._target()
+        if self._on_shutdown is not None:
+            self._on_shutdown()
+
+
 @attr.s(eq=False)
 class PeriodicService(service.Service):
     """A service that runs periodically."""
@@ -164,3 +207,15 @@ class AwakeablePeriodicService(PeriodicService):
     def awake(self):
         # type: (...) -> None
         self._worker.awake()
+
+
+class WakeablePeriodicService(PeriodicService):
+    """A service that runs periodically but that can also be woken up to run early."""
+
+    __thread_class__ = WakeablePeriodicThread
+
+    def wakeup(self):
+        # type: (...) -> None
+        worker = self._worker
+        if worker is not None:
+            worker.wakeup()
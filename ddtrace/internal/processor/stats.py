@@ -1,6 +1,7 @@
 # coding: utf-8
 from collections import defaultdict
 import os
+from threading import get_ident
 import typing
 
 from ddsketch import LogCollapsingLowestDenseDDSketch
@@ -14,6 +15,7 @@ from ddtrace.span import _is_top_level
 
 from ...constants import SPAN_MEASURED_KEY
 from .._encoding import packb
+from .._sketch import SketchAccumulator
 from ..agent import get_connection
 from ..compat import get_connection_response
 from ..forksafe import Lock
@@ -36,11 +38,22 @@ if typing.TYPE_CHECKING:  # pragma: no cover
 
 log = get_logger(__name__)
 
+# Match the relative accuracy of the sketch implementation used in the backend
+# which is 0.775%.
+_SKETCH_RELATIVE_ACCURACY = 0.00775
+_SKETCH_BIN_LIMIT = 2048
+
+# Number of independently locked shards the stats are aggregated into. Spans
+# are assigned to a shard by the thread that finishes them so that threads
+# finishing spans concurrently rarely contend on the same lock. A prime number
+# spreads the thread identifiers, which are addresses, across the shards.
+_STATS_SHARDS = 11
+
 
 def _is_measured(span):
     # type: (Span) -> bool
     """Return whether the span is flagged to be measured or not."""
-    return span._metrics.get(SPAN_MEASURED_KEY) == 1
+    return span.get_metric(SPAN_MEASURED_KEY) == 1
 
 
 """
@@ -70,10 +83,20 @@ class SpanAggrStats(object):
         self.top_level_hits = 0
         self.errors = 0
         self.duration = 0
-        # Match the relative accuracy of the sketch implementation used in the backend
-        # which is 0.775%.
-        self.ok_distribution = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
-        self.err_distribution = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
+        # The durations are only accumulated into bins when spans finish and
+        # turned into sketches when the stats are serialized.
+        self.ok_distribution = SketchAccumulator(_SKETCH_RELATIVE_ACCURACY)
+        self.err_distribution = SketchAccumulator(_SKETCH_RELATIVE_ACCURACY)
+
+
+def _new_sketch():
+    # type: () -> LogCollapsingLowestDenseDDSketch
+    return LogCollapsingLowestDenseDDSketch(_SKETCH_RELATIVE_ACCURACY, bin_limit=_SKETCH_BIN_LIMIT)
+
+
+def _new_buckets():
+    # type: () -> DefaultDict[int, DefaultDict[SpanAggrKey, SpanAggrStats]]
+    return defaultdict(lambda: defaultdict(SpanAggrStats))
 
 
 def _span_aggr_key(span):
@@ -101,9 +124,10 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         self._timeout = timeout
         # Have the bucket size match the interval in which flushes occur.
         self._bucket_size_ns = int(interval * 1e9)  # type: int
-        self._buckets = defaultdict(
-            lambda: defaultdict(SpanAggrStats)
-        )  # type: DefaultDict[int, DefaultDict[SpanAggrKey, SpanAggrStats]]
+        self._shard_locks = [Lock() for _ in range(_STATS_SHARDS)]
+        self._shard_buckets = [
+            _new_buckets() for _ in range(_STATS_SHARDS)
+        ]  # type: List[DefaultDict[int, DefaultDict[SpanAggrKey, SpanAggrStats]]]
         self._headers = {
             "Datadog-Meta-Lang": "python",
             "Datadog-Meta-Tracer-Version": ddtrace.__version__,
@@ -133,13 +157,15 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         if not is_top_level and not _is_measured(span):
             return
 
-        with self._lock:
-            # Align the span into the corresponding stats bucket
-            assert span.duration_ns is not None
-            span_end_ns = span.start_ns + span.duration_ns
-            bucket_time_ns = span_end_ns - (span_end_ns % self._bucket_size_ns)
-            aggr_key = _span_aggr_key(span)
-            stats = self._buckets[bucket_time_ns][aggr_key]
+        # Align the span into the corresponding stats bucket
+        assert span.duration_ns is not None
+        span_end_ns = span.start_ns + span.duration_ns
+        bucket_time_ns = span_end_ns - (span_end_ns % self._bucket_size_ns)
+        aggr_key = _span_aggr_key(span)
+
+        shard = get_ident() % _STATS_SHARDS
+        with self._shard_locks[shard]:
+            stats = self._shard_buckets[shard][bucket_time_ns][aggr_key]
 
             stats.hits += 1
             stats.duration += span.duration_ns
@@ -151,31 +177,59 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
             else:
                 stats.ok_distribution.add(span.duration_ns)
 
-    def _serialize_buckets(self):
-        # type: () -> List[Dict]
-        """Serialize and update the buckets.
+    def _take_buckets(self):
+        # type: () -> Dict[int, Dict[SpanAggrKey, List[SpanAggrStats]]]
+        """Take the buckets out of all the shards.
 
-        The current bucket is left in case any other spans are added.
+        Each shard is only locked for the time it takes to swap its buckets
+        with empty ones. The stats of an aggregation key are returned per
+        shard and merged when they are serialized.
         """
+        buckets = defaultdict(
+            lambda: defaultdict(list)
+        )  # type: DefaultDict[int, DefaultDict[SpanAggrKey, List[SpanAggrStats]]]
+        for shard, lock in enumerate(self._shard_locks):
+            with lock:
+                shard_buckets = self._shard_buckets[shard]
+                if not shard_buckets:
+                    continue
+                self._shard_buckets[shard] = _new_buckets()
+
+            for bucket_time_ns, bucket in shard_buckets.items():
+                for aggr_key, stats in bucket.items():
+                    buckets[bucket_time_ns][aggr_key].append(stats)
+        return buckets
+
+    def _serialize_buckets(self):
+        # type: () -> List[Dict]
+        """Serialize the buckets and remove them from the shards."""
         serialized_buckets = []
-        serialized_bucket_keys = []
-        for bucket_time_ns, bucket in self._buckets.items():
+        for bucket_time_ns, bucket in self._take_buckets().items():
             bucket_aggr_stats = []
-            serialized_bucket_keys.append(bucket_time_ns)
 
-            for aggr_key, stat_aggr in bucket.items():
+            for aggr_key, shard_stats in bucket.items():
                 name, service, resource, _type, http_status, synthetics = aggr_key
+                hits = top_level_hits = errors = duration = 0
+                ok_distribution = _new_sketch()
+                err_distribution = _new_sketch()
+                for stat_aggr in shard_stats:
+                    hits += stat_aggr.hits
+                    top_level_hits += stat_aggr.top_level_hits
+                    errors += stat_aggr.errors
+                    duration += stat_aggr.duration
+                    stat_aggr.ok_distribution.flush_into(ok_distribution)
+                    stat_aggr.err_distribution.flush_into(err_distribution)
                 serialized_bucket = {
                     u"Name": six.ensure_text(name),
                     u"Resource": six.ensure_text(resource),
                     u"Synthetics": synthetics,
                     u"HTTPStatusCode": http_status,
-                    u"Hits": stat_aggr.hits,
-                    u"TopLevelHits": stat_aggr.top_level_hits,
-                    u"Duration": stat_aggr.duration,
-                    u"Errors": stat_aggr.errors,
-                    u"OkSummary": DDSketchProto.to_proto(stat_aggr.ok_distribution).SerializeToString(),
-                    u"ErrorSummary": DDSketchProto.to_proto(stat_aggr.err_distribution).SerializeToString(),
+                    u"Hits": hits,
+                    u"TopLevelHits": top_level_hits,
+                    u"Duration": duration,
+                    u"Errors": errors,
+                    u"OkSummary": DDSketchProto.to_proto(ok_distribution).SerializeToString(),
+                    u"ErrorSummary": DDSketchProto.to_proto(err_distribution).SerializeToString(),
                 }
                 if service:
                     serialized_bucket[u"Service"] = six.ensure_text(service)
@@ -190,10 +244,6 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
                 }
             )
 
-        # Clear out buckets that have been serialized
-        for key in serialized_bucket_keys:
-            del self._buckets[key]
-
         return serialized_buckets
 
     def _flush_stats(self, payload):
@@ -1,7 +1,10 @@
 import abc
 from collections import defaultdict
+from collections import deque
+import sys
 from threading import Lock
 from threading import RLock
+from typing import Deque
 from typing import Dict
 from typing import Iterable
 from typing import List
@@ -158,6 +161,12 @@ class TraceTagsProcessor(TraceProcessor):
         return trace
 
 
+# Number of independently locked shards traces are assembled in. Spans are
+# assigned to a shard by their trace id so that threads working on different
+# traces rarely contend on the same lock.
+_TRACE_SHARDS = 16
+
+
 @attr.s
 class SpanAggregator(SpanProcessor):
     """Processor that aggregates spans together by trace_id and writes the
@@ -167,6 +176,16 @@ class SpanAggregator(SpanProcessor):
           the trace_id have finished; or
         - A minimum threshold of spans (``partial_flush_min_spans``) have been
           finished in the collection and ``partial_flush_enabled`` is True.
+
+    The traces are spread across shards, each with its own lock. The trace
+    processors are applied and the spans are handed to the writer after the
+    lock of the shard has been released.
+
+    To bound the memory used by spans that are never finished, the oldest
+    traces of a shard are evicted when the shard holds more than its share of
+    ``max_spans`` while more than ``max_spans`` spans are held in total, or
+    when they are older than ``max_trace_age_ns``. The finished spans of an
+    evicted trace are flushed and its unfinished spans are dropped.
     """
 
     @attr.s
@@ -174,47 +193,132 @@ class SpanAggregator(SpanProcessor):
         spans = attr.ib(default=attr.Factory(list))  # type: List[Span]
         num_finished = attr.ib(type=int, default=0)  # type: int
 
+    @attr.s
+    class _Shard(object):
+        traces = attr.ib(
+            factory=lambda: defaultdict(lambda: SpanAggregator._Trace()),
+            type=DefaultDict[int, "SpanAggregator._Trace"],
+            repr=False,
+        )
+        if config._span_aggregator_rlock:
+            lock = attr.ib(factory=RLock, repr=False, type=Union[RLock, Lock])
+        else:
+            lock = attr.ib(factory=Lock, repr=False, type=Union[RLock, Lock])
+        num_spans = attr.ib(type=int, default=0)
+
     _partial_flush_enabled = attr.ib(type=bool)
     _partial_flush_min_spans = attr.ib(type=int)
     _trace_processors = attr.ib(type=Iterable[TraceProcessor])
     _writer = attr.ib(type=TraceWriter)
-    _traces = attr.ib(
-        factory=lambda: defaultdict(lambda: SpanAggregator._Trace()),
+    _max_spans = attr.ib(type=int, default=attr.Factory(lambda: config._span_aggregator_max_spans))
+    _max_trace_age_ns = attr.ib(
+        type=int, default=attr.Factory(lambda: int(config._span_aggregator_max_trace_age * 1e9))
+    )
+    # Number of spans above which a shard checks whether the limit is exceeded
+    _max_shard_spans = attr.ib(
+        init=False,
+        default=attr.Factory(
+            lambda self: max(self._max_spans // _TRACE_SHARDS, 1) if self._max_spans else sys.maxsize, takes_self=True
+        ),
+        type=int,
+        repr=False,
+    )
+    _shards = attr.ib(
+        factory=lambda: [SpanAggregator._Shard() for _ in range(_TRACE_SHARDS)],
         init=False,
-        type=DefaultDict[int, "_Trace"],
+        type=List["SpanAggregator._Shard"],
         repr=False,
     )
-    if config._span_aggregator_rlock:
-        _lock = attr.ib(init=False, factory=RLock, repr=False, type=Union[RLock, Lock])
-    else:
-        _lock = attr.ib(init=False, factory=Lock, repr=False, type=Union[RLock, Lock])
-    # Tracks the number of spans created and tags each count with the api that was used
+    # Tracks the spans created and finished with the api that was used
     # ex: otel api, opentracing api, datadog api
+    # The api of each span is appended to a deque, which is thread-safe, and
+    # the deques are turned into counts under a lock when they are queued.
     _span_metrics = attr.ib(
         init=False,
         factory=lambda: {
-            "spans_created": defaultdict(int),
-            "spans_finished": defaultdict(int),
+            "spans_created": deque(),
+            "spans_finished": deque(),
         },
-        type=Dict[str, DefaultDict],
+        type=Dict[str, Deque[str]],
     )
+    _span_metrics_lock = attr.ib(init=False, factory=Lock, repr=False, type=Lock)
 
     def on_span_start(self, span):
         # type: (Span) -> None
-        with self._lock:
-            trace = self._traces[span.trace_id]
-            trace.spans.append(span)
-            self._span_metrics["spans_created"][span._span_api] += 1
-            self._queue_span_count_metrics("spans_created", "integration_name")
+        shard = self._shards[span.trace_id % _TRACE_SHARDS]
+        evicted = None
+        with shard.lock:
+            shard.traces[span.trace_id].spans.append(span)
+            shard.num_spans += 1
+            if shard.num_spans > self._max_shard_spans or self._max_trace_age_ns:
+                evicted = self._evict_traces(shard, span.start_ns)
+        self._span_metrics["spans_created"].append(span._span_api)
+        self._queue_span_count_metrics("spans_created", "integration_name")
+
+        if evicted:
+            for spans in evicted:
+                self._write_trace(spans)
+
+    def _evict_traces(self, shard, now_ns):
+        # type: (SpanAggregator._Shard, int) -> List[List[Span]]
+        """Evict the oldest traces of the shard while too many spans are held
+        or while they are too old.
+
+        Return the finished spans of the evicted traces. Must be called with
+        the lock of the shard held.
+        """
+        # The shard can hold more than its share of spans, e.g. with a large
+        # trace, as long as the total number of spans is within the limit.
+        over_limit = self._max_spans and sum(s.num_spans for s in self._shards) > self._max_spans
+        traces = shard.traces
+        evicted = []  # type: List[List[Span]]
+        num_evicted = num_dropped = 0
+        # Traces are kept in the order in which they were started
+        while traces:
+            trace_id, trace = next(iter(traces.items()))
+            if (
+                trace.spans
+                and not over_limit
+                and not (self._max_trace_age_ns and now_ns - trace.spans[0].start_ns > self._max_trace_age_ns)
+            ):
+                break
+
+            del traces[trace_id]
+            shard.num_spans -= len(trace.spans)
+            finished = []
+            for s in trace.spans:
+                if s.finished:
+                    finished.append(s)
+                else:
+                    # The span was dropped, ignore it if it finishes later on
+                    s._on_finish_callbacks = []
+                    num_dropped += 1
+            if finished:
+                finished[0].set_metric("_dd.py.partial_flush", len(finished))
+                evicted.append(finished)
+            num_evicted += 1
+            over_limit = over_limit and shard.num_spans > self._max_shard_spans
+
+        if num_dropped:
+            log.warning(
+                "Evicted %d traces with unfinished spans from memory, dropping %d unfinished spans",
+                num_evicted,
+                num_dropped,
+            )
+            telemetry_writer.add_count_metric(TELEMETRY_NAMESPACE_TAG_TRACER, "spans_dropped", num_dropped)
+        return evicted
 
     def on_span_finish(self, span):
         # type: (Span) -> None
-        with self._lock:
-            self._span_metrics["spans_finished"][span._span_api] += 1
-            trace = self._traces[span.trace_id]
+        shard = self._shards[span.trace_id % _TRACE_SHARDS]
+        with shard.lock:
+            trace = shard.traces[span.trace_id]
             trace.num_finished += 1
             should_partial_flush = self._partial_flush_enabled and trace.num_finished >= self._partial_flush_min_spans
-            if trace.num_finished == len(trace.spans) or should_partial_flush:
+            if trace.num_finished != len(trace.spans) and not should_partial_flush:
+                log.debug("trace %d has %d spans, %d finished", span.trace_id, len(trace.spans), trace.num_finished)
+                finished = None  # type: Optional[List[Span]]
+            else:
                 trace_spans = trace.spans
                 trace.spans = []
                 if trace.num_finished < len(trace_spans):
@@ -234,25 +338,30 @@ class SpanAggregator(SpanProcessor):
                     finished[0].set_metric("_dd.py.partial_flush", num_finished)
 
                 trace.num_finished -= num_finished
+                shard.num_spans -= num_finished
 
                 if len(trace.spans) == 0:
-                    del self._traces[span.trace_id]
-
-                spans = finished  # type: Optional[List[Span]]
-                for tp in self._trace_processors:
-                    try:
-                        if spans is None:
-                            return
-                        spans = tp.process_trace(spans)
-                    except Exception:
-                        log.error("error applying processor %r", tp, exc_info=True)
-
-                self._queue_span_count_metrics("spans_finished", "integration_name")
-                self._writer.write(spans)
-                return
+                    del shard.traces[span.trace_id]
+
+        self._span_metrics["spans_finished"].append(span._span_api)
+        self._queue_span_count_metrics("spans_finished", "integration_name")
 
-            log.debug("trace %d has %d spans, %d finished", span.trace_id, len(trace.spans), trace.num_finished)
-            return None
+        if finished is not None:
+            # The finished spans are no longer reachable from the shard so they
+            # are processed without holding its lock.
+            self._write_trace(finished)
+
+    def _write_trace(self, spans):
+        # type: (Optional[List[Span]]) -> None
+        for tp in self._trace_processors:
+            try:
+                if spans is None:
+                    return
+                spans = tp.process_trace(spans)
+            except Exception:
+                log.error("error applying processor %r", tp, exc_info=True)
+
+        self._writer.write(spans)
 
     def shutdown(self, timeout):
         # type: (Optional[float]) -> None
@@ -271,8 +380,8 @@ class SpanAggregator(SpanProcessor):
                 # Note - Due to how atexit hooks are registered the telemetry writer is shutdown before the tracer.
                 telemetry_writer._is_periodic = False
                 telemetry_writer._enabled = True
-                # on_span_start queue span created counts in batches of 100. This ensures all remaining counts are sent
-                # before the tracer is shutdown.
+                # on_span_start queue span created counts in batches of 100. This ensures all remaining counts are
+                # sent before the tracer is shutdown.
                 self._queue_span_count_metrics("spans_created", "integration_name", None)
                 # on_span_finish(...) queues span finish metrics in batches of 100.
                 # This ensures all remaining counts are sent before the tracer is shutdown.
@@ -292,12 +401,22 @@ class SpanAggregator(SpanProcessor):
         """Queues a telemetry count metric for span created and span finished"""
         # perf: telemetry_metrics_writer.add_count_metric(...) is an expensive operation.
         # We should avoid calling this method on every invocation of span finish and span start.
-        if min_count is None or sum(self._span_metrics[metric_name].values()) >= min_count:
-            for tag_value, count in self._span_metrics[metric_name].items():
+        span_apis = self._span_metrics[metric_name]
+        if min_count is not None and len(span_apis) < min_count:
+            return
+
+        with self._span_metrics_lock:
+            if min_count is not None and len(span_apis) < min_count:
+                # Another thread queued the metrics in the meantime
+                return
+            counts = defaultdict(int)  # type: DefaultDict[str, int]
+            # Spans appended while counting are left for the next batch
+            for _ in range(len(span_apis)):
+                counts[span_apis.popleft()] += 1
+            for tag_value, count in counts.items():
                 telemetry_writer.add_count_metric(
                     TELEMETRY_NAMESPACE_TAG_TRACER, metric_name, count, tags=((tag_name, tag_value),)
                 )
-            self._span_metrics[metric_name] = defaultdict(int)
 
 
 @attr.s
@@ -54,11 +54,15 @@ class TruncateSpanProcessor(SpanProcessor):
 
     def on_span_finish(self, span):
         span.resource = truncate_to_length(span.resource, MAX_RESOURCE_NAME_LENGTH)
-        span._meta = {
-            truncate_to_length(k, MAX_META_KEY_LENGTH): truncate_to_length(v, MAX_META_VALUE_LENGTH)
-            for k, v in span._meta.items()
-        }
-        span._metrics = {truncate_to_length(k, MAX_METRIC_KEY_LENGTH): v for k, v in span._metrics.items()}
+        if span._meta_dict:
+            span._meta = {
+                truncate_to_length(k, MAX_META_KEY_LENGTH): truncate_to_length(v, MAX_META_VALUE_LENGTH)
+                for k, v in span._meta_dict.items()
+            }
+        if span._metrics_dict:
+            span._metrics = {
+                truncate_to_length(k, MAX_METRIC_KEY_LENGTH): v for k, v in span._metrics_dict.items()
+            }
 
 
 class NormalizeSpanProcessor(SpanProcessor):
@@ -1,3 +1,4 @@
+from collections import defaultdict
 import json
 import re
 from typing import TYPE_CHECKING
@@ -24,6 +25,7 @@ from ddtrace.internal.constants import _REJECT_PRIORITY_INDEX
 from ddtrace.internal.constants import SAMPLING_DECISION_TRACE_TAG_KEY
 from ddtrace.internal.glob_matching import GlobMatcher
 from ddtrace.internal.logger import get_logger
+from ddtrace.internal.utils.cache import LFUCache
 from ddtrace.sampling_rule import SamplingRule
 from ddtrace.settings import _config as config
 
@@ -43,10 +45,18 @@ if TYPE_CHECKING:  # pragma: no cover
     from typing import Dict
     from typing import List
     from typing import Text
+    from typing import Tuple
 
     from ddtrace.context import Context
     from ddtrace.span import Span
 
+    _RuleDecisionKey = Tuple[
+        Optional[str],  # service
+        Optional[str],  # name
+        Optional[str],  # resource
+        Tuple[Optional[str], ...],  # tag values
+    ]
+
 # Big prime number to make hashing better distributed
 KNUTH_FACTOR = 1111111111111111111
 MAX_SPAN_ID = 2 ** 64
@@ -317,3 +327,79 @@ def _get_highest_precedence_rule_matching(span, rules):
         if rule.matches(span):
             return rule
     return None
+
+
+# Placeholder for the service or name of sampling rules that are not indexed
+_ANY = object()
+
+
+def _index_key(pattern):
+    # type: (Any) -> Any
+    return pattern if isinstance(pattern, str) else _ANY
+
+
+class SamplingRuleIndex(object):
+    """Find the first of a list of sampling rules matching a span.
+
+    Rules whose service and name are plain strings are grouped by those values
+    so that only the rules that could match the service and name of a span
+    are evaluated, in the order in which they were given. The rule matching a
+    given service, name, resource and combination of the tag values the rules
+    match on is cached.
+
+    Rules of a subclass of :class:`SamplingRule` are always evaluated against
+    the span, in which case the rules are matched one after the other.
+    """
+
+    def __init__(self, rules, maxsize=4096):
+        # type: (List[SamplingRule], int) -> None
+        self.rules = rules
+        self._n_rules = len(rules)
+        self._indexable = all(type(rule) is SamplingRule for rule in rules)
+        self._rules_by_key = defaultdict(list)  # type: Dict[Tuple[Any, Any], List[int]]
+        tag_keys = set()
+        for i, rule in enumerate(rules):
+            self._rules_by_key[(_index_key(rule.service), _index_key(rule.name))].append(i)
+            tag_keys.update(rule._tag_value_matchers)
+        self._tag_keys = tuple(sorted(tag_keys))
+        self._candidates = LFUCache(maxsize)
+        self._decisions = LFUCache(maxsize)
+
+    def is_stale(self, rules):
+        # type: (List[SamplingRule]) -> bool
+        """Return whether the index was built for a different list of rules.
+
+        Rules that are added to or removed from the indexed list are detected
+        by its length.
+        """
+        return rules is not self.rules or len(rules) != self._n_rules
+
+    def _get_candidates(self, key):
+        # type: (Tuple[Optional[str], Optional[str]]) -> List[SamplingRule]
+        service, name = key
+        rules_by_key = self._rules_by_key
+        positions = []  # type: List[int]
+        for k in {(service, name), (service, _ANY), (_ANY, name), (_ANY, _ANY)}:
+            positions.extend(rules_by_key.get(k, ()))
+        return [self.rules[i] for i in sorted(positions)]
+
+    def _decide(self, key):
+        # type: (_RuleDecisionKey) -> Optional[SamplingRule]
+        service, name, resource, tag_values = key
+        tags = dict(zip(self._tag_keys, tag_values))
+        for rule in self._candidates.get((service, name), self._get_candidates):
+            if (not rule._tag_value_matchers or rule.tag_match(tags)) and rule._matches((service, name, resource)):
+                return rule
+        return None
+
+    def match(self, span):
+        # type: (Span) -> Optional[SamplingRule]
+        """Return the first rule matching the span, if any."""
+        if not self._n_rules:
+            return None
+
+        if not self._indexable:
+            return _get_highest_precedence_rule_matching(span, self.rules)
+
+        tag_values = tuple(span.get_tag(k) for k in self._tag_keys) if self._tag_keys else ()
+        return self._decisions.get((span.service, span.name, span.resource, tag_values), self._decide)
@@ -0,0 +1,80 @@
+"""
+Tracer-side SQL obfuscation.
+
+The agent obfuscates the SQL queries used as span resources, but the raw
+queries, literal values included, still have to be encoded and sent to it.
+Obfuscating them in the tracer makes the resources of the same statement
+identical, which keeps payloads small and lets the encoders reuse them.
+"""
+import hashlib
+import re
+from typing import Tuple
+
+from ddtrace import config
+
+from .utils.cache import LFUCache
+
+
+# Comments are dropped, string and numeric literals are replaced with ``?``
+# and quoted identifiers are kept as is. Strings are matched before numbers
+# so that the digits they contain are not replaced twice. Both ``''`` and
+# backslash escaped quotes are part of the strings. A quote or comment that
+# is never closed is matched as unterminated.
+_TOKEN_PATTERN = re.compile(
+    r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.|'')*'|\$(?P<tag>[A-Za-z_]*)\$.*?\$(?P=tag)\$)
+    | (?P<identifier>"(?:[^"]|"")*"|`[^`]*`)
+    | (?P<number>(?<![\w$])(?:0[xX][0-9a-fA-F]+|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)(?![\w$]))
+    | (?P<unterminated>['"`]|/\*|\$[A-Za-z_]*\$)
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+# Lists of values, like in ``IN (?, ?, ?)`` or ``VALUES (?, ?), (?, ?)``, are collapsed
+_VALUE_LIST_PATTERN = re.compile(r"\( ?\?(?: ?, ?\?)* ?\)(?: ?, ?\( ?\?(?: ?, ?\?)* ?\))*")
+
+QUERY_HASH_LENGTH = 16
+
+
+class _UnterminatedToken(Exception):
+    pass
+
+
+def _replace_token(match):
+    # type: (re.Match) -> str
+    kind = match.lastgroup
+    if kind == "comment":
+        return " "
+    elif kind == "identifier":
+        return match.group(0)
+    elif kind == "unterminated":
+        raise _UnterminatedToken()
+    return "?"
+
+
+def _obfuscate(query):
+    # type: (str) -> Tuple[str, str]
+    try:
+        obfuscated = _TOKEN_PATTERN.sub(_replace_token, query)
+    except _UnterminatedToken:
+        # The end of the query cannot be told apart from a literal, do not keep any of it
+        obfuscated = "?"
+    else:
+        obfuscated = _WHITESPACE_PATTERN.sub(" ", obfuscated).strip()
+        obfuscated = _VALUE_LIST_PATTERN.sub("( ? )", obfuscated)
+    query_hash = hashlib.sha1(obfuscated.encode("utf-8")).hexdigest()[:QUERY_HASH_LENGTH]
+    return obfuscated, query_hash
+
+
+_cache = LFUCache(config._sql_obfuscation_cache_size)
+
+
+def obfuscate_sql(query):
+    # type: (str) -> Tuple[str, str]
+    """Return the obfuscated version of the given SQL query and its hash.
+
+    Results are cached by raw query, so that the statements executed
+    repeatedly by an application are only obfuscated once.
+    """
+    return _cache.get(query, _obfuscate)
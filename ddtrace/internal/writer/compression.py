@@ -0,0 +1,121 @@
+import abc
+import gzip
+import time
+from typing import Optional
+from typing import Tuple
+
+import six
+
+from ..constants import DEFAULT_MIN_COMPRESSION_SIZE
+from ..logger import get_logger
+
+
+log = get_logger(__name__)
+
+
+try:
+    _cpu_time = time.thread_time
+except AttributeError:
+    _cpu_time = time.process_time
+
+
+class PayloadCompressor(six.with_metaclass(abc.ABCMeta)):
+    """Compress encoded payloads before they are sent to an intake."""
+
+    CONTENT_ENCODING = ""
+
+    def __init__(self, min_size=DEFAULT_MIN_COMPRESSION_SIZE):
+        # type: (int) -> None
+        # Payloads smaller than this are sent uncompressed as the CPU cost of
+        # compressing them outweighs the bytes saved.
+        self.min_size = min_size
+
+    @abc.abstractmethod
+    def compress(self, data):
+        # type: (bytes) -> bytes
+        pass
+
+    @abc.abstractmethod
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        pass
+
+    def maybe_compress(self, data):
+        # type: (bytes) -> Tuple[bytes, Optional[str], float]
+        """Compress the payload if it is large enough.
+
+        Return the payload to send, its content encoding (``None`` if the
+        payload was left uncompressed) and the CPU time spent compressing it.
+        """
+        if len(data) < self.min_size:
+            return data, None, 0.0
+
+        start = _cpu_time()
+        compressed = self.compress(data)
+        return compressed, self.CONTENT_ENCODING, _cpu_time() - start
+
+
+class GzipPayloadCompressor(PayloadCompressor):
+    CONTENT_ENCODING = "gzip"
+
+    def compress(self, data):
+        # type: (bytes) -> bytes
+        # The fastest level gets most of the size reduction on msgpack
+        # payloads for a fraction of the CPU time of the default level.
+        return gzip.compress(data, 1)
+
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        return gzip.decompress(data)
+
+
+class ZstdPayloadCompressor(PayloadCompressor):
+    """zstd compressor, requires the ``zstandard`` package."""
+
+    CONTENT_ENCODING = "zstd"
+
+    def __init__(self, min_size=DEFAULT_MIN_COMPRESSION_SIZE):
+        # type: (int) -> None
+        import zstandard
+
+        super(ZstdPayloadCompressor, self).__init__(min_size)
+        self._zstandard = zstandard
+
+    def compress(self, data):
+        # type: (bytes) -> bytes
+        # Compressor objects are not thread-safe so a new one is used for
+        # each payload.
+        return self._zstandard.ZstdCompressor(level=1).compress(data)
+
+    def decompress(self, data):
+        # type: (bytes) -> bytes
+        return self._zstandard.ZstdDecompressor().decompress(data)
+
+
+PAYLOAD_COMPRESSORS = {
+    "gzip": GzipPayloadCompressor,
+    "zstd": ZstdPayloadCompressor,
+}
+
+
+def get_payload_compressor(name, min_size=DEFAULT_MIN_COMPRESSION_SIZE):
+    # type: (Optional[str], int) -> Optional[PayloadCompressor]
+    """Return the payload compressor with the given name, if available."""
+    if not name or name.lower() == "none":
+        return None
+
+    try:
+        compressor_class = PAYLOAD_COMPRESSORS[name.lower()]
+    except KeyError:
+        log.warning(
+            "Unsupported trace payload compression '%s'. The supported values are: %s",
+            name,
+            ", ".join(sorted(PAYLOAD_COMPRESSORS.keys())),
+        )
+        return None
+
+    try:
+        return compressor_class(min_size)
+    except ImportError:
+        log.warning("Trace payload compression '%s' is not available, sending uncompressed payloads", name)
+        return None
@@ -0,0 +1,277 @@
+"""Disk-backed queue for trace payloads that could not be sent to the intake.
+
+Payloads are appended to size-bounded segment files. Once a segment is
+sealed it is read back through a read-only memory map and deleted when all
+of its payloads have been consumed.
+
+The queue only lives as long as the process: each process only ever reads
+the segments it has written itself and removes them when the queue is
+closed, which reports the payloads that were discarded. After a fork the
+child starts from an empty queue and leaves the segments of its parent
+alone. Segments left behind by a process that did not shut down cleanly are
+not reclaimed.
+"""
+from collections import deque
+import mmap
+import os
+import struct
+from typing import BinaryIO
+from typing import Deque
+from typing import Optional
+from typing import Tuple
+import weakref
+
+from .. import forksafe
+from ..logger import get_logger
+
+
+log = get_logger(__name__)
+
+
+# Record header: payload size, number of traces, endpoint size
+_HEADER = struct.Struct("<IIH")
+
+DEFAULT_SEGMENT_SIZE = 4 << 20  # 4 MB
+
+SpilledPayload = Tuple[str, bytes, int]
+
+
+class _Segment(object):
+    __slots__ = ("path", "size", "count", "traces")
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self.path = path
+        self.size = 0
+        self.count = 0
+        self.traces = 0
+
+
+class PayloadSpillQueue(object):
+    """FIFO queue of encoded payloads stored in append-only segment files.
+
+    :param directory: The directory where the segment files are stored.
+    :param max_size: The max number of bytes the queue of this process can
+        hold on disk.
+    :param segment_size: The size after which a new segment file is started.
+    """
+
+    def __init__(
+        self,
+        directory,  # type: str
+        max_size,  # type: int
+        segment_size=DEFAULT_SEGMENT_SIZE,  # type: int
+    ):
+        # type: (...) -> None
+        self.directory = directory
+        self.max_size = max_size
+        self.segment_size = min(segment_size, max_size)
+        self._lock = forksafe.Lock()
+        self._reset()
+        _spill_queues.add(self)
+
+    def _reset(self):
+        # type: () -> None
+        self._pid = os.getpid()
+        self._next_segment_id = 0
+        # Sealed segments, oldest first
+        self._sealed = deque()  # type: Deque[_Segment]
+        self._active = None  # type: Optional[_Segment]
+        self._active_file = None  # type: Optional[BinaryIO]
+        self._read_map = None  # type: Optional[mmap.mmap]
+        self._read_offset = 0
+        self._size = 0
+        self._count = 0
+        self._traces = 0
+
+    def __len__(self):
+        # type: () -> int
+        """Return the number of payloads in the queue."""
+        return self._count
+
+    @property
+    def size(self):
+        # type: () -> int
+        """Return the number of bytes used on disk by the queue."""
+        return self._size
+
+    @property
+    def traces(self):
+        # type: () -> int
+        """Return the number of traces in the queue."""
+        return self._traces
+
+    def _new_segment_path(self):
+        # type: () -> str
+        path = os.path.join(self.directory, "ddtrace-spill-%d-%d.seg" % (self._pid, self._next_segment_id))
+        self._next_segment_id += 1
+        return path
+
+    def _seal_active_segment(self):
+        # type: () -> None
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+        if self._active is not None:
+            if self._active.count:
+                self._sealed.append(self._active)
+            else:
+                try:
+                    os.unlink(self._active.path)
+                except OSError:
+                    pass
+            self._active = None
+
+    def put(self, endpoint, payload, n_traces):
+        # type: (str, bytes, int) -> bool
+        """Append a payload to the queue.
+
+        Return ``False`` if the payload does not fit within the size limit of
+        the queue or if it could not be written to disk.
+        """
+        encoded_endpoint = endpoint.encode("utf-8")
+        record_size = _HEADER.size + len(encoded_endpoint) + len(payload)
+
+        with self._lock:
+            if self._size + record_size > self.max_size:
+                return False
+
+            try:
+                if self._active is not None and self._active.size + record_size > self.segment_size:
+                    self._seal_active_segment()
+
+                if self._active is None:
+                    if not os.path.isdir(self.directory):
+                        os.makedirs(self.directory)
+                    self._active = _Segment(self._new_segment_path())
+                    self._active_file = open(self._active.path, "ab")
+
+                self._active_file.write(_HEADER.pack(len(payload), n_traces, len(encoded_endpoint)))  # type: ignore
+                self._active_file.write(encoded_endpoint)  # type: ignore[union-attr]
+                self._active_file.write(payload)  # type: ignore[union-attr]
+                self._active_file.flush()  # type: ignore[union-attr]
+            except (IOError, OSError):
+                log.warning("failed to spill trace payload to %s", self.directory, exc_info=True)
+                # Payloads are read back by count, so a partially written
+                # record at the end of the sealed segment is never read.
+                self._seal_active_segment()
+                return False
+
+            self._active.size += record_size
+            self._active.count += 1
+            self._active.traces += n_traces
+            self._size += record_size
+            self._count += 1
+            self._traces += n_traces
+            return True
+
+    def _open_read_map(self):
+        # type: () -> Optional[mmap.mmap]
+        if self._read_map is None:
+            if not self._sealed:
+                # Only sealed segments are read so that the memory map never
+                # has to follow a file that is being appended to.
+                self._seal_active_segment()
+                if not self._sealed:
+                    return None
+            with open(self._sealed[0].path, "rb") as f:
+                self._read_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._read_offset = 0
+        return self._read_map
+
+    def _read_record(self):
+        # type: () -> Tuple[SpilledPayload, int]
+        read_map = self._read_map
+        offset = self._read_offset
+        payload_size, n_traces, endpoint_size = _HEADER.unpack_from(read_map, offset)  # type: ignore[arg-type]
+        offset += _HEADER.size
+        endpoint = read_map[offset : offset + endpoint_size].decode("utf-8")  # type: ignore[index]
+        offset += endpoint_size
+        payload = read_map[offset : offset + payload_size]  # type: ignore[index]
+        return (endpoint, payload, n_traces), offset + payload_size - self._read_offset
+
+    def peek(self):
+        # type: () -> Optional[SpilledPayload]
+        """Return the oldest payload in the queue without removing it."""
+        with self._lock:
+            if not self._count:
+                return None
+            try:
+                if self._open_read_map() is None:
+                    return None
+                record, _ = self._read_record()
+            except (IOError, OSError, ValueError, struct.error):
+                log.warning("failed to read spilled trace payload, discarding segment", exc_info=True)
+                self._discard_read_segment()
+                return None
+            return record
+
+    def consume(self):
+        # type: () -> None
+        """Remove the oldest payload from the queue."""
+        with self._lock:
+            if not self._count or self._read_map is None:
+                return
+            (_, _, n_traces), record_size = self._read_record()
+            self._read_offset += record_size
+            self._size -= record_size
+            self._count -= 1
+            self._traces -= n_traces
+            segment = self._sealed[0]
+            segment.count -= 1
+            segment.size -= record_size
+            segment.traces -= n_traces
+            if segment.count == 0:
+                self._discard_read_segment()
+
+    def _discard_read_segment(self):
+        # type: () -> None
+        if self._read_map is not None:
+            self._read_map.close()
+            self._read_map = None
+        if not self._sealed:
+            return
+        segment = self._sealed.popleft()
+        self._size -= segment.size
+        self._count -= segment.count
+        self._traces -= segment.traces
+        try:
+            os.unlink(segment.path)
+        except OSError:
+            log.debug("failed to remove spill segment %s", segment.path, exc_info=True)
+
+    def close(self):
+        # type: () -> Tuple[int, int]
+        """Close the queue and remove its segment files.
+
+        Return the number of bytes and of traces that were discarded.
+        """
+        with self._lock:
+            discarded = (self._size, self._traces)
+            self._seal_active_segment()
+            while self._sealed:
+                self._discard_read_segment()
+            _spill_queues.discard(self)
+            return discarded
+
+    def _after_fork(self):
+        # type: () -> None
+        # The segments belong to the parent process: close the inherited
+        # handles and start over with an empty queue.
+        if self._active_file is not None:
+            self._active_file.close()
+        if self._read_map is not None:
+            self._read_map.close()
+        self._reset()
+
+
+_spill_queues = weakref.WeakSet()  # type: weakref.WeakSet[PayloadSpillQueue]
+
+
+def _after_fork_in_child():
+    # type: () -> None
+    for spill_queue in list(_spill_queues):
+        spill_queue._after_fork()
+
+
+forksafe.register(_after_fork_in_child)
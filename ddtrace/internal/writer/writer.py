@@ -6,12 +6,14 @@ import os
 import sys
 import threading
 from typing import TYPE_CHECKING
+from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
 from typing import TextIO
 
 import six
+from six.moves import queue
 
 import ddtrace
 from ddtrace import config
@@ -36,6 +38,9 @@ from ..encoding import JSONEncoderV2
 from ..logger import get_logger
 from ..runtime import container
 from ..sma import SimpleMovingAverage
+from .compression import PayloadCompressor
+from .compression import get_payload_compressor
+from .spill import PayloadSpillQueue
 from .writer_client import WRITER_CLIENTS
 from .writer_client import AgentWriterClientV3
 from .writer_client import AgentWriterClientV4
@@ -65,6 +70,9 @@ class NoEncodableSpansError(Exception):
 # to 10 buckets of 1s duration.
 DEFAULT_SMA_WINDOW = 10
 
+# Queued for the sender thread to send some of the spilled payloads.
+_DRAIN_SPILL_QUEUE = object()
+
 
 def _human_size(nbytes):
     """Return a human-readable size."""
@@ -138,7 +146,7 @@ class LogWriter(TraceWriter):
         pass
 
 
-class HTTPWriter(periodic.PeriodicService, TraceWriter):
+class HTTPWriter(periodic.WakeablePeriodicService, TraceWriter):
     """Writer to an arbitrary HTTP intake endpoint."""
 
     RETRY_ATTEMPTS = 3
@@ -160,6 +168,10 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         sync_mode=False,  # type: bool
         reuse_connections=None,  # type: Optional[bool]
         headers=None,  # type: Optional[Dict[str, str]]
+        max_inflight_payloads=None,  # type: Optional[int]
+        compressor=None,  # type: Optional[PayloadCompressor]
+        spill_queue=None,  # type: Optional[PayloadSpillQueue]
+        adaptive_interval=None,  # type: Optional[bool]
     ):
         # type: (...) -> None
 
@@ -168,6 +180,7 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         if timeout is None:
             timeout = config._agent_timeout_seconds
         super(HTTPWriter, self).__init__(interval=processing_interval)
+        self._processing_interval = processing_interval
         self.intake_url = intake_url
         self._buffer_size = buffer_size
         self._max_payload_size = max_payload_size
@@ -177,6 +190,10 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
 
         self._clients = clients
         self.dogstatsd = dogstatsd
+        # The health metrics are recorded by both the periodic and the sender
+        # threads, and are reported and reset together under this lock so that
+        # nothing recorded in between is lost.
+        self._metrics_lock = threading.Lock()
         self._metrics_reset()
         self._drop_sma = SimpleMovingAverage(DEFAULT_SMA_WINDOW)
         self._sync_mode = sync_mode
@@ -196,6 +213,33 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             config._trace_writer_connection_reuse if reuse_connections is None else reuse_connections
         )
 
+        # When pipelined sending is enabled, encoded payloads are handed over
+        # to a sender thread through a bounded queue so that a slow or
+        # retrying intake does not prevent the periodic thread from encoding.
+        if max_inflight_payloads is None:
+            max_inflight_payloads = config._trace_writer_max_inflight_payloads
+        self._max_inflight_payloads = max_inflight_payloads
+        self._payload_queue = None  # type: Optional[queue.Queue]
+        if max_inflight_payloads > 0 and not sync_mode:
+            self._payload_queue = queue.Queue(maxsize=max_inflight_payloads)
+        self._sender = None  # type: Optional[threading.Thread]
+        self._compressor = compressor
+
+        # Payloads that could not be sent after all retries are spilled to
+        # disk and sent again a few at a time once the intake is reachable.
+        self._spill_queue = spill_queue
+        self._spill_drain_payloads = config._trace_writer_spill_drain_payloads
+        self._spill_drain_pending = False
+        self._last_send_ok = None  # type: Optional[bool]
+
+        # With an adaptive interval, traces are flushed early when the buffer
+        # fills up and the flushes are spaced out while there is no traffic.
+        if adaptive_interval is None:
+            adaptive_interval = config._trace_writer_adaptive_interval
+        self._adaptive_interval = adaptive_interval and not sync_mode
+        self._max_interval = max(config._trace_writer_max_interval_seconds, processing_interval)
+        self._flush_watermark = config._trace_writer_flush_watermark
+
     def _intake_endpoint(self, client=None):
         return "{}/{}".format(self._intake_url(client), client.ENDPOINT if client else self._endpoint)
 
@@ -214,10 +258,11 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
 
     def _metrics_dist(self, name, count=1, tags=tuple()):
         # type: (str, int, Tuple) -> None
-        if tags in self._metrics[name]:
-            self._metrics[name][tags] += count
-        else:
-            self._metrics[name][tags] = count
+        with self._metrics_lock:
+            if tags in self._metrics[name]:
+                self._metrics[name][tags] += count
+            else:
+                self._metrics[name][tags] = count
 
     def _metrics_reset(self):
         # type: () -> None
@@ -298,13 +343,31 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             headers.update(client._headers)
         return headers
 
-    def _send_payload(self, payload, count, client):
+    def _send_payload(self, payload, count, client, content_encoding=None):
         headers = self._get_finalized_headers(count, client)
+        if content_encoding is not None:
+            headers["Content-Encoding"] = content_encoding
 
         self._metrics_dist("http.requests")
 
         response = self._put(payload, headers, client, no_trace=True)
 
+        compressor = self._compressor
+        if content_encoding is not None and response.status == 415 and compressor is not None:
+            # The intake might not accept compressed payloads, so send this
+            # payload again as is to the same endpoint. The subclass is bypassed
+            # so that an unsupported endpoint is not handled twice, e.g. with
+            # two API downgrades.
+            response = HTTPWriter._send_payload(self, compressor.decompress(payload), count, client)
+            if response.status < 400:
+                log.warning(
+                    "intake at %s does not accept %s compressed payloads, disabling compression",
+                    self._intake_endpoint(client),
+                    content_encoding,
+                )
+                self._compressor = None
+            return response
+
         if response.status >= 400:
             self._metrics_dist("http.errors", tags=("type:%s" % response.status,))
         else:
@@ -382,13 +445,30 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         else:
             self._metrics_dist("buffer.accepted.traces", 1)
             self._metrics_dist("buffer.accepted.spans", len(spans))
+            if self._adaptive_interval and client.encoder.size >= client.encoder.max_size * self._flush_watermark:
+                # Flush before the buffer is full rather than waiting for the
+                # next interval and dropping the traces that do not fit.
+                self.wakeup()
 
     def flush_queue(self, raise_exc=False):
+        if self._sender is None:
+            self._last_send_ok = None
         try:
             for client in self._clients:
                 self._flush_queue_with_client(client, raise_exc=raise_exc)
+            if self._sender is None:
+                self._drain_spill_queue()
+            else:
+                self._enqueue_spill_drain()
         finally:
+            self._flush_metrics()
+
+    def _flush_metrics(self):
+        # type: () -> None
+        with self._metrics_lock:
             self._set_drop_rate()
+            if config.health_metrics_enabled and self.dogstatsd:
+                self._report_metrics()
             self._metrics_reset()
 
     def _flush_queue_with_client(self, client, raise_exc=False):
@@ -403,10 +483,50 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             self._metrics_dist("encoder.dropped.traces", n_traces)
             return
 
+        # The caller needs to know whether the payload was sent when it asks
+        # for errors to be raised, so the sender thread is bypassed then.
+        if self._sender is not None and not raise_exc:
+            self._enqueue_payload(encoded, n_traces, client)
+            if config.health_metrics_enabled and self.dogstatsd:
+                self.dogstatsd.distribution(
+                    "datadog.%s.http.inflight.payloads" % self.STATSD_NAMESPACE,
+                    self._payload_queue.unfinished_tasks,  # type: ignore[union-attr]
+                )
+            return
+
         try:
-            self._send_payload_with_backoff(encoded, n_traces, client)
+            self._send_encoded_payload(encoded, n_traces, client, raise_exc=raise_exc)
+        finally:
+            if config.health_metrics_enabled and self.dogstatsd:
+                self._report_payload_metrics(encoded, n_traces)
+
+    def _compress_payload(self, encoded):
+        # type: (bytes) -> Tuple[bytes, Optional[str]]
+        compressor = self._compressor
+        if compressor is None:
+            return encoded, None
+
+        payload, content_encoding, cpu_time = compressor.maybe_compress(encoded)
+        if content_encoding is not None and config.health_metrics_enabled and self.dogstatsd:
+            namespace = self.STATSD_NAMESPACE
+            tags = ["compression:%s" % content_encoding]
+            self.dogstatsd.distribution(
+                "datadog.%s.http.sent.bytes.compression_ratio" % namespace, len(encoded) / len(payload), tags=tags
+            )
+            self.dogstatsd.distribution("datadog.%s.http.sent.bytes.compression_time" % namespace, cpu_time, tags=tags)
+        return payload, content_encoding
+
+    def _send_encoded_payload(self, encoded, n_traces, client, raise_exc=False):
+        # type: (bytes, int, WriterClientBase, bool) -> None
+        try:
+            payload, content_encoding = self._compress_payload(encoded)
+            self._send_payload_with_backoff(payload, n_traces, client, content_encoding)
+            self._last_send_ok = True
         except Exception:
+            self._last_send_ok = False
             self._metrics_dist("http.errors", tags=("type:err",))
+            if not raise_exc and self._spill_payload(encoded, n_traces, client):
+                return
             self._metrics_dist("http.dropped.bytes", len(encoded))
             self._metrics_dist("http.dropped.traces", n_traces)
             if raise_exc:
@@ -418,21 +538,192 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
                     self._intake_endpoint(client),
                     self.RETRY_ATTEMPTS,
                 )
-        finally:
-            if config.health_metrics_enabled and self.dogstatsd:
-                namespace = self.STATSD_NAMESPACE
-                # Note that we cannot use the batching functionality of dogstatsd because
-                # it's not thread-safe.
-                # https://github.com/DataDog/datadogpy/issues/439
-                # This really isn't ideal as now we're going to do a ton of socket calls.
-                self.dogstatsd.distribution("datadog.%s.http.sent.bytes" % namespace, len(encoded))
-                self.dogstatsd.distribution("datadog.%s.http.sent.traces" % namespace, n_traces)
-                for name, metric_tags in self._metrics.items():
-                    for tags, count in metric_tags.items():
-                        self.dogstatsd.distribution("datadog.%s.%s" % (namespace, name), count, tags=list(tags))
+
+    def _spill_payload(self, encoded, n_traces, client):
+        # type: (bytes, int, WriterClientBase) -> bool
+        if self._spill_queue is None or not self._spill_queue.put(client.ENDPOINT, encoded, n_traces):
+            return False
+
+        log.warning(
+            "failed to send %d traces to intake at %s after %d retries, spilled to %s",
+            n_traces,
+            self._intake_endpoint(client),
+            self.RETRY_ATTEMPTS,
+            self._spill_queue.directory,
+        )
+        self._metrics_dist("http.spilled.bytes", len(encoded))
+        self._metrics_dist("http.spilled.traces", n_traces)
+        return True
+
+    def _drain_spill_queue(self):
+        # type: () -> None
+        spill_queue = self._spill_queue
+        # Only try to send spilled payloads when the intake is known to be
+        # reachable, or as a probe when there was nothing else to send.
+        if spill_queue is None or not len(spill_queue) or self._last_send_ok is False:
+            return
+
+        drained = 0
+        for _ in range(self._spill_drain_payloads):
+            spilled = spill_queue.peek()
+            if spilled is None:
+                break
+            endpoint, encoded, n_traces = spilled
+            for client in self._clients:
+                if client.ENDPOINT == endpoint:
+                    break
+            else:
+                # The payload was encoded for an endpoint that is no longer
+                # used, e.g. after an API downgrade.
+                log.warning("dropping %d spilled traces for unused endpoint %s", n_traces, endpoint)
+                self._metrics_dist("http.dropped.bytes", len(encoded))
+                self._metrics_dist("http.dropped.traces", n_traces)
+                spill_queue.consume()
+                continue
+
+            try:
+                payload, content_encoding = self._compress_payload(encoded)
+                self._send_payload(payload, n_traces, client, content_encoding)
+            except Exception:
+                log.debug("intake at %s is unavailable, %d payloads remain spilled", self.intake_url, len(spill_queue))
+                self._last_send_ok = False
+                break
+            self._last_send_ok = True
+            spill_queue.consume()
+            drained += n_traces
+
+        if drained and config.health_metrics_enabled and self.dogstatsd:
+            self.dogstatsd.distribution("datadog.%s.http.spill.drained.traces" % self.STATSD_NAMESPACE, drained)
+
+    def _enqueue_spill_drain(self):
+        # type: () -> None
+        # The spilled payloads are sent by the sender thread after the
+        # payloads of this flush, so that it can tell whether the intake is
+        # reachable from their outcome. The payloads still in flight might be
+        # spilled as well.
+        if self._spill_queue is None or self._spill_drain_pending:
+            return
+        if not len(self._spill_queue) and not self._payload_queue.unfinished_tasks:  # type: ignore[union-attr]
+            return
+        try:
+            self._payload_queue.put_nowait(_DRAIN_SPILL_QUEUE)  # type: ignore[union-attr]
+        except queue.Full:
+            # The sender is busy, try again at the next flush.
+            return
+        self._spill_drain_pending = True
+
+    def _report_payload_metrics(self, encoded, n_traces):
+        # type: (bytes, int) -> None
+        namespace = self.STATSD_NAMESPACE
+        # Note that we cannot use the batching functionality of dogstatsd because
+        # it's not thread-safe.
+        # https://github.com/DataDog/datadogpy/issues/439
+        # This really isn't ideal as now we're going to do a ton of socket calls.
+        self.dogstatsd.distribution("datadog.%s.http.sent.bytes" % namespace, len(encoded))
+        self.dogstatsd.distribution("datadog.%s.http.sent.traces" % namespace, n_traces)
+
+    def _report_metrics(self):
+        # type: () -> None
+        namespace = self.STATSD_NAMESPACE
+        for name, metric_tags in list(self._metrics.items()):
+            for tags, count in list(metric_tags.items()):
+                self.dogstatsd.distribution("datadog.%s.%s" % (namespace, name), count, tags=list(tags))
+
+    def _enqueue_payload(self, encoded, n_traces, client):
+        # type: (bytes, int, WriterClientBase) -> None
+        try:
+            self._payload_queue.put_nowait(  # type: ignore[union-attr]
+                (encoded, n_traces, client, compat.monotonic())
+            )
+        except queue.Full:
+            log.warning(
+                "payload queue is full (%d payloads in flight), dropping %d traces to intake at %s",
+                self._payload_queue.unfinished_tasks,  # type: ignore[union-attr]
+                n_traces,
+                self._intake_endpoint(client),
+            )
+            self._metrics_dist("http.dropped.bytes", len(encoded), tags=("reason:queue_full",))
+            self._metrics_dist("http.dropped.traces", n_traces, tags=("reason:queue_full",))
+
+    def _send_queued_payloads(self):
+        # type: () -> None
+        """Send the encoded payloads handed over by the periodic thread until told to stop."""
+        payload_queue = self._payload_queue
+        while True:
+            item = payload_queue.get()  # type: ignore[union-attr]
+            try:
+                if item is None:
+                    return
+                if item is _DRAIN_SPILL_QUEUE:
+                    self._spill_drain_pending = False
+                    self._drain_spill_queue()
+                    # Probe the intake with the spilled payloads again at the
+                    # next drain if nothing else is sent in the meantime.
+                    self._last_send_ok = None
+                    continue
+                encoded, n_traces, client, enqueued_at = item
+                queue_wait = compat.monotonic() - enqueued_at
+                try:
+                    self._send_encoded_payload(encoded, n_traces, client)
+                finally:
+                    if config.health_metrics_enabled and self.dogstatsd:
+                        self._report_payload_metrics(encoded, n_traces)
+                        self.dogstatsd.distribution(
+                            "datadog.%s.http.queue.wait_time" % self.STATSD_NAMESPACE, queue_wait
+                        )
+            except Exception:
+                log.error("failed to send queued payload", exc_info=True)
+            finally:
+                payload_queue.task_done()  # type: ignore[union-attr]
+
+    def _start_sender(self):
+        # type: () -> None
+        if self._payload_queue is None:
+            return
+        self._sender = threading.Thread(
+            target=self._send_queued_payloads,
+            name="%s:%s:sender" % (self.__class__.__module__, self.__class__.__name__),
+        )
+        self._sender.daemon = True
+        setattr(self._sender, "_ddtrace_profiling_ignore", True)
+        self._sender.start()
+
+    def _stop_sender(self, timeout=None):
+        # type: (Optional[float]) -> None
+        sender, self._sender = self._sender, None
+        if sender is None:
+            return
+        # The sender drains the queued payloads before picking up the sentinel.
+        self._payload_queue.put(None)  # type: ignore[union-attr]
+        sender.join(timeout)
 
     def periodic(self):
-        self.flush_queue(raise_exc=False)
+        if not self._adaptive_interval:
+            self.flush_queue(raise_exc=False)
+            return
+
+        n_traces = sum(len(client.encoder) for client in self._clients)
+        try:
+            self.flush_queue(raise_exc=False)
+        finally:
+            self._adapt_interval(n_traces)
+
+    def _adapt_interval(self, n_traces):
+        # type: (int) -> None
+        if n_traces:
+            # Flush at the configured pace as long as there is traffic.
+            interval = self._processing_interval
+        else:
+            interval = min(self.interval * 2, self._max_interval)
+        if interval != self.interval:
+            self.interval = interval
+        if config.health_metrics_enabled and self.dogstatsd:
+            self.dogstatsd.distribution("datadog.%s.writer.interval" % self.STATSD_NAMESPACE, interval)
+
+    def _start_service(self, *args, **kwargs):
+        # type: (Any, Any) -> None
+        super(HTTPWriter, self)._start_service(*args, **kwargs)
+        self._start_sender()
 
     def _stop_service(
         self,
@@ -447,7 +738,30 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         try:
             self.periodic()
         finally:
-            self._reset_connection()
+            stop_sender = self._sender is not None
+            try:
+                self._stop_sender(timeout=self._timeout * (self._max_inflight_payloads + 1))
+            finally:
+                self._reset_connection()
+                dropped_traces = self._close_spill_queue()
+                # Report what the sender recorded while draining its queue and
+                # the spilled payloads that were discarded.
+                if stop_sender or dropped_traces:
+                    self._flush_metrics()
+
+    def _close_spill_queue(self):
+        # type: () -> int
+        if self._spill_queue is None:
+            return 0
+        # The spill queue does not outlive the process.
+        dropped_bytes, dropped_traces = self._spill_queue.close()
+        if dropped_traces:
+            log.warning(
+                "dropping %d spilled traces to intake at %s on shutdown", dropped_traces, self._intake_endpoint()
+            )
+            self._metrics_dist("http.dropped.bytes", dropped_bytes, tags=("reason:shutdown",))
+            self._metrics_dist("http.dropped.traces", dropped_traces, tags=("reason:shutdown",))
+        return dropped_traces
 
 
 class AgentWriter(HTTPWriter):
@@ -479,6 +793,8 @@ class AgentWriter(HTTPWriter):
         api_version=None,  # type: Optional[str]
         reuse_connections=None,  # type: Optional[bool]
         headers=None,  # type: Optional[Dict[str, str]]
+        max_inflight_payloads=None,  # type: Optional[int]
+        adaptive_interval=None,  # type: Optional[bool]
     ):
         # type: (...) -> None
         if processing_interval is None:
@@ -546,6 +862,16 @@ class AgentWriter(HTTPWriter):
             sync_mode=sync_mode,
             reuse_connections=reuse_connections,
             headers=_headers,
+            max_inflight_payloads=max_inflight_payloads,
+            compressor=get_payload_compressor(
+                config._trace_writer_compression, config._trace_writer_compression_min_size
+            ),
+            spill_queue=(
+                PayloadSpillQueue(config._trace_writer_spill_dir, config._trace_writer_spill_max_size)
+                if config._trace_writer_spill_dir
+                else None
+            ),
+            adaptive_interval=adaptive_interval,
         )
 
     def recreate(self):
@@ -553,13 +879,15 @@ class AgentWriter(HTTPWriter):
         return self.__class__(
             agent_url=self.agent_url,
             sampler=self._sampler,
-            processing_interval=self._interval,
+            processing_interval=self._processing_interval,
             buffer_size=self._buffer_size,
             max_payload_size=self._max_payload_size,
             timeout=self._timeout,
             dogstatsd=self.dogstatsd,
             sync_mode=self._sync_mode,
             api_version=self._api_version,
+            max_inflight_payloads=self._max_inflight_payloads,
+            adaptive_interval=self._adaptive_interval,
         )
 
     @property
@@ -589,8 +917,8 @@ class AgentWriter(HTTPWriter):
             return payload
         raise ValueError()
 
-    def _send_payload(self, payload, count, client):
-        response = super(AgentWriter, self)._send_payload(payload, count, client)
+    def _send_payload(self, payload, count, client, content_encoding=None):
+        response = super(AgentWriter, self)._send_payload(payload, count, client, content_encoding)
         if response.status in [404, 415]:
             log.debug("calling endpoint '%s' but received %s; downgrading API", client.ENDPOINT, response.status)
             try:
@@ -604,7 +932,7 @@ class AgentWriter(HTTPWriter):
                 )
             else:
                 if payload is not None:
-                    self._send_payload(payload, count, client)
+                    self._send_payload(payload, count, client, content_encoding)
         elif response.status < 400 and isinstance(self._sampler, BasePrioritySampler):
             result_traces_json = response.get_json()
             if result_traces_json and "rate_by_service" in result_traces_json:
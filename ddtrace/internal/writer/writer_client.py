@@ -1,3 +1,5 @@
+from ddtrace import config
+
 from .._encoding import BufferedEncoder
 from ..encoding import MSGPACK_ENCODERS
 
@@ -22,6 +24,7 @@ class AgentWriterClientV5(WriterClientBase):
             MSGPACK_ENCODERS["v0.5"](
                 max_size=buffer_size,
                 max_item_size=max_payload_size,
+                max_interned_strings=config._trace_writer_interned_strings,
             )
         )
 
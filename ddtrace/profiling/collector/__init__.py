@@ -3,6 +3,7 @@ import typing
 
 import attr
 
+from ddtrace.internal import compat
 from ddtrace.internal import periodic
 from ddtrace.internal import service
 from ddtrace.settings.profiling import config
@@ -71,6 +72,46 @@ class CaptureSampler(object):
         return False
 
 
+@attr.s
+class AdaptiveCaptureSampler(CaptureSampler):
+    """Capture sampler adapting its sampling percentage to the time spent capturing events.
+
+    The capture percentage is adjusted every ``interval`` seconds, so that capturing the events uses at most
+    ``max_time_usage_pct`` percent of the wall time. It is at most doubled at each adjustment, so a burst of events
+    following a quiet period does not get captured entirely.
+    """
+
+    MIN_CAPTURE_PCT = 0.01
+
+    max_time_usage_pct = attr.ib(default=1.0, type=float)
+    interval = attr.ib(default=1.0, type=float)
+    _used_time_ns = attr.ib(default=0, init=False)
+    _last_adjustment_ns = attr.ib(factory=compat.monotonic_ns, init=False)
+
+    @max_time_usage_pct.validator
+    def _check_max_time_usage(self, attribute, value):
+        if value <= 0 or value > 100:
+            raise ValueError("Max time usage percent must be greater than 0 and smaller or equal to 100")
+
+    def add_used_time(self, used_time_ns, now_ns):
+        # type: (int, int) -> None
+        """Account for the time spent capturing an event.
+
+        :param used_time_ns: The time spent capturing the event, in nanoseconds.
+        :param now_ns: The current monotonic time, in nanoseconds.
+        """
+        self._used_time_ns += used_time_ns
+        elapsed_ns = now_ns - self._last_adjustment_ns
+        if elapsed_ns < self.interval * 1e9:
+            return
+
+        usage_pct = self._used_time_ns * 100.0 / elapsed_ns
+        ratio = self.max_time_usage_pct / usage_pct if usage_pct else 2.0
+        self.capture_pct = max(self.MIN_CAPTURE_PCT, min(100.0, self.capture_pct * min(ratio, 2.0)))
+        self._used_time_ns = 0
+        self._last_adjustment_ns = now_ns
+
+
 def _create_capture_sampler(collector):
     return CaptureSampler(collector.capture_pct)
 
@@ -10,6 +10,7 @@ from six.moves import _thread
 import wrapt
 
 from ddtrace.internal import compat
+from ddtrace.internal.datadog.profiling import ddup
 from ddtrace.profiling import _threading
 from ddtrace.profiling import collector
 from ddtrace.profiling import event
@@ -30,14 +31,14 @@ class LockEventBase(event.StackBasedEvent):
 class LockAcquireEvent(LockEventBase):
     """A lock has been acquired."""
 
-    wait_time_ns = attr.ib(default=0, type=int)
+    wait_time_ns = attr.ib(default=0, type=int, metadata=event.SUMMED)
 
 
 @event.event_class
 class LockReleaseEvent(LockEventBase):
     """A lock has been released."""
 
-    locked_for_ns = attr.ib(default=0, type=int)
+    locked_for_ns = attr.ib(default=0, type=int, metadata=event.SUMMED)
 
 
 def _current_thread():
@@ -65,13 +66,30 @@ class _ProfiledLock(wrapt.ObjectProxy):
     ACQUIRE_EVENT_CLASS = LockAcquireEvent
     RELEASE_EVENT_CLASS = LockReleaseEvent
 
-    def __init__(self, wrapped, recorder, tracer, max_nframes, capture_sampler, endpoint_collection_enabled):
+    def __init__(
+        self,
+        wrapped,
+        recorder,
+        tracer,
+        max_nframes,
+        capture_sampler,
+        endpoint_collection_enabled,
+        contention_threshold_ns=None,
+        export_libdd_enabled=False,
+        export_py_enabled=True,
+    ):
         wrapt.ObjectProxy.__init__(self, wrapped)
         self._self_recorder = recorder
         self._self_tracer = tracer
         self._self_max_nframes = max_nframes
         self._self_capture_sampler = capture_sampler
         self._self_endpoint_collection_enabled = endpoint_collection_enabled
+        self._self_export_libdd_enabled = export_libdd_enabled
+        self._self_export_py_enabled = export_py_enabled
+        # When set, only the contention is recorded, see acquire and release
+        self._self_contention_threshold_ns = contention_threshold_ns
+        if contention_threshold_ns is not None:
+            self._self_acquired_at = 0
         frame = sys._getframe(2 if WRAPT_C_EXT else 3)
         code = frame.f_code
         self._self_name = "%s:%d" % (os.path.basename(code.co_filename), frame.f_lineno)
@@ -82,7 +100,90 @@ class _ProfiledLock(wrapt.ObjectProxy):
     def __aexit__(self, *args, **kwargs):
         return self.__wrapped__.__aexit__(*args, **kwargs)
 
+    def _push_event(self, event_class, frame_depth, **kwargs):
+        # Record an event for the code running `frame_depth` frames up from this one
+        thread_id, thread_name = _current_thread()
+        task_id, task_name, task_frame = _task.get_task(thread_id)
+
+        if task_frame is None:
+            frame = sys._getframe(frame_depth)
+        else:
+            frame = task_frame
+
+        frames, nframes = _traceback.pyframe_to_frames(frame, self._self_max_nframes)
+
+        if self._self_export_libdd_enabled:
+            self._push_ddup_sample(event_class, frames, nframes, thread_id, thread_name, task_id, task_name, **kwargs)
+
+        if not self._self_export_py_enabled:
+            return
+
+        event = event_class(
+            lock_name=self._self_name,
+            frames=frames,
+            nframes=nframes,
+            thread_id=thread_id,
+            thread_name=thread_name,
+            task_id=task_id,
+            task_name=task_name,
+            sampling_pct=self._self_capture_sampler.capture_pct,
+            **kwargs
+        )
+
+        if self._self_tracer is not None:
+            event.set_trace_info(self._self_tracer.current_span(), self._self_endpoint_collection_enabled)
+
+        self._self_recorder.push_event(event)
+
+    def _push_ddup_sample(self, event_class, frames, nframes, thread_id, thread_name, task_id, task_name, **kwargs):
+        # Feed the sample to the native profile: it is serialized, compressed and uploaded without holding the GIL
+        # Scale the times like the Python exporter does, the counts are the number of sampled events
+        scale = 100.0 / self._self_capture_sampler.capture_pct
+        handle = ddup.SampleHandle()
+        if issubclass(event_class, LockAcquireEvent):
+            handle.push_acquire(int(kwargs["wait_time_ns"] * scale), 1)
+        else:
+            handle.push_release(int(kwargs["locked_for_ns"] * scale), 1)
+        handle.push_lock_name(self._self_name)
+        handle.push_threadinfo(thread_id, _threading.get_thread_native_id(thread_id), thread_name)
+        if task_id is not None:
+            handle.push_task_id(task_id)
+            handle.push_task_name(task_name)
+        if frames:
+            handle.push_class_name(frames[0].class_name)
+        for frame in frames:
+            handle.push_frame(frame.function_name, frame.file_name, 0, frame.lineno)
+        if self._self_tracer is not None:
+            handle.push_span(self._self_tracer.current_span(), self._self_endpoint_collection_enabled)
+        # The whole sample is written at once, it cannot be mixed with the samples of other threads
+        handle.flush_sample()
+
+    def _push_contention_event(self, event_class, now, **kwargs):
+        # Record a contention event for the caller of acquire or release and account for the time it took
+        try:
+            self._push_event(event_class, 3, **kwargs)
+        except Exception:
+            pass  # nosec
+        self._self_capture_sampler.add_used_time(compat.monotonic_ns() - now, now)
+
     def acquire(self, *args, **kwargs):
+        if self._self_contention_threshold_ns is not None:
+            # Contention only: try to take the lock without waiting first, taking a free lock is not worth recording
+            # and recording it costs much more than taking it.
+            wrapped = self.__wrapped__
+            blocking = args[0] if args else kwargs.get("blocking", True)
+            if blocking and wrapped.acquire(False):
+                self._self_acquired_at = compat.monotonic_ns()
+                return True
+
+            start = compat.monotonic_ns()
+            acquired = wrapped.acquire(*args, **kwargs)
+            if acquired:
+                end = self._self_acquired_at = compat.monotonic_ns()
+                if blocking and self._self_capture_sampler.capture():
+                    self._push_contention_event(self.ACQUIRE_EVENT_CLASS, end, wait_time_ns=end - start)
+            return acquired
+
         if not self._self_capture_sampler.capture():
             return self.__wrapped__.acquire(*args, **kwargs)
 
@@ -92,37 +193,22 @@ class _ProfiledLock(wrapt.ObjectProxy):
         finally:
             try:
                 end = self._self_acquired_at = compat.monotonic_ns()
-                thread_id, thread_name = _current_thread()
-                task_id, task_name, task_frame = _task.get_task(thread_id)
-
-                if task_frame is None:
-                    frame = sys._getframe(1)
-                else:
-                    frame = task_frame
-
-                frames, nframes = _traceback.pyframe_to_frames(frame, self._self_max_nframes)
-
-                event = self.ACQUIRE_EVENT_CLASS(
-                    lock_name=self._self_name,
-                    frames=frames,
-                    nframes=nframes,
-                    thread_id=thread_id,
-                    thread_name=thread_name,
-                    task_id=task_id,
-                    task_name=task_name,
-                    wait_time_ns=end - start,
-                    sampling_pct=self._self_capture_sampler.capture_pct,
-                )
-
-                if self._self_tracer is not None:
-                    event.set_trace_info(self._self_tracer.current_span(), self._self_endpoint_collection_enabled)
-
-                self._self_recorder.push_event(event)
+                self._push_event(self.ACQUIRE_EVENT_CLASS, 2, wait_time_ns=end - start)
             except Exception:
                 pass  # nosec
 
     def release(self, *args, **kwargs):
         # type (typing.Any, typing.Any) -> None
+        contention_threshold_ns = self._self_contention_threshold_ns
+        if contention_threshold_ns is not None:
+            # Read the acquisition time before releasing the lock, another thread can acquire it right after
+            acquired_at = self._self_acquired_at
+            self.__wrapped__.release(*args, **kwargs)
+            end = compat.monotonic_ns()
+            if acquired_at and end - acquired_at >= contention_threshold_ns and self._self_capture_sampler.capture():
+                self._push_contention_event(self.RELEASE_EVENT_CLASS, end, locked_for_ns=end - acquired_at)
+            return
+
         try:
             return self.__wrapped__.release(*args, **kwargs)
         finally:
@@ -130,34 +216,7 @@ class _ProfiledLock(wrapt.ObjectProxy):
                 if hasattr(self, "_self_acquired_at"):
                     try:
                         end = compat.monotonic_ns()
-                        thread_id, thread_name = _current_thread()
-                        task_id, task_name, task_frame = _task.get_task(thread_id)
-
-                        if task_frame is None:
-                            frame = sys._getframe(1)
-                        else:
-                            frame = task_frame
-
-                        frames, nframes = _traceback.pyframe_to_frames(frame, self._self_max_nframes)
-
-                        event = self.RELEASE_EVENT_CLASS(
-                            lock_name=self._self_name,
-                            frames=frames,
-                            nframes=nframes,
-                            thread_id=thread_id,
-                            thread_name=thread_name,
-                            task_id=task_id,
-                            task_name=task_name,
-                            locked_for_ns=end - self._self_acquired_at,
-                            sampling_pct=self._self_capture_sampler.capture_pct,
-                        )
-
-                        if self._self_tracer is not None:
-                            event.set_trace_info(
-                                self._self_tracer.current_span(), self._self_endpoint_collection_enabled
-                            )
-
-                        self._self_recorder.push_event(event)
+                        self._push_event(self.RELEASE_EVENT_CLASS, 2, locked_for_ns=end - self._self_acquired_at)
                     finally:
                         del self._self_acquired_at
             except Exception:
@@ -174,16 +233,43 @@ class FunctionWrapper(wrapt.FunctionWrapper):
         return self
 
 
+def _create_capture_sampler(lock_collector):
+    if lock_collector._contention_only:
+        return collector.AdaptiveCaptureSampler(lock_collector.capture_pct, lock_collector.max_time_usage_pct)
+    return collector.CaptureSampler(lock_collector.capture_pct)
+
+
 @attr.s
 class LockCollector(collector.CaptureSamplerCollector):
-    """Record lock usage."""
+    """Record lock usage.
+
+    In contention only mode, only the acquisitions that had to wait for the lock and the releases of the locks held
+    for at least ``contention_threshold`` seconds are recorded, with a capture percentage adapted to keep the time
+    spent recording them under ``max_time_usage_pct`` percent of the wall time. The locks that cannot be tried
+    without waiting, see ``SUPPORTS_CONTENTION_ONLY``, are always profiled in the default mode.
+    """
+
+    SUPPORTS_CONTENTION_ONLY = True
 
     nframes = attr.ib(type=int, default=config.max_frames)
     endpoint_collection_enabled = attr.ib(type=bool, default=config.endpoint_collection)
 
     tracer = attr.ib(default=None)
 
+    contention_only = attr.ib(type=bool, default=config.lock.contention_only)
+    contention_threshold = attr.ib(type=float, default=config.lock.contention_threshold)
+    max_time_usage_pct = attr.ib(type=float, default=config.lock.max_time_usage_pct)
+
+    _export_libdd_enabled = attr.ib(type=bool, default=config.export.libdd_enabled, repr=False)
+    _export_py_enabled = attr.ib(type=bool, default=config.export.py_enabled, repr=False)
+
     _original = attr.ib(init=False, repr=False, type=typing.Any, cmp=False)
+    _capture_sampler = attr.ib(default=attr.Factory(_create_capture_sampler, takes_self=True), init=False, repr=False)
+
+    @property
+    def _contention_only(self):
+        # type: (...) -> bool
+        return self.contention_only and self.SUPPORTS_CONTENTION_ONLY
 
     @abc.abstractmethod
     def _get_original(self):
@@ -216,10 +302,20 @@ class LockCollector(collector.CaptureSamplerCollector):
         # Nobody should use locks from `_thread`; if they do so, then it's deliberate and we don't profile.
         self.original = self._get_original()
 
+        contention_threshold_ns = int(self.contention_threshold * 1e9) if self._contention_only else None
+
         def _allocate_lock(wrapped, instance, args, kwargs):
             lock = wrapped(*args, **kwargs)
             return self.PROFILED_LOCK_CLASS(
-                lock, self.recorder, self.tracer, self.nframes, self._capture_sampler, self.endpoint_collection_enabled
+                lock,
+                self.recorder,
+                self.tracer,
+                self.nframes,
+                self._capture_sampler,
+                self.endpoint_collection_enabled,
+                contention_threshold_ns,
+                self._export_libdd_enabled,
+                self._export_py_enabled,
             )
 
         self._set_original(FunctionWrapper(self.original, _allocate_lock))
@@ -6,6 +6,161 @@
 #include "_memalloc_reentrant.h"
 #include "_memalloc_tb.h"
 
+/* Open addressing hash table of the tracked tracebacks, indexed by their memory pointer.
+
+   Collisions are resolved by linear probing and the removals shift the
+   following entries back, so there is no tombstone and a lookup stops at the
+   first empty slot. The table is grown to keep its load factor under 1/2. */
+typedef struct
+{
+    /* Slots, either NULL or a tracked traceback */
+    traceback_t** tab;
+    /* Number of tracked tracebacks */
+    MEMALLOC_HEAP_COUNT_TYPE count;
+    /* Number of slots, always 0 or a power of 2 */
+    MEMALLOC_HEAP_COUNT_TYPE size;
+} heap_table_t;
+
+#define HEAP_TABLE_MIN_SIZE 64
+
+static inline MEMALLOC_HEAP_COUNT_TYPE
+heap_table_index(heap_table_t* table, void* ptr)
+{
+    /* Mix the bits of the pointer, the lower ones are mostly zeros because of
+       the alignment of the allocations (64 bit finalizer of MurmurHash3) */
+    uint64_t h = (uint64_t)(uintptr_t)ptr;
+    h ^= h >> 33;
+    h *= 0xff51afd7ed558ccdULL;
+    h ^= h >> 33;
+    return (MEMALLOC_HEAP_COUNT_TYPE)h & (table->size - 1);
+}
+
+static void
+heap_table_init(heap_table_t* table)
+{
+    table->tab = NULL;
+    table->count = 0;
+    table->size = 0;
+}
+
+static void
+heap_table_wipe(heap_table_t* table)
+{
+    for (MEMALLOC_HEAP_COUNT_TYPE i = 0; i < table->size; i++)
+        if (table->tab[i])
+            traceback_free(table->tab[i]);
+    PyMem_RawFree(table->tab);
+    heap_table_init(table);
+}
+
+static void
+heap_table_insert(heap_table_t* table, traceback_t* tb)
+{
+    /* The table must have room for the traceback and not track its pointer yet */
+    MEMALLOC_HEAP_COUNT_TYPE i = heap_table_index(table, tb->ptr);
+
+    while (table->tab[i])
+        i = (i + 1) & (table->size - 1);
+
+    table->tab[i] = tb;
+    table->count++;
+}
+
+static bool
+heap_table_grow(heap_table_t* table)
+{
+    heap_table_t grown;
+
+    grown.count = 0;
+    grown.size = table->size ? table->size * 2 : HEAP_TABLE_MIN_SIZE;
+    grown.tab = PyMem_RawCalloc(grown.size, sizeof(traceback_t*));
+
+    if (grown.tab == NULL)
+        return false;
+
+    for (MEMALLOC_HEAP_COUNT_TYPE i = 0; i < table->size; i++)
+        if (table->tab[i])
+            heap_table_insert(&grown, table->tab[i]);
+
+    PyMem_RawFree(table->tab);
+    *table = grown;
+
+    return true;
+}
+
+static traceback_t**
+heap_table_lookup(heap_table_t* table, void* ptr)
+{
+    if (table->count == 0)
+        return NULL;
+
+    for (MEMALLOC_HEAP_COUNT_TYPE i = heap_table_index(table, ptr); table->tab[i]; i = (i + 1) & (table->size - 1))
+        if (table->tab[i]->ptr == ptr)
+            return &table->tab[i];
+
+    return NULL;
+}
+
+/* Add a traceback to the table.
+
+   If the pointer of the traceback is already tracked, the previous traceback
+   is stale: its free has been missed, so it is replaced.
+
+   Returns false if the table cannot grow, the traceback is then freed. */
+static bool
+heap_table_add(heap_table_t* table, traceback_t* tb)
+{
+    traceback_t** slot = heap_table_lookup(table, tb->ptr);
+
+    if (slot) {
+        /* Free the stale traceback last: it can untrack other pointers */
+        traceback_t* stale = *slot;
+        *slot = tb;
+        traceback_free(stale);
+        return true;
+    }
+
+    if ((table->count + 1) * 2 > table->size && !heap_table_grow(table)) {
+        traceback_free(tb);
+        return false;
+    }
+
+    heap_table_insert(table, tb);
+
+    return true;
+}
+
+/* Remove the traceback of a pointer from the table and return it, or NULL if the pointer is not tracked. */
+static traceback_t*
+heap_table_take(heap_table_t* table, void* ptr)
+{
+    traceback_t** slot = heap_table_lookup(table, ptr);
+
+    if (slot == NULL)
+        return NULL;
+
+    traceback_t* tb = *slot;
+    MEMALLOC_HEAP_COUNT_TYPE mask = table->size - 1;
+    MEMALLOC_HEAP_COUNT_TYPE hole = slot - table->tab;
+
+    /* Shift back the following entries of the probe sequence that cannot be
+       found anymore once the slot is empty, i.e. the ones whose ideal index is
+       not cyclically in ]hole; i] */
+    for (MEMALLOC_HEAP_COUNT_TYPE i = (hole + 1) & mask; table->tab[i]; i = (i + 1) & mask) {
+        MEMALLOC_HEAP_COUNT_TYPE ideal = heap_table_index(table, table->tab[i]->ptr);
+
+        if (((i - ideal) & mask) >= ((i - hole) & mask)) {
+            table->tab[hole] = table->tab[i];
+            hole = i;
+        }
+    }
+
+    table->tab[hole] = NULL;
+    table->count--;
+
+    return tb;
+}
+
 typedef struct
 {
     /* Granularity of the heap profiler in bytes */
@@ -13,7 +168,7 @@ typedef struct
     /* Current sample size of the heap profiler in bytes */
     uint32_t current_sample_size;
     /* Tracked allocations */
-    traceback_array_t allocs;
+    heap_table_t allocs;
     /* Allocated memory counter in bytes */
     uint32_t allocated_memory;
     /* True if the heap tracker is frozen */
@@ -21,7 +176,7 @@ typedef struct
     /* Contains the ongoing heap allocation/deallocation while frozen */
     struct
     {
-        traceback_array_t allocs;
+        heap_table_t allocs;
         ptr_array_t frees;
     } freezer;
 } heap_tracker_t;
@@ -41,8 +196,8 @@ heap_tracker_next_sample_size(uint32_t sample_size)
 static void
 heap_tracker_init(heap_tracker_t* heap_tracker)
 {
-    traceback_array_init(&heap_tracker->allocs);
-    traceback_array_init(&heap_tracker->freezer.allocs);
+    heap_table_init(&heap_tracker->allocs);
+    heap_table_init(&heap_tracker->freezer.allocs);
     ptr_array_init(&heap_tracker->freezer.frees);
     heap_tracker->allocated_memory = 0;
     heap_tracker->frozen = false;
@@ -53,8 +208,8 @@ heap_tracker_init(heap_tracker_t* heap_tracker)
 static void
 heap_tracker_wipe(heap_tracker_t* heap_tracker)
 {
-    traceback_array_wipe(&heap_tracker->allocs);
-    traceback_array_wipe(&heap_tracker->freezer.allocs);
+    heap_table_wipe(&heap_tracker->allocs);
+    heap_table_wipe(&heap_tracker->freezer.allocs);
     ptr_array_wipe(&heap_tracker->freezer.frees);
 }
 
@@ -65,50 +220,40 @@ heap_tracker_freeze(heap_tracker_t* heap_tracker)
 }
 
 static void
-heap_tracker_untrack_thawed(heap_tracker_t* heap_tracker, void* ptr)
-{
-    /* This search is O(n) where `n` is the number of tracked traceback,
-       which is linearly linked to the heap size. This search could probably be
-       optimized in a couple of ways:
-
-       - sort the traceback in allocs by ptr so we can find the ptr in O(log2 n)
-       - use a Bloom filter?
-
-       That being said, we start iterating at the end of the array because most
-       of the time this is where the untracked ptr is (the most recent object
-       get de-allocated first usually). This might be a good enough
-       trade-off. */
-    for (TRACEBACK_ARRAY_COUNT_TYPE i = heap_tracker->allocs.count; i > 0; i--) {
-        traceback_t** tb = &heap_tracker->allocs.tab[i - 1];
-
-        if (ptr == (*tb)->ptr) {
-            /* Free the traceback */
-            traceback_free(*tb);
-            traceback_array_remove(&heap_tracker->allocs, tb);
-            break;
-        }
-    }
+heap_tracker_untrack(heap_table_t* allocs, void* ptr)
+{
+    traceback_t* tb = heap_table_take(allocs, ptr);
+
+    if (tb)
+        traceback_free(tb);
 }
 
 static void
 heap_tracker_thaw(heap_tracker_t* heap_tracker)
 {
-    /* Add the frozen allocs at the end */
-    traceback_array_splice(&heap_tracker->allocs,
-                           heap_tracker->allocs.count,
-                           0,
-                           heap_tracker->freezer.allocs.tab,
-                           heap_tracker->freezer.allocs.count);
-
-    /* Handle the frees: we need to handle the frees after we merge the allocs
-       array together to be sure that there's no free in the freezer matching
-       an alloc that is also in the freezer; heap_tracker_untrack_thawed does
-       not care about the freezer, by definition. */
-    for (MEMALLOC_HEAP_PTR_ARRAY_COUNT_TYPE i = 0; i < heap_tracker->freezer.frees.count; i++)
-        heap_tracker_untrack_thawed(heap_tracker, heap_tracker->freezer.frees.tab[i]);
-
-    /* Reset the count to zero so we can reused the array and overwrite previous values */
-    heap_tracker->freezer.allocs.count = 0;
+    /* Freeing the tracebacks can free objects, whose frees are recorded
+       while the tracker is still frozen: the loops below re-read the counts
+       and the freezer stays consistent. */
+    MEMALLOC_HEAP_PTR_ARRAY_COUNT_TYPE i = 0;
+
+    /* Handle the frees first: a free recorded in the freezer is for an
+       allocation made before the tracker was frozen, the ones of the
+       allocations made while it was frozen are directly removed from the
+       freezer by memalloc_heap_untrack. */
+    for (; i < heap_tracker->freezer.frees.count; i++)
+        heap_tracker_untrack(&heap_tracker->allocs, heap_tracker->freezer.frees.tab[i]);
+
+    /* Then move the frozen allocs to the tracked ones */
+    for (MEMALLOC_HEAP_COUNT_TYPE j = 0; j < heap_tracker->freezer.allocs.size; j++)
+        while (heap_tracker->freezer.allocs.tab[j])
+            heap_table_add(&heap_tracker->allocs,
+                           heap_table_take(&heap_tracker->freezer.allocs, heap_tracker->freezer.allocs.tab[j]->ptr));
+
+    /* And the frees made while moving them */
+    for (; i < heap_tracker->freezer.frees.count; i++)
+        heap_tracker_untrack(&heap_tracker->allocs, heap_tracker->freezer.frees.tab[i]);
+
+    /* Reset the count to zero so we can reuse the array and overwrite previous values */
     heap_tracker->freezer.frees.count = 0;
 
     heap_tracker->frozen = false;
@@ -134,6 +279,14 @@ void
 memalloc_heap_untrack(void* ptr)
 {
     if (global_heap_tracker.frozen) {
+        /* The allocations made while frozen are in the freezer and can be
+           untracked right away */
+        traceback_t* tb = heap_table_take(&global_heap_tracker.freezer.allocs, ptr);
+        if (tb) {
+            traceback_free(tb);
+            return;
+        }
+
         /* Check that we still have space to store the free. If we don't have
            enough space, we ignore the untrack. That's sad as there is a change
            the heap profile won't be valid anymore. However, that's the best we
@@ -143,7 +296,7 @@ memalloc_heap_untrack(void* ptr)
         if (global_heap_tracker.freezer.frees.count < MEMALLOC_HEAP_PTR_ARRAY_MAX_COUNT)
             ptr_array_append(&global_heap_tracker.freezer.frees, ptr);
     } else
-        heap_tracker_untrack_thawed(&global_heap_tracker, ptr);
+        heap_tracker_untrack(&global_heap_tracker.allocs, ptr);
 }
 
 /* Track a memory allocation in the heap profiler.
@@ -166,7 +319,7 @@ memalloc_heap_track(uint16_t max_nframe, void* ptr, size_t size, PyMemAllocatorD
     /* Check if we can add more samples: the sum of the freezer + alloc tracker
      cannot be greater than what the alloc tracker can handle: when the alloc
      tracker is thawed, all the allocs in the freezer will be moved there!*/
-    if ((global_heap_tracker.freezer.allocs.count + global_heap_tracker.allocs.count) >= TRACEBACK_ARRAY_MAX_COUNT)
+    if ((global_heap_tracker.freezer.allocs.count + global_heap_tracker.allocs.count) >= MEMALLOC_HEAP_MAX_COUNT)
         return false;
 
     /* Avoid loops */
@@ -178,10 +331,9 @@ memalloc_heap_track(uint16_t max_nframe, void* ptr, size_t size, PyMemAllocatorD
     memalloc_set_reentrant(false);
 
     if (tb) {
-        if (global_heap_tracker.frozen)
-            traceback_array_append(&global_heap_tracker.freezer.allocs, tb);
-        else
-            traceback_array_append(&global_heap_tracker.allocs, tb);
+        if (!heap_table_add(
+              global_heap_tracker.frozen ? &global_heap_tracker.freezer.allocs : &global_heap_tracker.allocs, tb))
+            return false;
 
         /* Reset the counter to 0 */
         global_heap_tracker.allocated_memory = 0;
@@ -201,14 +353,18 @@ memalloc_heap()
     heap_tracker_freeze(&global_heap_tracker);
 
     PyObject* heap_list = PyList_New(global_heap_tracker.allocs.count);
+    MEMALLOC_HEAP_COUNT_TYPE n = 0;
 
-    for (TRACEBACK_ARRAY_COUNT_TYPE i = 0; i < global_heap_tracker.allocs.count; i++) {
+    for (MEMALLOC_HEAP_COUNT_TYPE i = 0; i < global_heap_tracker.allocs.size; i++) {
         traceback_t* tb = global_heap_tracker.allocs.tab[i];
 
+        if (tb == NULL)
+            continue;
+
         PyObject* tb_and_size = PyTuple_New(2);
         PyTuple_SET_ITEM(tb_and_size, 0, traceback_to_tuple(tb));
         PyTuple_SET_ITEM(tb_and_size, 1, PyLong_FromSize_t(tb->size));
-        PyList_SET_ITEM(heap_list, i, tb_and_size);
+        PyList_SET_ITEM(heap_list, n++, tb_and_size);
     }
 
     heap_tracker_thaw(&global_heap_tracker);
@@ -3,6 +3,18 @@ import typing
 
 from .. import event
 
+DEFAULT_FRAME_TABLE_SIZE: int
+
+class FrameTable(object):
+    maxsize: int
+    def __init__(self, maxsize: int = ...) -> None: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, code: types.CodeType) -> bool: ...
+    def clear(self) -> None: ...
+    def get_frame(self, frame: types.FrameType) -> event.DDFrame: ...
+
+frame_table: FrameTable
+
 def traceback_to_frames(
     traceback: types.TracebackType, max_nframes: int
 ) -> typing.Tuple[typing.List[event.DDFrame], int]: ...
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from types import CodeType
 from types import FrameType
 
@@ -8,26 +9,106 @@ from ddtrace.profiling.event import DDFrame
 log = get_logger(__name__)
 
 
-cpdef _extract_class_name(frame):
-    # type: (...) -> str
+cdef str _extract_class_name(frame, str argname):
     """Extract class name from a frame, if possible.
 
     :param frame: The frame object.
+    :param argname: The name of the first argument of the frame code, either ``self`` or ``cls``.
     """
-    if frame.f_code.co_varnames:
-        argname = frame.f_code.co_varnames[0]
-        try:
-            value = frame.f_locals[argname]
-        except KeyError:
-            return ""
-        try:
-            if argname == "self":
-                return object.__getattribute__(type(value), "__name__")  # use type() and object.__getattribute__ to avoid side-effects
-            if argname == "cls":
-                return object.__getattribute__(value, "__name__")
-        except AttributeError:
-            return ""
-    return ""
+    try:
+        value = frame.f_locals[argname]
+    except KeyError:
+        return ""
+    try:
+        if argname == "self":
+            return object.__getattribute__(type(value), "__name__")  # use type() and object.__getattribute__ to avoid side-effects
+        return object.__getattribute__(value, "__name__")
+    except AttributeError:
+        return ""
+
+
+# The number of code objects the frame table keeps the frames of.
+DEFAULT_FRAME_TABLE_SIZE = 4096
+
+
+cdef class FrameTable(object):
+    """Process-wide table of interned frames.
+
+    The frames are interned by code object, line number and class name, so
+    sampling the same code again returns the same :class:`DDFrame` objects
+    instead of allocating new ones. The name of the first argument of each
+    code object is also kept, so the frame locals are only looked up for the
+    class name of the code taking a ``self`` or ``cls`` argument.
+
+    The table holds at most ``maxsize`` code objects and evicts the least
+    recently used ones first, so code objects that are created dynamically do
+    not make it grow unbounded or keep them alive forever.
+    """
+
+    cdef public Py_ssize_t maxsize
+    cdef object _codes
+
+    def __init__(self, maxsize=DEFAULT_FRAME_TABLE_SIZE):
+        self.maxsize = maxsize
+        self._codes = OrderedDict()
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, code):
+        return id(code) in self._codes
+
+    cpdef clear(self):
+        self._codes.clear()
+
+    cdef tuple _code_entry(self, code):
+        # DEV: The code objects are looked up by identity, equal code objects
+        # can come from different files. The entries keep a reference to their
+        # code object so that its id is not reused while it is in the table.
+        # The frame table is used from the stack sampling thread and the
+        # threads acquiring profiled locks. None of the operations below run
+        # Python code, so holding the GIL is enough to keep them consistent.
+        key = id(code)
+        entry = self._codes.get(key)
+        if entry is None:
+            argname = code.co_varnames[0] if code.co_varnames else None
+            entry = (
+                code,
+                code.co_filename,
+                code.co_name,
+                argname if argname == "self" or argname == "cls" else None,
+                {},
+            )
+            self._codes[key] = entry
+            while len(self._codes) > self.maxsize:
+                self._codes.popitem(last=False)
+        else:
+            self._codes.move_to_end(key)
+        return entry
+
+    cdef object _get_frame(self, frame, code, lineno):
+        _, filename, funcname, argname, frames = self._code_entry(code)
+        if argname is None:
+            class_name = ""
+            key = lineno
+        else:
+            class_name = _extract_class_name(frame, argname)
+            key = (lineno, class_name)
+        ddframe = frames.get(key)
+        if ddframe is None:
+            ddframe = frames[key] = DDFrame(filename, lineno, funcname, class_name)
+        return ddframe
+
+    def get_frame(self, frame):
+        """Return the interned frame for the given frame object.
+
+        :param frame: The frame object.
+        """
+        return self._get_frame(frame, frame.f_code, 0 if frame.f_lineno is None else frame.f_lineno)
+
+
+frame_table = FrameTable()
+cdef FrameTable _frame_table = frame_table
 
 
 cpdef traceback_to_frames(traceback, max_nframes):
@@ -42,10 +123,7 @@ cpdef traceback_to_frames(traceback, max_nframes):
     nframes = 0
     while tb is not None:
         if nframes < max_nframes:
-            frame = tb.tb_frame
-            code = frame.f_code
-            lineno = 0 if frame.f_lineno is None else frame.f_lineno
-            frames.insert(0, DDFrame(code.co_filename, lineno, code.co_name, _extract_class_name(frame)))
+            frames.insert(0, _frame_table.get_frame(tb.tb_frame))
         nframes += 1
         tb = tb.tb_next
     return frames, nframes
@@ -89,7 +167,7 @@ cpdef pyframe_to_frames(frame, max_nframes):
                     return [], 0
 
             lineno = 0 if frame.f_lineno is None else frame.f_lineno
-            frames.append(DDFrame(code.co_filename, lineno, code.co_name, _extract_class_name(frame)))
+            frames.append(_frame_table._get_frame(frame, code, lineno))
         nframes += 1
         frame = frame.f_back
     return frames, nframes
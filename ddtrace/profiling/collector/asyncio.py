@@ -28,6 +28,8 @@ class AsyncioLockCollector(_lock.LockCollector):
     """Record asyncio.Lock usage."""
 
     PROFILED_LOCK_CLASS = _ProfiledAsyncioLock
+    # asyncio.Lock.acquire is a coroutine, it cannot be tried without waiting
+    SUPPORTS_CONTENTION_ONLY = False
 
     def _start_service(self):
         # type: (...) -> None
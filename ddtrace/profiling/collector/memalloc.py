@@ -27,13 +27,13 @@ LOG = logging.getLogger(__name__)
 class MemoryAllocSampleEvent(event.StackBasedEvent):
     """A sample storing memory allocation tracked."""
 
-    size = attr.ib(default=0, type=int)
+    size = attr.ib(default=0, type=int, metadata=event.SUMMED)
     """Allocation size in bytes."""
 
     capture_pct = attr.ib(default=None, type=float)
     """The capture percentage."""
 
-    nevents = attr.ib(default=0, type=int)
+    nevents = attr.ib(default=0, type=int, metadata=event.SUMMED)
     """The total number of allocation events sampled."""
 
 
@@ -41,7 +41,7 @@ class MemoryAllocSampleEvent(event.StackBasedEvent):
 class MemoryHeapSampleEvent(event.StackBasedEvent):
     """A sample storing memory allocation tracked."""
 
-    size = attr.ib(default=0, type=int)
+    size = attr.ib(default=0, type=int, metadata=event.SUMMED)
     """Allocation size in bytes."""
 
     sample_size = attr.ib(default=0, type=int)
@@ -115,19 +115,19 @@ class MemoryCollector(collector.PeriodicCollector):
         if self._export_libdd_enabled:
             for (frames, nframes, thread_id), size in events:
                 if not self.ignore_profiler or thread_id not in thread_id_ignore_set:
-                    ddup.start_sample(nframes)
-                    ddup.push_heap(size)
-                    ddup.push_threadinfo(
+                    handle = ddup.SampleHandle()
+                    handle.push_heap(size)
+                    handle.push_threadinfo(
                         thread_id, _threading.get_thread_native_id(thread_id), _threading.get_thread_name(thread_id)
                     )
                     try:
                         for frame in frames:
-                            ddup.push_frame(frame.function_name, frame.file_name, 0, frame.lineno)
-                        ddup.flush_sample()
+                            handle.push_frame(frame.function_name, frame.file_name, 0, frame.lineno)
+                        handle.flush_sample()
                     except AttributeError:
                         # DEV: This might happen if the memalloc sofile is unlinked and relinked without module
-                        #      re-initialization.  ddup re-initializes the sample on `start_sample()`, so no
-                        #      need to cleanup.
+                        #      re-initialization.  Nothing is written to the profile before
+                        #      `flush_sample()`, so no need to cleanup.
                         LOG.debug("Invalid state detected in memalloc module, suppressing profile")
 
         if self._export_py_enabled:
@@ -170,19 +170,19 @@ class MemoryCollector(collector.PeriodicCollector):
             for (frames, nframes, thread_id), size, _domain in events:
                 if thread_id in thread_id_ignore_set:
                     continue
-                ddup.start_sample(nframes)
-                ddup.push_alloc(int((ceil(size) * alloc_count) / count), count)  # Roundup to help float precision
-                ddup.push_threadinfo(
+                handle = ddup.SampleHandle()
+                handle.push_alloc(int((ceil(size) * alloc_count) / count), count)  # Roundup to help float precision
+                handle.push_threadinfo(
                     thread_id, _threading.get_thread_native_id(thread_id), _threading.get_thread_name(thread_id)
                 )
                 try:
                     for frame in frames:
-                        ddup.push_frame(frame.function_name, frame.file_name, 0, frame.lineno)
-                    ddup.flush_sample()
+                        handle.push_frame(frame.function_name, frame.file_name, 0, frame.lineno)
+                    handle.flush_sample()
                 except AttributeError:
                     # DEV: This might happen if the memalloc sofile is unlinked and relinked without module
-                    #      re-initialization.  ddup re-initializes the sample on `start_sample()`, so no
-                    #      need to cleanup.
+                    #      re-initialization.  Nothing is written to the profile before
+                    #      `flush_sample()`, so no need to cleanup.
                     LOG.debug("Invalid state detected in memalloc module, suppressing profile")
 
         if self._export_py_enabled:
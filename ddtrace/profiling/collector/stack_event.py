@@ -10,9 +10,9 @@ class StackSampleEvent(event.StackBasedEvent):
     """A sample storing executions frames for a thread."""
 
     # Wall clock
-    wall_time_ns = attr.ib(default=0, type=int)
+    wall_time_ns = attr.ib(default=0, type=int, metadata=event.SUMMED)
     # CPU time in nanoseconds
-    cpu_time_ns = attr.ib(default=0, type=int)
+    cpu_time_ns = attr.ib(default=0, type=int, metadata=event.SUMMED)
 
 
 @event.event_class
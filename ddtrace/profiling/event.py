@@ -13,6 +13,12 @@ DDFrame = namedtuple("DDFrame", ["file_name", "lineno", "function_name", "class_
 StackTraceType = typing.List[DDFrame]
 
 
+# Metadata of the event attributes whose values are summed when the events are aggregated.
+# The events are aggregated with the other events that have the same values for all their other
+# attributes, but for the ones with a callable as "aggregate", whose result is compared instead.
+SUMMED = {"aggregate": "sum"}
+
+
 def event_class(
     klass,  # type: typing.Type[_T]
 ):
@@ -24,7 +30,8 @@ def event_class(
 class Event(object):
     """An event happening at a point in time."""
 
-    timestamp = attr.ib(factory=compat.time_ns)
+    # The aggregated events keep the timestamp of the first one
+    timestamp = attr.ib(factory=compat.time_ns, metadata={"aggregate": "first"})
 
     @property
     def name(self):
@@ -37,14 +44,14 @@ class Event(object):
 class TimedEvent(Event):
     """An event that has a duration."""
 
-    duration = attr.ib(default=None)
+    duration = attr.ib(default=None, metadata=SUMMED)
 
 
 @event_class
 class SampleEvent(Event):
     """An event representing a sample gathered from the system."""
 
-    sampling_period = attr.ib(default=None)
+    sampling_period = attr.ib(default=None, metadata=SUMMED)
 
 
 @event_class
@@ -54,12 +61,13 @@ class StackBasedEvent(SampleEvent):
     thread_native_id = attr.ib(default=None, type=typing.Optional[int])
     task_id = attr.ib(default=None, type=typing.Optional[int])
     task_name = attr.ib(default=None, type=typing.Optional[str])
-    frames = attr.ib(default=None, type=StackTraceType)
+    frames = attr.ib(default=None, type=StackTraceType, metadata={"aggregate": tuple})
     nframes = attr.ib(default=0, type=int)
     local_root_span_id = attr.ib(default=None, type=typing.Optional[int])
     span_id = attr.ib(default=None, type=typing.Optional[int])
     trace_type = attr.ib(default=None, type=typing.Optional[str])
-    trace_resource_container = attr.ib(default=None, type=typing.List[str])
+    # The resource of the trace can still change once sampled: compare the containers themselves
+    trace_resource_container = attr.ib(default=None, type=typing.List[str], metadata={"aggregate": id})
 
     def set_trace_info(
         self,
@@ -40,6 +40,9 @@ class PprofHTTPExporter(pprof.PprofExporter):
     """PProf HTTP exporter."""
 
     RETRY_ATTEMPTS = 3
+    # Like the Go runtime does for its profiles, favor speed: the best compression level takes about 15 times as long
+    # for a payload only a few percent smaller.
+    COMPRESSION_LEVEL = 1
 
     # repeat this to please mypy
     enable_code_provenance = attr.ib(default=True, type=bool)
@@ -174,7 +177,7 @@ class PprofHTTPExporter(pprof.PprofExporter):
 
         profile, libs = super(PprofHTTPExporter, self).export(events, start_time_ns, end_time_ns)
         pprof = six.BytesIO()
-        with gzip.GzipFile(fileobj=pprof, mode="wb") as gz:
+        with gzip.GzipFile(fileobj=pprof, mode="wb", compresslevel=self.COMPRESSION_LEVEL) as gz:
             gz.write(profile.SerializeToString())
 
         data = [
@@ -188,7 +191,7 @@ class PprofHTTPExporter(pprof.PprofExporter):
 
         if self.enable_code_provenance:
             code_provenance = six.BytesIO()
-            with gzip.GzipFile(fileobj=code_provenance, mode="wb") as gz:
+            with gzip.GzipFile(fileobj=code_provenance, mode="wb", compresslevel=self.COMPRESSION_LEVEL) as gz:
                 gz.write(
                     json.dumps(
                         {
@@ -134,6 +134,13 @@ cdef groupby(object collection, object key):
     return groups.items()
 
 
+cdef list _counted_events(object events, object event_class):
+    # Return the events of the given class along with the number of events each of them stands for
+    if isinstance(events, recorder.AggregatedEvents):
+        return events.get(event_class, [])
+    return [(event, 1) for event in events.get(event_class, [])]
+
+
 class pprof_LocationType(object):
     # pprof_pb2.Location
     id: int
@@ -161,6 +168,8 @@ class pprof_FunctionType(object):
 _Label_T = typing.Tuple[str, str]
 _Label_List_T = typing.Tuple[_Label_T, ...]
 _Location_Key_T = typing.Tuple[typing.Tuple[int, ...], _Label_List_T]
+_Event_T = typing.TypeVar("_Event_T")
+_Counted_T = typing.Tuple[_Event_T, int]
 
 
 HashableStackTraceType = typing.Tuple[event.DDFrame, ...]
@@ -175,6 +184,11 @@ class _PprofConverter(object):
         init=False, factory=dict, type=typing.Dict[typing.Tuple[str, typing.Optional[str]], pprof_FunctionType]
     )
     _locations = attr.ib(init=False, factory=dict, type=typing.Dict[typing.Tuple[str, int, str], pprof_LocationType])
+    # The location ids of the stacks already converted. The collectors intern their frames so the stacks sampled
+    # repeatedly are mostly made of the same frame objects and are cheap to look up.
+    _stacks = attr.ib(
+        init=False, factory=dict, type=typing.Dict[typing.Tuple[HashableStackTraceType, int], typing.Tuple[int, ...]]
+    )
     _string_table = attr.ib(init=False, factory=_StringTable)
 
     _last_location_id = attr.ib(init=False, factory=lambda: itertools.count(1))
@@ -246,6 +260,12 @@ class _PprofConverter(object):
         nframes,  # type: int
     ):
         # type: (...) -> typing.Tuple[int, ...]
+        key = (tuple(frames), nframes)
+        try:
+            return self._stacks[key]
+        except KeyError:
+            pass
+
         locations = [
             self._to_Location(filename, lineno, funcname).id for filename, lineno, funcname, class_name in frames
         ]
@@ -256,7 +276,8 @@ class _PprofConverter(object):
                 self._to_Location("", 0, "<%d frame%s omitted>" % (omitted, ("s" if omitted > 1 else ""))).id
             )
 
-        return tuple(locations)
+        self._stacks[key] = stack = tuple(locations)
+        return stack
 
     def convert_stack_event(
         self,
@@ -271,7 +292,7 @@ class _PprofConverter(object):
         trace_type,  # type: str
         frames,  # type: HashableStackTraceType
         nframes,  # type: int
-        samples,  # type: typing.List[stack_event.StackSampleEvent]
+        samples,  # type: typing.List[_Counted_T[stack_event.StackSampleEvent]]
     ):
         # type: (...) -> None
         location_key = (
@@ -290,9 +311,9 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["cpu-samples"] = len(samples)
-        self._location_values[location_key]["cpu-time"] = sum(s.cpu_time_ns for s in samples)
-        self._location_values[location_key]["wall-time"] = sum(s.wall_time_ns for s in samples)
+        self._location_values[location_key]["cpu-samples"] = sum(count for _, count in samples)
+        self._location_values[location_key]["cpu-time"] = sum(s.cpu_time_ns for s, _ in samples)
+        self._location_values[location_key]["wall-time"] = sum(s.wall_time_ns for s, _ in samples)
 
     def convert_memalloc_event(
         self,
@@ -301,7 +322,7 @@ class _PprofConverter(object):
         thread_name,  # type: str
         frames,  # type: HashableStackTraceType
         nframes,  # type: int
-        events,  # type: typing.List[memalloc.MemoryAllocSampleEvent]
+        events,  # type: typing.List[_Counted_T[memalloc.MemoryAllocSampleEvent]]
     ):
         # type: (...) -> None
         location_key = (
@@ -314,10 +335,10 @@ class _PprofConverter(object):
         )
 
         self._location_values[location_key]["alloc-samples"] = round(
-            sum(event.nevents * (event.capture_pct / 100.0) for event in events)
+            sum(event.nevents * (event.capture_pct / 100.0) for event, _ in events)
         )
         self._location_values[location_key]["alloc-space"] = round(
-            sum(event.size / event.capture_pct * 100.0 for event in events)
+            sum(event.size / event.capture_pct * 100.0 for event, _ in events)
         )
 
     def convert_memalloc_heap_event(self, event: memalloc.MemoryHeapSampleEvent) -> None:
@@ -345,7 +366,7 @@ class _PprofConverter(object):
         trace_type,  # type: str
         frames,  # type: HashableStackTraceType
         nframes,  # type: int
-        events,  # type: typing.List[_lock.LockAcquireEvent]
+        events,  # type: typing.List[_Counted_T[_lock.LockAcquireEvent]]
         sampling_ratio,  # type: float
     ):
         # type: (...) -> None
@@ -365,9 +386,9 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["lock-acquire"] = len(events)
+        self._location_values[location_key]["lock-acquire"] = sum(count for _, count in events)
         self._location_values[location_key]["lock-acquire-wait"] = int(
-            sum(e.wait_time_ns for e in events) / sampling_ratio
+            sum(e.wait_time_ns for e, _ in events) / sampling_ratio
         )
 
     def convert_lock_release_event(
@@ -383,7 +404,7 @@ class _PprofConverter(object):
         trace_type,  # type: str
         frames,  # type: HashableStackTraceType
         nframes,  # type: int
-        events,  # type: typing.List[_lock.LockReleaseEvent]
+        events,  # type: typing.List[_Counted_T[_lock.LockReleaseEvent]]
         sampling_ratio,  # type: float
     ):
         # type: (...) -> None
@@ -403,9 +424,9 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["lock-release"] = len(events)
+        self._location_values[location_key]["lock-release"] = sum(count for _, count in events)
         self._location_values[location_key]["lock-release-hold"] = int(
-            sum(e.locked_for_ns for e in events) / sampling_ratio
+            sum(e.locked_for_ns for e, _ in events) / sampling_ratio
         )
 
     def convert_stack_exception_event(
@@ -420,7 +441,7 @@ class _PprofConverter(object):
         frames: HashableStackTraceType,
         nframes: int,
         exc_type_name: str,
-        events: typing.List[stack_event.StackExceptionSampleEvent],
+        events: typing.List[_Counted_T[stack_event.StackExceptionSampleEvent]],
     ) -> None:
         location_key = (
             self._to_locations(frames, nframes),
@@ -437,7 +458,7 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["exception-samples"] = len(events)
+        self._location_values[location_key]["exception-samples"] = sum(count for _, count in events)
 
     def _build_libraries(self) -> typing.List[Package]:
         return [
@@ -582,9 +603,10 @@ class PprofExporter(exporter.Exporter):
         )
 
     def _group_stack_events(
-        self, events: typing.Iterable[event.StackBasedEvent]
-    ) -> typing.Iterator[typing.Tuple[StackEventGroupKey, typing.Iterator[event.StackBasedEvent]]]:
-        return groupby(events, self._stack_event_group_key)
+        self, events: typing.Iterable[_Counted_T[event.StackBasedEvent]]
+    ) -> typing.Iterator[typing.Tuple[StackEventGroupKey, typing.Iterator[_Counted_T[event.StackBasedEvent]]]]:
+        key = self._stack_event_group_key
+        return groupby(events, lambda counted_event: key(counted_event[0]))
 
     def _lock_event_group_key(
         self,
@@ -605,9 +627,10 @@ class PprofExporter(exporter.Exporter):
         )
 
     def _group_lock_events(
-        self, events: typing.Iterable[_lock.LockEventBase]
-    ) -> typing.Iterator[typing.Tuple[LockEventGroupKey, typing.Iterator[_lock.LockEventBase]]]:
-        return groupby(events, self._lock_event_group_key)
+        self, events: typing.Iterable[_Counted_T[_lock.LockEventBase]]
+    ) -> typing.Iterator[typing.Tuple[LockEventGroupKey, typing.Iterator[_Counted_T[_lock.LockEventBase]]]]:
+        key = self._lock_event_group_key
+        return groupby(events, lambda counted_event: key(counted_event[0]))
 
     def _stack_exception_group_key(self, event: stack_event.StackExceptionSampleEvent) -> StackExceptionEventGroupKey:
         exc_type = event.exc_type
@@ -627,11 +650,12 @@ class PprofExporter(exporter.Exporter):
         )
 
     def _group_stack_exception_events(
-        self, events: typing.Iterable[stack_event.StackExceptionSampleEvent]
+        self, events: typing.Iterable[_Counted_T[stack_event.StackExceptionSampleEvent]]
     ) -> typing.Iterator[
-        typing.Tuple[StackExceptionEventGroupKey, typing.Iterator[stack_event.StackExceptionSampleEvent]]
+        typing.Tuple[StackExceptionEventGroupKey, typing.Iterator[_Counted_T[stack_event.StackExceptionSampleEvent]]]
     ]:
-        return groupby(events, self._stack_exception_group_key)
+        key = self._stack_exception_group_key
+        return groupby(events, lambda counted_event: key(counted_event[0]))
 
     def _get_event_trace_resource(self, event: event.StackBasedEvent) -> str:
         trace_resource = ""
@@ -645,7 +669,8 @@ class PprofExporter(exporter.Exporter):
     ) -> typing.Tuple[pprof_ProfileType, typing.List[Package]]:
         """Convert events to pprof format.
 
-        :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`.
+        :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`, or the
+            `ddtrace.profiling.recorder.AggregatedEvents` from a `ddtrace.profiling.recorder.AggregatingRecorder`.
         :param start_time_ns: The start time of recording.
         :param end_time_ns: The end time of recording.
         :return: A protobuf Profile object.
@@ -658,11 +683,10 @@ class PprofExporter(exporter.Exporter):
         converter = _PprofConverter()
 
         # Handle StackSampleEvent
-        stack_events = []
-        for event in events.get(stack_event.StackSampleEvent, []):  # type: ignore[call-overload]
-            stack_events.append(event)
+        stack_events = _counted_events(events, stack_event.StackSampleEvent)
+        for event, count in stack_events:
             sum_period += event.sampling_period
-            nb_event += 1
+            nb_event += count
 
         for (
             (
@@ -692,7 +716,7 @@ class PprofExporter(exporter.Exporter):
                 trace_type,
                 frames,
                 nframes,
-                list(typing.cast(typing.Iterator[stack_event.StackSampleEvent], grouped_stack_events)),
+                list(typing.cast(typing.Iterator[_Counted_T[stack_event.StackSampleEvent]], grouped_stack_events)),
             )
 
         # Handle Lock events
@@ -702,11 +726,11 @@ class PprofExporter(exporter.Exporter):
             (threading.ThreadingLockAcquireEvent, converter.convert_lock_acquire_event),
             (threading.ThreadingLockReleaseEvent, converter.convert_lock_release_event),
         ):
-            lock_events = events.get(event_class, [])  # type: ignore[call-overload]
-            sampling_sum_pct = sum(event.sampling_pct for event in lock_events)
+            lock_events = _counted_events(events, event_class)
+            sampling_sum_pct = sum(event.sampling_pct * count for event, count in lock_events)
 
             if lock_events:
-                sampling_ratio_avg = sampling_sum_pct / (len(lock_events) * 100.0)
+                sampling_ratio_avg = sampling_sum_pct / (sum(count for _, count in lock_events) * 100.0)
 
                 for (
                     lock_name,
@@ -751,9 +775,7 @@ class PprofExporter(exporter.Exporter):
                 exc_type_name,
             ),
             se_events,
-        ) in self._group_stack_exception_events(
-            events.get(stack_event.StackExceptionSampleEvent, [])  # type: ignore[call-overload]
-        ):
+        ) in self._group_stack_exception_events(_counted_events(events, stack_event.StackExceptionSampleEvent)):
             converter.convert_stack_exception_event(
                 thread_id,
                 thread_native_id,
@@ -765,7 +787,7 @@ class PprofExporter(exporter.Exporter):
                 frames,
                 nframes,
                 exc_type_name,
-                list(typing.cast(typing.Iterator[stack_event.StackExceptionSampleEvent], se_events)),
+                list(typing.cast(typing.Iterator[_Counted_T[stack_event.StackExceptionSampleEvent]], se_events)),
             )
 
         if memalloc._memalloc:
@@ -784,19 +806,17 @@ class PprofExporter(exporter.Exporter):
                     nframes,
                 ),
                 memalloc_events,
-            ) in self._group_stack_events(
-                events.get(memalloc.MemoryAllocSampleEvent, [])  # type: ignore[call-overload]
-            ):
+            ) in self._group_stack_events(_counted_events(events, memalloc.MemoryAllocSampleEvent)):
                 converter.convert_memalloc_event(
                     thread_id,
                     thread_native_id,
                     thread_name,
                     frames,
                     nframes,
-                    list(typing.cast(typing.Iterator[memalloc.MemoryAllocSampleEvent], memalloc_events)),
+                    list(typing.cast(typing.Iterator[_Counted_T[memalloc.MemoryAllocSampleEvent]], memalloc_events)),
                 )
 
-            for event in events.get(memalloc.MemoryHeapSampleEvent, []):  # type: ignore[call-overload]
+            for event, _ in _counted_events(events, memalloc.MemoryHeapSampleEvent):
                 converter.convert_memalloc_heap_event(event)
 
         # Compute some metadata
@@ -118,6 +118,7 @@ class _ProfilerInstance(service.Service):
     _memory_collector_enabled = attr.ib(type=bool, default=config.memory.enabled)
     _stack_collector_enabled = attr.ib(type=bool, default=config.stack.enabled)
     _lock_collector_enabled = attr.ib(type=bool, default=config.lock.enabled)
+    _aggregate_events = attr.ib(type=bool, default=config.aggregate_events)
     enable_code_provenance = attr.ib(type=bool, default=config.code_provenance)
     endpoint_collection_enabled = attr.ib(type=bool, default=config.endpoint_collection)
 
@@ -212,7 +213,8 @@ class _ProfilerInstance(service.Service):
         # type: (...) -> None
         # Allow to store up to 10 threads for 60 seconds at 50 Hz
         max_stack_events = 10 * 60 * 50
-        r = self._recorder = recorder.Recorder(
+        recorder_class = recorder.AggregatingRecorder if self._aggregate_events else recorder.Recorder
+        r = self._recorder = recorder_class(
             max_events={
                 stack_event.StackSampleEvent: max_stack_events,
                 stack_event.StackExceptionSampleEvent: int(max_stack_events / 2),
@@ -1,5 +1,6 @@
 # -*- encoding: utf-8 -*-
 import collections
+import operator
 import threading
 import typing
 
@@ -27,6 +28,52 @@ class _defaultdictkey(dict):
 EventsType = typing.Dict[event.Event, typing.Sequence[event.Event]]
 
 
+class AggregatedEvents(dict):
+    """The events recorded by an `AggregatingRecorder`.
+
+    Each event type is mapped to a list of ``(event, count)``, where ``event`` stands for ``count``
+    events whose summed attributes hold the sum of their values.
+    """
+
+
+def _tuple_getter(names):
+    # type: (typing.Sequence[str]) -> typing.Callable[[typing.Any], typing.Tuple]
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+    return lambda obj: tuple(getattr(obj, name) for name in names)
+
+
+class _EventAggregation(object):
+    """How to aggregate the events of an event type, from the metadata of its attributes."""
+
+    __slots__ = ("key_fields", "key_transforms", "summed_fields")
+
+    def __init__(self, event_type):
+        key_fields = []
+        self.key_transforms = []  # type: typing.List[typing.Tuple[int, typing.Callable[[typing.Any], typing.Any]]]
+        self.summed_fields = []  # type: typing.List[str]
+        for field in attr.fields(event_type):
+            aggregate = field.metadata.get("aggregate")
+            if aggregate == "sum":
+                self.summed_fields.append(field.name)
+            elif aggregate != "first":
+                if callable(aggregate):
+                    self.key_transforms.append((len(key_fields), aggregate))
+                key_fields.append(field.name)
+        self.key_fields = _tuple_getter(key_fields)
+
+    def key(self, event):
+        # type: (event.Event) -> typing.Tuple
+        key = self.key_fields(event)
+        if self.key_transforms:
+            key = list(key)
+            for i, transform in self.key_transforms:
+                if key[i] is not None:
+                    key[i] = transform(key[i])
+            key = tuple(key)
+        return key
+
+
 @attr.s
 class Recorder(object):
     """An object that records program activity."""
@@ -93,3 +140,70 @@ class Recorder(object):
             events = self.events
             self._reset_events()
         return events
+
+
+@attr.s
+class AggregatingRecorder(Recorder):
+    """A recorder that aggregates the events as they are pushed.
+
+    The events of the same type that only differ by the values of their summed attributes are
+    folded into a single event, along with their count. The memory used is proportional to the
+    number of distinct events (e.g. stacks and labels) rather than to the number of samples, and
+    the events only have to be swapped out to be exported.
+
+    The maximum number of events limits the number of distinct events of each type: once reached,
+    only the events that can be aggregated with the already recorded ones are kept.
+    """
+
+    _aggregations = attr.ib(init=False, repr=False, eq=False, factory=dict)
+
+    def _get_aggregation(self, event_type):
+        # type: (typing.Type[event.Event]) -> _EventAggregation
+        try:
+            return self._aggregations[event_type]
+        except KeyError:
+            aggregation = self._aggregations[event_type] = _EventAggregation(event_type)
+            return aggregation
+
+    def push_events(self, events):
+        """Aggregate multiple events in the recorder.
+
+        All the events MUST be of the same type.
+
+        :param events: The event list to push.
+        """
+        if events:
+            event_type = events[0].__class__
+            aggregation = self._get_aggregation(event_type)
+            keys = [aggregation.key(e) for e in events]
+            summed_fields = aggregation.summed_fields
+            with self._events_lock:
+                aggregated = self.events[event_type]
+                max_events = self.max_events.get(event_type, self.default_max_events)
+                for key, e in zip(keys, events):
+                    entry = aggregated.get(key)
+                    if entry is None:
+                        if max_events is None or len(aggregated) < max_events:
+                            # The first event of a key holds the sums of the following ones
+                            aggregated[key] = [e, 1]
+                        continue
+                    entry[1] += 1
+                    first = entry[0]
+                    for name in summed_fields:
+                        value = getattr(e, name)
+                        if value is not None:
+                            total = getattr(first, name)
+                            setattr(first, name, value if total is None else total + value)
+
+    def _reset_events(self):
+        self.events = _defaultdictkey(lambda event_type: {})
+
+    def reset(self):
+        """Reset the recorder.
+
+        :return: The `AggregatedEvents` that have been removed.
+        """
+        with self._events_lock:
+            events = self.events
+            self._reset_events()
+        return AggregatedEvents((event_type, list(aggregated.values())) for event_type, aggregated in events.items())
@@ -2,18 +2,20 @@ from typing import TYPE_CHECKING
 from typing import Union  # noqa
 
 from ddtrace.internal.logger import get_logger
-from ddtrace.settings.peer_service import PeerServiceConfig
+from ddtrace.settings.peer_service import _ps_config
 from ddtrace.vendor.sqlcommenter import generate_sql_comment as _generate_sql_comment
 
 from ..internal import compat
 from ..internal.utils import get_argument_value
 from ..internal.utils import set_argument_value
+from ..internal.utils.cache import cached
 from ..settings import _config as dd_config
 from ..settings._database_monitoring import dbm_config
 
 
 if TYPE_CHECKING:
     from typing import Optional
+    from typing import Tuple
 
     from ddtrace import Span
 
@@ -44,6 +46,26 @@ def default_sql_injector(dbm_comment, sql_statement):
     return sql_statement
 
 
+@cached()
+def _get_dbm_comment_prefix(service_tags):
+    # type: (Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]) -> str
+    """Return the DBM comment for the given service tags, without its closing ``*/``.
+
+    The comment only depends on the configuration and on the database service
+    so it is rendered once per distinct set of values.
+    """
+    parent_service, env, version, db_service = service_tags
+    sql_comment = _generate_sql_comment(
+        **{
+            DBM_PARENT_SERVICE_NAME_KEY: parent_service,
+            DBM_ENVIRONMENT_KEY: env,
+            DBM_VERSION_KEY: version,
+            DBM_DATABASE_SERVICE_NAME_KEY: db_service,
+        }
+    )
+    return sql_comment.strip()[:-2]
+
+
 class _DBM_Propagator(object):
     def __init__(self, sql_pos, sql_kw, sql_injector=default_sql_injector):
         self.sql_pos = sql_pos
@@ -73,25 +95,25 @@ class _DBM_Propagator(object):
             return None
 
         # set the following tags if DBM injection mode is full or service
-        peer_service_enabled = PeerServiceConfig().set_defaults_enabled
         service_name_key = db_span.service
-        if peer_service_enabled:
-            db_name = db_span.get_tags().get("db.name")
+        if _ps_config.set_defaults_enabled:
+            db_name = db_span.get_tag("db.name")
             service_name_key = compat.ensure_str(db_name) if db_name else db_span.service
 
-        dbm_tags = {
-            DBM_PARENT_SERVICE_NAME_KEY: dd_config.service,
-            DBM_ENVIRONMENT_KEY: dd_config.env,
-            DBM_VERSION_KEY: dd_config.version,
-            DBM_DATABASE_SERVICE_NAME_KEY: service_name_key,
-        }
+        # DEV: the config values are part of the cache key, so a change in the
+        # configuration never returns a stale comment.
+        prefix = _get_dbm_comment_prefix((dd_config.service, dd_config.env, dd_config.version, service_name_key))
 
         if dbm_config.propagation_mode == "full":
             db_span.set_tag_str(DBM_TRACE_INJECTED_TAG, "true")
-            dbm_tags[DBM_TRACE_PARENT_KEY] = db_span.context._traceparent
-
-        sql_comment = _generate_sql_comment(**dbm_tags)
-        if sql_comment:
-            # replace leading whitespace with trailing whitespace
-            return sql_comment.strip() + " "
-        return ""
+            # The traceparent is the last key in sorted order and is made of
+            # url safe characters only, so it can be spliced in without quoting.
+            return "%s%s%s='%s'*/ " % (
+                prefix,
+                "," if len(prefix) > 2 else "",
+                DBM_TRACE_PARENT_KEY,
+                db_span.context._traceparent,
+            )
+
+        # replace leading whitespace with trailing whitespace
+        return prefix + "*/ "
@@ -13,6 +13,9 @@ from ..constants import AUTO_KEEP
 from ..constants import AUTO_REJECT
 from ..constants import USER_KEEP
 from ..context import Context
+from ..internal._propagation import decode_traceparent
+from ..internal._propagation import decode_tracestate
+from ..internal._propagation import get_propagated_tags
 from ..internal._tagset import TagsetDecodeError
 from ..internal._tagset import TagsetEncodeError
 from ..internal._tagset import TagsetMaxSizeDecodeError
@@ -77,26 +80,94 @@ _POSSIBLE_HTTP_HEADER_B3_FLAGS = _possible_header(_HTTP_HEADER_B3_FLAGS)
 _POSSIBLE_HTTP_HEADER_TRACEPARENT = _possible_header(_HTTP_HEADER_TRACEPARENT)
 _POSSIBLE_HTTP_HEADER_TRACESTATE = _possible_header(_HTTP_HEADER_TRACESTATE)
 
+# All the (lower-cased) names of the headers read by the propagators, mapped to
+# the name under which they can be found in a case-sensitive mapping.
+_PROPAGATION_HEADERS = {
+    name: name.upper() if name.startswith("http_") else name
+    for names in (
+        POSSIBLE_HTTP_HEADER_TRACE_IDS,
+        POSSIBLE_HTTP_HEADER_PARENT_IDS,
+        POSSIBLE_HTTP_HEADER_SAMPLING_PRIORITIES,
+        POSSIBLE_HTTP_HEADER_ORIGIN,
+        _POSSIBLE_HTTP_HEADER_TAGS,
+        _POSSIBLE_HTTP_HEADER_B3_SINGLE_HEADER,
+        _POSSIBLE_HTTP_HEADER_B3_TRACE_IDS,
+        _POSSIBLE_HTTP_HEADER_B3_SPAN_IDS,
+        _POSSIBLE_HTTP_HEADER_B3_SAMPLEDS,
+        _POSSIBLE_HTTP_HEADER_B3_FLAGS,
+        _POSSIBLE_HTTP_HEADER_TRACEPARENT,
+        _POSSIBLE_HTTP_HEADER_TRACESTATE,
+    )
+    for name in names
+}  # type: Dict[str, str]
+
+
+class _HTTPHeaders(object):
+    """Case-insensitive read-only view of the propagation headers of a mapping.
+
+    Headers are first looked up by their usual name, i.e. lower-cased or, for
+    WSGI variables, upper-cased. Only when a header cannot be found this way,
+    the names of all the headers are lower-cased, once, and the headers read
+    by the propagators are kept aside for the following lookups.
+    """
+
+    __slots__ = ("_headers", "_normalized")
+
+    def __init__(self, headers):
+        # type: (Dict[str, str]) -> None
+        self._headers = headers
+        self._normalized = None  # type: Optional[Dict[str, str]]
+
+    def _normalize(self):
+        # type: () -> Dict[str, str]
+        normalized = {}
+        for name, value in self._headers.items():
+            name = name.lower()
+            if name in _PROPAGATION_HEADERS:
+                normalized[name] = value
+        self._normalized = normalized
+        return normalized
+
+    def __contains__(self, name):
+        # type: (str) -> bool
+        normalized = self._normalized
+        if normalized is None:
+            if _PROPAGATION_HEADERS[name] in self._headers:
+                return True
+            normalized = self._normalize()
+        return name in normalized
+
+    def __getitem__(self, name):
+        # type: (str) -> str
+        normalized = self._normalized
+        if normalized is None:
+            return self._headers[_PROPAGATION_HEADERS[name]]
+        return normalized[name]
+
+
+class _WSGIEnvironHeaders(_HTTPHeaders):
+    """View of the propagation headers of a WSGI environ.
+
+    The WSGI specification guarantees the names of the HTTP headers in the
+    environ, so they are only looked up by their exact name.
+    """
+
+    __slots__ = ()
+
+    def __contains__(self, name):
+        # type: (str) -> bool
+        return _PROPAGATION_HEADERS[name] in self._headers
 
-# https://www.w3.org/TR/trace-context/#traceparent-header-field-values
-# Future proofing: The traceparent spec is additive, future traceparent versions may contain more than 4 values
-# The regex below matches the version, trace id, span id, sample flag, and end-string/future values (if version>00)
-_TRACEPARENT_HEX_REGEX = re.compile(
-    r"""
-     ^                  # Start of string
-     ([a-f0-9]{2})-     # 2 character hex version
-     ([a-f0-9]{32})-    # 32 character hex trace id
-     ([a-f0-9]{16})-    # 16 character hex span id
-     ([a-f0-9]{2})      # 2 character hex sample flag
-     (-.+)?             # optional, start of any additional values
-     $                  # end of string
-     """,
-    re.VERBOSE,
-)
+
+def _get_headers_view(headers):
+    # type: (Dict[str, str]) -> _HTTPHeaders
+    if "wsgi.version" in headers:
+        return _WSGIEnvironHeaders(headers)
+    return _HTTPHeaders(headers)
 
 
 def _extract_header_value(possible_header_names, headers, default=None):
-    # type: (FrozenSet[str], Dict[str, str], Optional[str]) -> Optional[str]
+    # type: (FrozenSet[str], _HTTPHeaders, Optional[str]) -> Optional[str]
     for header in possible_header_names:
         if header in headers:
             return ensure_str(headers[header], errors="backslashreplace")
@@ -185,18 +256,18 @@ class _DatadogMultiHeader:
             return
 
         # Only propagate trace tags which means ignoring the _dd.origin
-        tags_to_encode = {
-            # DEV: Context._meta is a _MetaDictType but we need Dict[str, str]
-            ensure_str(k): ensure_str(v)
-            for k, v in span_context._meta.items()
-            if _DatadogMultiHeader._is_valid_datadog_trace_tag_key(k)
-        }  # type: Dict[Text, Text]
+        tags_to_encode = get_propagated_tags(span_context._meta)
 
         if tags_to_encode:
+            # The encoded value is reused until the propagated tags change
+            max_size = config._x_datadog_tags_max_length
+            cached = span_context._encoded_headers.get(_HTTP_HEADER_TAGS)
+            if cached is not None and cached[0] == (tags_to_encode, max_size):
+                headers[_HTTP_HEADER_TAGS] = cached[1]
+                return
+
             try:
-                headers[_HTTP_HEADER_TAGS] = encode_tagset_values(
-                    tags_to_encode, max_size=config._x_datadog_tags_max_length
-                )
+                encoded_tags = encode_tagset_values(dict(tags_to_encode), max_size=max_size)
             except TagsetMaxSizeEncodeError:
                 # We hit the max size allowed, add a tag to the context to indicate this happened
                 span_context._meta["_dd.propagation_error"] = "inject_max_size"
@@ -205,6 +276,9 @@ class _DatadogMultiHeader:
                 # We hit an encoding error, add a tag to the context to indicate this happened
                 span_context._meta["_dd.propagation_error"] = "encoding_error"
                 log.warning("failed to encode x-datadog-tags", exc_info=True)
+            else:
+                headers[_HTTP_HEADER_TAGS] = encoded_tags
+                span_context._encoded_headers[_HTTP_HEADER_TAGS] = ((tags_to_encode, max_size), encoded_tags)
 
     @staticmethod
     def _extract(headers):
@@ -608,17 +682,7 @@ class _TraceContext:
         Otherwise we extract the trace-id, span-id, and sampling priority from the
         traceparent header.
         """
-        valid_tp_values = _TRACEPARENT_HEX_REGEX.match(tp.strip())
-        if valid_tp_values is None:
-            raise ValueError("Invalid traceparent version: %s" % tp)
-
-        (
-            version,
-            trace_id_hex,
-            span_id_hex,
-            trace_flags_hex,
-            future_vals,
-        ) = valid_tp_values.groups()  # type: Tuple[str, str, str, str, Optional[str]]
+        version, trace_id, span_id, trace_flags, future_vals = decode_traceparent(tp)
 
         if version == "ff":
             # https://www.w3.org/TR/trace-context/#version
@@ -629,16 +693,12 @@ class _TraceContext:
         elif version == "00" and future_vals is not None:
             raise ValueError("Traceparents with the version `00` should contain 4 values delimited by a dash: %s" % tp)
 
-        trace_id = _hex_id_to_dd_id(trace_id_hex)
-        span_id = _hex_id_to_dd_id(span_id_hex)
-
         # All 0s are invalid values
         if trace_id == 0:
             raise ValueError("0 value for trace_id is invalid")
         if span_id == 0:
             raise ValueError("0 value for span_id is invalid")
 
-        trace_flags = _hex_id_to_dd_id(trace_flags_hex)
         # there's currently only one trace flag, which denotes sampling priority
         # was set to keep "01" or drop "00"
         # trace flags is a bit field: https://www.w3.org/TR/trace-context/#trace-flags
@@ -652,35 +712,7 @@ class _TraceContext:
 
         # tracestate list parsing example: ["dd=s:2;o:rum;t.dm:-4;t.usr.id:baz64","congo=t61rcWkgMzE"]
         # -> 2, {"_dd.p.dm":"-4","_dd.p.usr.id":"baz64"}, "rum"
-
-        dd = None
-        for list_mem in ts_l:
-            if list_mem.startswith("dd="):
-                # cut out dd= before turning into dict
-                list_mem = list_mem[3:]
-                # since tags can have a value with a :, we need to only split on the first instance of :
-                dd = dict(item.split(":", 1) for item in list_mem.split(";"))
-
-        # parse out values
-        if dd:
-            sampling_priority_ts = dd.get("s")
-            if sampling_priority_ts is not None:
-                sampling_priority_ts_int = int(sampling_priority_ts)
-            else:
-                sampling_priority_ts_int = None
-
-            origin = dd.get("o")
-            if origin:
-                # we encode "=" as "~" in tracestate so need to decode here
-                origin = _TraceContext.decode_tag_val(origin)
-            # need to convert from t. to _dd.p.
-            other_propagated_tags = {
-                "_dd.p.%s" % k[2:]: _TraceContext.decode_tag_val(v) for (k, v) in dd.items() if k.startswith("t.")
-            }
-
-            return sampling_priority_ts_int, other_propagated_tags, origin
-        else:
-            return None, {}, None
+        return decode_tracestate(ts_l)
 
     @staticmethod
     def _get_sampling_priority(traceparent_sampled, tracestate_sampling_priority):
@@ -855,7 +887,9 @@ class HTTPPropagator(object):
             return Context()
 
         try:
-            normalized_headers = {name.lower(): v for name, v in headers.items()}
+            # DEV: header names are only normalized if needed, as the view is
+            # shared by all the styles
+            normalized_headers = _get_headers_view(headers)
 
             # loop through the extract propagation styles specified in order
             for prop_style in config._propagation_style_extract:
@@ -20,8 +20,8 @@ from .internal.constants import DEFAULT_SAMPLING_RATE_LIMIT
 from .internal.constants import MAX_UINT_64BITS as _MAX_UINT_64BITS
 from .internal.logger import get_logger
 from .internal.rate_limiter import RateLimiter
+from .internal.sampling import SamplingRuleIndex
 from .internal.sampling import _apply_rate_limit
-from .internal.sampling import _get_highest_precedence_rule_matching
 from .internal.sampling import _set_sampling_tags
 from .sampling_rule import SamplingRule
 from .settings import _config as ddconfig
@@ -209,7 +209,7 @@ class DatadogSampler(RateByServiceSampler):
     per second.
     """
 
-    __slots__ = ("limiter", "rules")
+    __slots__ = ("limiter", "rules", "_rule_index")
 
     NO_RATE_LIMIT = -1
     # deprecate and remove the DEFAULT_RATE_LIMIT field from DatadogSampler
@@ -262,6 +262,8 @@ class DatadogSampler(RateByServiceSampler):
         if default_sample_rate is not None:
             self.rules.append(SamplingRule(sample_rate=default_sample_rate))
 
+        self._rule_index = SamplingRuleIndex(self.rules)
+
         # Configure rate limiter
         self.limiter = RateLimiter(rate_limit)
 
@@ -304,7 +306,11 @@ class DatadogSampler(RateByServiceSampler):
         """
         If allow_false is False, this function will return True regardless of the sampling decision
         """
-        matched_rule = _get_highest_precedence_rule_matching(span, self.rules)
+        rule_index = self._rule_index
+        if rule_index.is_stale(self.rules):
+            # The rules were changed after the sampler was created
+            rule_index = self._rule_index = SamplingRuleIndex(self.rules)
+        matched_rule = rule_index.match(span)
 
         if matched_rule:
             sampled = matched_rule.sample(span)
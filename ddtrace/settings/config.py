@@ -21,10 +21,15 @@ from ddtrace.vendor.debtcollector import deprecate
 from ..internal import gitmetadata
 from ..internal.constants import _PROPAGATION_STYLE_DEFAULT
 from ..internal.constants import DEFAULT_BUFFER_SIZE
+from ..internal.constants import DEFAULT_FLUSH_WATERMARK
 from ..internal.constants import DEFAULT_MAX_PAYLOAD_SIZE
+from ..internal.constants import DEFAULT_MAX_PROCESSING_INTERVAL
+from ..internal.constants import DEFAULT_MIN_COMPRESSION_SIZE
 from ..internal.constants import DEFAULT_PROCESSING_INTERVAL
 from ..internal.constants import DEFAULT_REUSE_CONNECTIONS
 from ..internal.constants import DEFAULT_SAMPLING_RATE_LIMIT
+from ..internal.constants import DEFAULT_SPAN_AGGREGATOR_MAX_SPANS
+from ..internal.constants import DEFAULT_SPILL_MAX_SIZE
 from ..internal.constants import DEFAULT_TIMEOUT
 from ..internal.constants import PROPAGATION_STYLE_ALL
 from ..internal.constants import PROPAGATION_STYLE_B3_SINGLE
@@ -249,7 +254,15 @@ class Config(object):
         self._trace_sampling_rules = os.getenv("DD_TRACE_SAMPLING_RULES")
         self._partial_flush_enabled = asbool(os.getenv("DD_TRACE_PARTIAL_FLUSH_ENABLED", default=True))
         self._partial_flush_min_spans = int(os.getenv("DD_TRACE_PARTIAL_FLUSH_MIN_SPANS", default=300))
+        self._span_aggregator_max_spans = int(
+            os.getenv("DD_TRACE_SPAN_AGGREGATOR_MAX_SPANS", default=DEFAULT_SPAN_AGGREGATOR_MAX_SPANS)
+        )
+        self._span_aggregator_max_trace_age = float(
+            os.getenv("DD_TRACE_SPAN_AGGREGATOR_MAX_TRACE_AGE_SECONDS", default=0)
+        )
         self._priority_sampling = asbool(os.getenv("DD_PRIORITY_SAMPLING", default=True))
+        self._sql_obfuscation_enabled = asbool(os.getenv("DD_TRACE_SQL_OBFUSCATION_ENABLED", default=False))
+        self._sql_obfuscation_cache_size = int(os.getenv("DD_TRACE_SQL_OBFUSCATION_CACHE_SIZE", default=1024))
 
         header_tags = parse_tags_str(os.getenv("DD_TRACE_HEADER_TAGS", ""))
         self.http = HttpConfig(header_tags=header_tags)
@@ -270,10 +283,28 @@ class Config(object):
         self._trace_writer_interval_seconds = float(
             os.getenv("DD_TRACE_WRITER_INTERVAL_SECONDS", default=DEFAULT_PROCESSING_INTERVAL)
         )
+        self._trace_writer_adaptive_interval = asbool(os.getenv("DD_TRACE_WRITER_ADAPTIVE_INTERVAL_ENABLED", False))
+        self._trace_writer_max_interval_seconds = float(
+            os.getenv("DD_TRACE_WRITER_MAX_INTERVAL_SECONDS", default=DEFAULT_MAX_PROCESSING_INTERVAL)
+        )
+        self._trace_writer_flush_watermark = float(
+            os.getenv("DD_TRACE_WRITER_FLUSH_WATERMARK", default=DEFAULT_FLUSH_WATERMARK)
+        )
         self._trace_writer_connection_reuse = asbool(
             os.getenv("DD_TRACE_WRITER_REUSE_CONNECTIONS", DEFAULT_REUSE_CONNECTIONS)
         )
         self._trace_writer_log_err_payload = asbool(os.environ.get("_DD_TRACE_WRITER_LOG_ERROR_PAYLOADS", False))
+        self._trace_writer_max_inflight_payloads = int(os.getenv("DD_TRACE_WRITER_MAX_INFLIGHT_PAYLOADS", default=0))
+        self._trace_writer_compression = os.getenv("DD_TRACE_WRITER_COMPRESSION")
+        self._trace_writer_compression_min_size = int(
+            os.getenv("DD_TRACE_WRITER_COMPRESSION_MIN_SIZE_BYTES", default=DEFAULT_MIN_COMPRESSION_SIZE)
+        )
+        self._trace_writer_spill_dir = os.getenv("DD_TRACE_WRITER_SPILL_DIR")
+        self._trace_writer_spill_max_size = int(
+            os.getenv("DD_TRACE_WRITER_SPILL_MAX_SIZE_BYTES", default=DEFAULT_SPILL_MAX_SIZE)
+        )
+        self._trace_writer_spill_drain_payloads = int(os.getenv("DD_TRACE_WRITER_SPILL_DRAIN_PAYLOADS", default=5))
+        self._trace_writer_interned_strings = int(os.getenv("DD_TRACE_WRITER_INTERNED_STRINGS", default=0))
 
         self._trace_agent_hostname = os.environ.get("DD_AGENT_HOST", os.environ.get("DD_TRACE_AGENT_HOSTNAME"))
         self._trace_agent_port = os.environ.get("DD_AGENT_PORT", os.environ.get("DD_TRACE_AGENT_PORT"))
@@ -375,6 +406,9 @@ class Config(object):
             )
         )
         self._data_streams_enabled = asbool(os.getenv("DD_DATA_STREAMS_ENABLED", False))
+        self._data_streams_high_throughput_enabled = asbool(
+            os.getenv("DD_DATA_STREAMS_HIGH_THROUGHPUT_ENABLED", default=False)
+        )
         self._appsec_enabled = asbool(os.getenv(APPSEC_ENV, False))
         self._automatic_login_events_mode = os.getenv(APPSEC.AUTOMATIC_USER_EVENTS_TRACKING, "safe")
         self._user_model_login_field = os.getenv(APPSEC.USER_MODEL_LOGIN_FIELD, default="")
@@ -94,6 +94,16 @@ class ProfilingConfig(En):
         help="",
     )
 
+    aggregate_events = En.v(
+        bool,
+        "aggregate_events",
+        default=False,
+        help_type="Boolean",
+        help="Whether to aggregate the profiling samples as they are collected instead of storing each of them "
+        "until they are exported. The memory used then depends on the number of distinct stacks and labels "
+        "rather than on the number of samples",
+    )
+
     upload_interval = En.v(
         float,
         "upload_interval",
@@ -176,6 +186,34 @@ class ProfilingConfig(En):
             help="Whether to enable the lock profiler",
         )
 
+        contention_only = En.v(
+            bool,
+            "contention_only",
+            default=False,
+            help_type="Boolean",
+            help="Whether the lock profiler should only record the acquisitions of locks that had to wait for them "
+            "and the releases of locks held for longer than the contention threshold. The capture percentage is "
+            "then adapted to keep the time spent recording them under the lock profiler maximum time usage",
+        )
+
+        contention_threshold = En.v(
+            float,
+            "contention_threshold",
+            default=0.001,
+            help_type="Float",
+            help="The minimum time in seconds a lock must be held for its release to be recorded when the lock "
+            "profiler only records contention",
+        )
+
+        max_time_usage_pct = En.v(
+            float,
+            "max_time_usage_pct",
+            default=1.0,
+            help_type="Float",
+            help="The percentage of maximum time the lock profiler can use to record lock contention. "
+            "Must be greater than 0 and lesser or equal to 100",
+        )
+
     class Memory(En):
         __item__ = __prefix__ = "memory"
 
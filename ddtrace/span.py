@@ -33,6 +33,10 @@ from .ext import http
 from .ext import net
 from .internal._rand import rand64bits as _rand64bits
 from .internal._rand import rand128bits as _rand128bits
+from .internal._tagging import TAG_KIND_META as _TAG_KIND_META
+from .internal._tagging import TAG_KIND_METRIC as _TAG_KIND_METRIC
+from .internal._tagging import is_real_number as _is_real_number
+from .internal._tagging import tag_kind as _tag_kind
 from .internal.compat import NumericType
 from .internal.compat import StringIO
 from .internal.compat import ensure_text
@@ -80,9 +84,9 @@ class Span(object):
         "span_id",
         "trace_id",
         "parent_id",
-        "_meta",
+        "_meta_dict",
         "error",
-        "_metrics",
+        "_metrics_dict",
         "_store",
         "span_type",
         "start_ns",
@@ -152,9 +156,11 @@ class Span(object):
         self._span_api = span_api
 
         # tags / metadata
-        self._meta = {}  # type: _MetaDictType
+        # DEV: the dictionaries are only allocated when the first tag or
+        # metric is set since most spans only carry a handful of either.
+        self._meta_dict = None  # type: Optional[_MetaDictType]
         self.error = 0
-        self._metrics = {}  # type: _MetricDictType
+        self._metrics_dict = None  # type: Optional[_MetricDictType]
 
         # timing
         self.start_ns = time_ns() if start is None else int(start * 1e9)  # type: int
@@ -175,7 +181,7 @@ class Span(object):
         self.sampled = True  # type: bool
 
         self._context = context._with_span(self) if context else None  # type: Optional[Context]
-        self._links = links or []
+        self._links = links or None  # type: Optional[List[_span_link.SpanLink]]
         self._parent = None  # type: Optional[Span]
         self._ignored_exceptions = None  # type: Optional[List[Exception]]
         self._local_root = None  # type: Optional[Span]
@@ -206,6 +212,30 @@ class Span(object):
             return None
         return self._store.get(key)
 
+    @property
+    def _meta(self):
+        # type: () -> _MetaDictType
+        if self._meta_dict is None:
+            self._meta_dict = {}
+        return self._meta_dict
+
+    @_meta.setter
+    def _meta(self, value):
+        # type: (_MetaDictType) -> None
+        self._meta_dict = value
+
+    @property
+    def _metrics(self):
+        # type: () -> _MetricDictType
+        if self._metrics_dict is None:
+            self._metrics_dict = {}
+        return self._metrics_dict
+
+    @_metrics.setter
+    def _metrics(self, value):
+        # type: (_MetricDictType) -> None
+        self._metrics_dict = value
+
     @property
     def _trace_id_64bits(self):
         return _get_64_lowest_order_bits_as_int(self.trace_id)
@@ -287,9 +317,11 @@ class Span(object):
     def _override_sampling_decision(self, decision):
         self.context.sampling_priority = decision
         set_sampling_decision_maker(self.context, SamplingMechanism.MANUAL)
-        for key in (SAMPLING_RULE_DECISION, SAMPLING_AGENT_DECISION, SAMPLING_LIMIT_DECISION):
-            if key in self._local_root._metrics:
-                del self._local_root._metrics[key]
+        metrics = self._local_root._metrics_dict
+        if metrics:
+            for key in (SAMPLING_RULE_DECISION, SAMPLING_AGENT_DECISION, SAMPLING_LIMIT_DECISION):
+                if key in metrics:
+                    del metrics[key]
 
     def set_tag(self, key: _TagNameType, value: Any = None) -> None:
         """Set a tag key/value pair on the span.
@@ -301,6 +333,16 @@ class Span(object):
         :param value: Value to assign for the tag
         :type value: ``stringify``-able value
         """
+        # Fast path for the most common tags, which need no special handling
+        kind = _tag_kind(key, value)
+        if kind == _TAG_KIND_META:
+            self._meta[key] = value
+            if self._metrics_dict and key in self._metrics_dict:
+                del self._metrics_dict[key]
+            return
+        elif kind == _TAG_KIND_METRIC:
+            self.set_metric(key, value)
+            return
 
         if not isinstance(key, six.string_types):
             log.warning("Ignoring tag pair %s:%s. Key must be a string.", key, value)
@@ -371,8 +413,8 @@ class Span(object):
 
         try:
             self._meta[key] = stringify(value)
-            if key in self._metrics:
-                del self._metrics[key]
+            if self._metrics_dict and key in self._metrics_dict:
+                del self._metrics_dict[key]
         except Exception:
             log.warning("error setting tag %s, ignoring it", key, exc_info=True)
 
@@ -389,16 +431,18 @@ class Span(object):
             log.warning("Failed to set text tag '%s'", key, exc_info=True)
 
     def _remove_tag(self, key: _TagNameType) -> None:
-        if key in self._meta:
-            del self._meta[key]
+        if self._meta_dict and key in self._meta_dict:
+            del self._meta_dict[key]
 
     def get_tag(self, key: _TagNameType) -> Optional[Text]:
         """Return the given tag or None if it doesn't exist."""
-        return self._meta.get(key, None)
+        if self._meta_dict is None:
+            return None
+        return self._meta_dict.get(key, None)
 
     def get_tags(self) -> _MetaDictType:
         """Return all tags."""
-        return self._meta.copy()
+        return self._meta_dict.copy() if self._meta_dict else {}
 
     def set_tags(self, tags: Dict[_TagNameType, Any]) -> None:
         """Set a dictionary of tags on the given span. Keys and values
@@ -419,24 +463,25 @@ class Span(object):
                 log.warning("failed to convert %r tag to an integer from %r", key, value)
                 return
 
-        # FIXME[matt] we could push this check to serialization time as well.
-        # only permit types that are commonly serializable (don't use
-        # isinstance so that we convert unserializable types like numpy
-        # numbers)
-        if type(value) not in numeric_types:
-            try:
-                value = float(value)
-            except (ValueError, TypeError):
-                log.debug("ignoring not number metric %s:%s", key, value)
+        if not _is_real_number(value):
+            # FIXME[matt] we could push this check to serialization time as well.
+            # only permit types that are commonly serializable (don't use
+            # isinstance so that we convert unserializable types like numpy
+            # numbers)
+            if type(value) not in numeric_types:
+                try:
+                    value = float(value)
+                except (ValueError, TypeError):
+                    log.debug("ignoring not number metric %s:%s", key, value)
+                    return
+
+            # don't allow nan or inf
+            if math.isnan(value) or math.isinf(value):
+                log.debug("ignoring not real metric %s:%s", key, value)
                 return
 
-        # don't allow nan or inf
-        if math.isnan(value) or math.isinf(value):
-            log.debug("ignoring not real metric %s:%s", key, value)
-            return
-
-        if key in self._meta:
-            del self._meta[key]
+        if self._meta_dict and key in self._meta_dict:
+            del self._meta_dict[key]
         self._metrics[key] = value
 
     def set_metrics(self, metrics: _MetricDictType) -> None:
@@ -446,11 +491,13 @@ class Span(object):
 
     def get_metric(self, key: _TagNameType) -> Optional[NumericType]:
         """Return the given metric or None if it doesn't exist."""
-        return self._metrics.get(key)
+        if self._metrics_dict is None:
+            return None
+        return self._metrics_dict.get(key)
 
     def get_metrics(self) -> _MetricDictType:
         """Return all metrics."""
-        return self._metrics.copy()
+        return self._metrics_dict.copy() if self._metrics_dict else {}
 
     def set_traceback(self, limit=30):
         # type: (int) -> None
@@ -505,8 +552,8 @@ class Span(object):
             ("end", None if not self.duration else self.start + self.duration),
             ("duration", self.duration),
             ("error", self.error),
-            ("tags", dict(sorted(self._meta.items()))),
-            ("metrics", dict(sorted(self._metrics.items()))),
+            ("tags", dict(sorted(self._meta_dict.items())) if self._meta_dict else {}),
+            ("metrics", dict(sorted(self._metrics_dict.items())) if self._metrics_dict else {}),
         ]
         return " ".join(
             # use a large column width to keep pprint output on one line
@@ -541,6 +588,8 @@ class Span(object):
         if attributes is None:
             attributes = dict()
 
+        if self._links is None:
+            self._links = []
         self._links.append(
             _span_link.SpanLink(
                 trace_id=trace_id,
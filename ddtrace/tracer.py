@@ -29,6 +29,8 @@ from .internal import compat
 from .internal import debug
 from .internal import forksafe
 from .internal import hostname
+from .internal._tagging import TAG_KIND_META
+from .internal._tagging import tag_kind
 from .internal.atexit import register_on_exit_signal
 from .internal.constants import SAMPLING_DECISION_TRACE_TAG_KEY
 from .internal.constants import SPAN_API_DATADOG
@@ -179,6 +181,59 @@ def _default_span_processors_factory(
     return span_processors, appsec_processor, deferred_processors
 
 
+class _SpanTemplate(object):
+    """The tracer state applied to every span it starts.
+
+    The template is compiled once per tracer configuration, so that starting
+    a span only copies pre-resolved values instead of going through the
+    global configuration, the global tags and the span processors again.
+    """
+
+    __slots__ = ("tags", "env", "version", "service_mapping", "meta", "slow_tags", "processors")
+
+    def __init__(self, tracer):
+        # type: (Tracer) -> None
+        # The sources the template was compiled from, used to detect when it is stale
+        self.tags = tracer._tags
+        self.env = config.env
+        self.version = config.version
+        self.service_mapping = config.service_mapping
+
+        # Plain string tags are copied as is into the span meta, after the
+        # other tags which need the full handling of Span.set_tag.
+        meta = {}  # type: Dict[str, str]
+        slow_tags = {}  # type: Dict[str, Any]
+        for k, v in self.tags.items():
+            if k != PID and tag_kind(k, v) == TAG_KIND_META:
+                meta[k] = v
+            else:
+                slow_tags[k] = v
+        if self.env:
+            meta[ENV_KEY] = compat.ensure_text(self.env, errors="replace")
+        self.meta = meta
+        self.slow_tags = slow_tags
+
+        self.processors = tuple(
+            chain(tracer._span_processors, SpanProcessor.__processors__, tracer._deferred_processors)
+        )  # type: Tuple[SpanProcessor, ...]
+
+    def has_processors(self, tracer):
+        # type: (Tracer) -> bool
+        """Return whether the template has the current span processors of the tracer.
+
+        The processors are compared by identity as they can be swapped, or
+        added to the lists directly, without their number changing.
+        """
+        processors = self.processors
+        n = len(processors)
+        i = 0
+        for p in chain(tracer._span_processors, SpanProcessor.__processors__, tracer._deferred_processors):
+            if i == n or processors[i] is not p:
+                return False
+            i += 1
+        return i == n
+
+
 class Tracer(object):
     """
     Tracer is used to create, sample and submit spans that measure the
@@ -280,6 +335,7 @@ class Tracer(object):
         self._shutdown_lock = RLock()
 
         self._new_process = False
+        self._span_template = _SpanTemplate(self)
 
     def _atexit(self):
         # type: () -> None
@@ -508,6 +564,8 @@ class Tracer(object):
         if wrap_executor is not None:
             self._wrap_executor = wrap_executor
 
+        self._span_template = _SpanTemplate(self)
+
         self._generate_diagnostic_logs()
 
     def _generate_diagnostic_logs(self):
@@ -552,9 +610,26 @@ class Tracer(object):
             self._agent_url,
             self._endpoint_call_counter_span_processor,
         )
+        self._span_template = _SpanTemplate(self)
 
         self._new_process = True
 
+    def _get_span_template(self):
+        # type: () -> _SpanTemplate
+        """Return the span template for the current configuration, compiling
+        a new one if the configuration changed since the last one.
+        """
+        template = self._span_template
+        if (
+            template.tags is not self._tags
+            or template.env is not config.env
+            or template.version is not config.version
+            or template.service_mapping is not config.service_mapping
+            or not template.has_processors(self)
+        ):
+            template = self._span_template = _SpanTemplate(self)
+        return template
+
     def _start_span_after_shutdown(
         self,
         name,  # type: str
@@ -636,6 +711,8 @@ class Tracer(object):
                     self.context_provider.activate(new_ctx)
                 child_of = new_ctx
 
+        template = self._get_span_template()
+
         parent = None  # type: Optional[Span]
         if child_of is not None:
             if isinstance(child_of, Context):
@@ -662,7 +739,8 @@ class Tracer(object):
                 service = config.service
 
         # Update the service name based on any mapping
-        service = config.service_mapping.get(service, service)
+        if template.service_mapping:
+            service = template.service_mapping.get(service, service)
 
         if trace_id:
             # child_of a non-empty context, so either a local child span or from a remote context
@@ -709,14 +787,21 @@ class Tracer(object):
             span._metrics[PID] = self._pid
 
         # Apply default global tags.
-        if self._tags:
-            span.set_tags(self._tags)
-
-        if config.env:
-            span.set_tag_str(ENV_KEY, config.env)
+        if template.slow_tags:
+            span.set_tags(template.slow_tags)
+        if template.meta:
+            if span._meta_dict is None:
+                span._meta_dict = template.meta.copy()
+            else:
+                span._meta_dict.update(template.meta)
+            # Like Span.set_tag, a string tag replaces the metric with the same key
+            metrics = span._metrics_dict
+            if metrics:
+                for k in template.meta:
+                    metrics.pop(k, None)
 
         # Only set the version tag on internal spans.
-        if config.version:
+        if template.version:
             root_span = self.current_root_span()
             # if: 1. the span is the root span and the span's service matches the global config; or
             #     2. the span is not the root, but the root span's service matches the span's service
@@ -725,7 +810,7 @@ class Tracer(object):
             if (root_span is None and service == config.service) or (
                 root_span and root_span.service == service and root_span.get_tag(VERSION_KEY) is not None
             ):
-                span.set_tag_str(VERSION_KEY, config.version)
+                span.set_tag_str(VERSION_KEY, template.version)
 
         if activate:
             self.context_provider.activate(span)
@@ -739,7 +824,7 @@ class Tracer(object):
 
         # Only call span processors if the tracer is enabled
         if self.enabled:
-            for p in chain(self._span_processors, SpanProcessor.__processors__, self._deferred_processors):
+            for p in template.processors:
                 p.on_span_start(span)
         self._hooks.emit(self.__class__.start_span, span)
 
@@ -757,7 +842,7 @@ class Tracer(object):
 
         # Only call span processors if the tracer is enabled
         if self.enabled:
-            for p in chain(self._span_processors, SpanProcessor.__processors__, self._deferred_processors):
+            for p in self._get_span_template().processors:
                 p.on_span_finish(span)
 
         if log.isEnabledFor(logging.DEBUG):
@@ -981,6 +1066,7 @@ class Tracer(object):
         :param dict tags: dict of tags to set at tracer level
         """
         self._tags.update(tags)
+        self._span_template = _SpanTemplate(self)
 
     def shutdown(self, timeout=None):
         # type: (Optional[float]) -> None
@@ -996,6 +1082,7 @@ class Tracer(object):
             deferred_processors = self._deferred_processors
             self._span_processors = []
             self._deferred_processors = []
+            self._span_template = _SpanTemplate(self)
             for processor in chain(span_processors, SpanProcessor.__processors__, deferred_processors):
                 if hasattr(processor, "shutdown"):
                     processor.shutdown(timeout)
@@ -609,6 +609,26 @@ setup(
                 sources=["ddtrace/internal/_tagset.pyx"],
                 language="c",
             ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal._propagation",
+                sources=["ddtrace/internal/_propagation.pyx"],
+                language="c",
+            ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal._tagging",
+                sources=["ddtrace/internal/_tagging.pyx"],
+                language="c",
+            ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal._sketch",
+                sources=["ddtrace/internal/_sketch.pyx"],
+                language="c",
+            ),
+            Cython.Distutils.Extension(
+                "ddtrace.internal.datastreams._pathway",
+                sources=["ddtrace/internal/datastreams/_pathway.pyx"],
+                language="c",
+            ),
             Extension(
                 "ddtrace.internal._encoding",
                 ["ddtrace/internal/_encoding.pyx"],
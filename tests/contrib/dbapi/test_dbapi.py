@@ -288,6 +288,28 @@ class TestTracedCursor(TracerTestCase):
         span = self.pop_spans()[0]
         self.assertIsNone(span.get_metric(ANALYTICS_SAMPLE_RATE_KEY))
 
+    def test_sql_obfuscation(self):
+        cursor = self.cursor
+        cursor.rowcount = 0
+        pin = Pin("pin_name", tracer=self.tracer)
+        traced_cursor = TracedCursor(cursor, pin, {})
+        query = "SELECT * FROM users WHERE id = 42 AND name = 'dog'"
+
+        traced_cursor.execute(query)
+        with self.override_global_config(dict(_sql_obfuscation_enabled=True)):
+            traced_cursor.execute(query)
+            traced_cursor.execute("SELECT * FROM users WHERE id = 43 AND name = 'cat'")
+
+        # The query sent to the database is left untouched
+        cursor.execute.assert_called_with("SELECT * FROM users WHERE id = 43 AND name = 'cat'")
+        raw, obfuscated, other = self.pop_spans()
+        assert raw.resource == query
+        assert raw.get_tag("sql.query_hash") is None
+        assert obfuscated.resource == "SELECT * FROM users WHERE id = ? AND name = ?"
+        assert obfuscated.get_tag("sql.query_hash") is not None
+        assert other.resource == obfuscated.resource
+        assert other.get_tag("sql.query_hash") == obfuscated.get_tag("sql.query_hash")
+
 
 class TestFetchTracedCursor(TracerTestCase):
     def setUp(self):
@@ -610,6 +610,33 @@ def test_data_streams_kafka_offset_monitoring_offsets(dsm_processor, non_auto_co
     assert list(buckets.values())[0].latest_commit_offsets[ConsumerPartitionKey("test_group", kafka_topic, 0)] == 1
 
 
+def test_data_streams_kafka_consume(dsm_processor, consumer, producer, kafka_topic):
+    PAYLOAD = bytes("data streams", encoding="utf-8") if six.PY3 else bytes("data streams")
+    try:
+        del dsm_processor._current_context.value
+    except AttributeError:
+        pass
+    producer.produce(kafka_topic, PAYLOAD, key="test_key_1")
+    producer.produce(kafka_topic, PAYLOAD, key="test_key_2")
+    producer.flush()
+    messages = []
+    while len(messages) < 2:
+        messages += consumer.consume(num_messages=2, timeout=1.0)
+    buckets = dsm_processor._buckets
+    assert len(buckets) == 1
+    first = list(buckets.values())[0].pathway_stats
+    # The messages of the batch are checkpointed together on the same pathway
+    in_key = (
+        "direction:in,group:test_group,topic:{},type:kafka".format(kafka_topic),
+        6611771803293368236,
+        7591515074392955298,
+    )
+    assert first[in_key].full_pathway_latency._count == 2
+    assert first[in_key].edge_latency._count == 2
+    assert dsm_processor._current_context.value.hash == 6611771803293368236
+    assert list(buckets.values())[0].latest_commit_offsets[ConsumerPartitionKey("test_group", kafka_topic, 0)] == 1
+
+
 def test_data_streams_kafka_offset_monitoring_auto_commit(dsm_processor, consumer, producer, kafka_topic):
     def _read_single_message(consumer):
         message = None
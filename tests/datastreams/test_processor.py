@@ -1,9 +1,15 @@
 import os
+import threading
 import time
 
+from ddsketch.pb.ddsketch_pb2 import DDSketch as DDSketchPb
+from ddsketch.pb.proto import DDSketchProto
+import mock
+
 from ddtrace.internal.datastreams.processor import ConsumerPartitionKey
 from ddtrace.internal.datastreams.processor import DataStreamsProcessor
 from ddtrace.internal.datastreams.processor import PartitionKey
+from tests.utils import override_global_config
 
 
 def test_data_streams_processor():
@@ -29,6 +35,98 @@ def test_data_streams_processor():
     )  # relative accuracy of 0.00775
 
 
+def test_data_streams_processor_high_throughput():
+    def create_checkpoints(processor):
+        for i in range(1, 201):
+            processor.on_checkpoint_creation(1, 2, ["direction:out", "topic:topicA", "type:kafka"], now, i / 1e3, i)
+            processor.on_checkpoint_creation(2, 4, ["direction:in", "topic:topicA", "type:kafka"], now, i / 1e2, i * 2)
+
+    def serialize(processor):
+        processor.stop()
+        processor.join()
+        with processor._lock:
+            serialized = processor._serialize_buckets()
+        assert len(serialized) == 1
+        stats = {}
+        for stat in serialized[0]["Stats"]:
+            for key in ("PathwayLatency", "EdgeLatency"):
+                sketch = DDSketchProto.from_proto(DDSketchPb.FromString(stat[key]))
+                stats[(stat["Hash"], stat["ParentHash"], key)] = (
+                    sketch.count,
+                    sketch._zero_count,
+                    {sketch._store.offset + i: c for i, c in enumerate(sketch._store.bins) if c},
+                )
+        return stats
+
+    now = time.time()
+    expected = DataStreamsProcessor("http://localhost:8126")
+    for _ in range(4):
+        create_checkpoints(expected)
+
+    with override_global_config(dict(_data_streams_high_throughput_enabled=True)):
+        processor = DataStreamsProcessor("http://localhost:8126")
+    threads = [threading.Thread(target=create_checkpoints, args=(processor,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # The stats accumulated by the threads are merged into the same sketches
+    stats = serialize(processor)
+    assert stats[(1, 2, "PathwayLatency")][0] == 800
+    assert stats == serialize(expected)
+    # The accumulated stats are only serialized once
+    with processor._lock:
+        assert processor._serialize_buckets() == []
+
+
+def test_data_streams_consume_checkpoints():
+    def produce(service, now_sec):
+        processor = DataStreamsProcessor("http://localhost:8126")
+        processor.stop()
+        with override_global_config(dict(service=service)):
+            ctx = processor.new_pathway(now_sec - 5)
+            ctx.set_checkpoint(["direction:out", "topic:topicA", "type:kafka"], now_sec=now_sec - 1)
+        return ctx.encode()
+
+    def stats(processor):
+        return {
+            key: [
+                DDSketchProto.to_proto(sketch).SerializeToString()
+                for sketch in (stat.full_pathway_latency, stat.edge_latency, stat.payload_size)
+            ]
+            for bucket in processor._buckets.values()
+            for key, stat in bucket.pathway_stats.items()
+        }
+
+    now = time.time()
+    pathways = [produce("service-a", now - i) for i in range(10)] + [produce("service-b", now - i) for i in range(10)]
+    pathways += [None, b"", b"invalid"]
+    tags = ["type:kafka", "topic:topicA", "direction:in"]
+
+    expected = DataStreamsProcessor("http://localhost:8126")
+    expected.stop()
+    with mock.patch("time.time", return_value=now):
+        for i, pathway in enumerate(pathways):
+            expected_ctx = expected.decode_pathway(pathway)
+            expected_ctx.set_checkpoint(tags, now_sec=now, payload_size=i)
+
+    processor = DataStreamsProcessor("http://localhost:8126")
+    processor.stop()
+    ctx = processor.set_consume_checkpoints(tags, pathways, list(range(len(pathways))), now_sec=now)
+
+    # The messages of the same pathway are recorded on the same stats
+    assert len(stats(processor)) == 3
+    assert stats(processor) == stats(expected)
+    assert processor._current_context.value is ctx
+    # The context of the last message can be used to produce downstream
+    assert ctx.hash == expected_ctx.hash
+    assert ctx.pathway_start_sec == expected_ctx.pathway_start_sec
+    for c in (ctx, expected_ctx):
+        c.set_checkpoint(["direction:out", "topic:topicB", "type:kafka"], now_sec=now + 1)
+    assert ctx.encode() == expected_ctx.encode()
+
+
 def test_data_streams_loop_protection():
     processor = DataStreamsProcessor("http://localhost:8126")
     ctx = processor.set_checkpoint(["direction:in", "topic:topicA", "type:kafka"])
@@ -100,6 +100,27 @@ class TestContextEventsApi(unittest.TestCase):
             pass
         assert handler.called
 
+    def test_core_dispatch_no_listeners(self):
+        assert core.dispatch("my.cool.event", [42]) == ([], [])
+        with pytest.raises(TypeError):
+            core.dispatch("my.cool.event", [42], 42)
+        assert core.ExecutionContext("my.cool.context").end() == ([], [])
+
+    def test_core_on_during_dispatch(self):
+        event_name = "my.cool.event"
+        late_handler = mock.Mock()
+
+        def handler():
+            core.on(event_name, late_handler)
+            return True
+
+        core.on(event_name, handler)
+        # The listeners registered while dispatching are only called by the following dispatches
+        assert core.dispatch(event_name, []) == ([True], [None])
+        assert not late_handler.called
+        core.dispatch(event_name, [])
+        assert late_handler.called
+
     def test_core_root_context(self):
         root_context = core._CURRENT_CONTEXT.get()
         assert isinstance(root_context, core.ExecutionContext)
@@ -158,6 +158,49 @@ def test_dbm_dddbs_peer_service_enabled():
     ), sqlcomment
 
 
+@pytest.mark.subprocess(
+    env=dict(
+        DD_DBM_PROPAGATION_MODE="full",
+        DD_SERVICE="orders-app",
+        DD_ENV="staging",
+    )
+)
+def test_dbm_comment_config_change():
+    from ddtrace import config
+    from ddtrace import tracer
+    from ddtrace.propagation import _database_monitoring
+
+    dbm_popagator = _database_monitoring._DBM_Propagator(0, "query")
+
+    dbspan = tracer.trace("dbname", service="orders-db")
+    sqlcomment = dbm_popagator._get_dbm_comment(dbspan)
+    assert sqlcomment == "/*dddbs='orders-db',dde='staging',ddps='orders-app',traceparent='%s'*/ " % (
+        dbspan.context._traceparent,
+    )
+
+    # The comment of another span only differs by its traceparent
+    other_dbspan = tracer.trace("dbname", service="orders-db")
+    assert dbm_popagator._get_dbm_comment(other_dbspan) == sqlcomment.replace(
+        dbspan.context._traceparent, other_dbspan.context._traceparent
+    )
+
+    # Comments follow changes to the configuration
+    config.env = "prod"
+    config.version = "v1,2"
+    sqlcomment = dbm_popagator._get_dbm_comment(dbspan)
+    assert (
+        sqlcomment
+        == "/*dddbs='orders-db',dde='prod',ddps='orders-app',ddpv='v1%%%%2C2',traceparent='%s'*/ "
+        % (dbspan.context._traceparent,)
+    )
+
+    # Without any tag the traceparent is the only key of the comment
+    config.service = config.env = config.version = None
+    dbspan = tracer.trace("dbname", service=None)
+    dbspan.service = None
+    assert dbm_popagator._get_dbm_comment(dbspan) == "/*traceparent='%s'*/ " % (dbspan.context._traceparent,)
+
+
 def test_default_sql_injector(caplog):
     # test sql injection with unicode str
     dbm_comment = "/*dddbs='orders-db'*/ "
@@ -8,6 +8,11 @@ from ddtrace.profiling import recorder
 from ddtrace.profiling.collector import asyncio as collector_asyncio
 
 
+def test_contention_only_unsupported():
+    c = collector_asyncio.AsyncioLockCollector(recorder.Recorder(), contention_only=True)
+    assert not c._contention_only
+
+
 @pytest.mark.asyncio
 async def test_lock_acquire_events():
     r = recorder.Recorder()
@@ -90,3 +90,34 @@ def test_capture_sampler_bad_value():
 
     with pytest.raises(ValueError):
         collector.CaptureSampler(102)
+
+
+def test_adaptive_capture_sampler():
+    cs = collector.AdaptiveCaptureSampler(50, 1.0)
+    cs._last_adjustment_ns = 0
+    # Not adjusted before an interval elapsed
+    cs.add_used_time(int(0.1e9), int(0.5e9))
+    assert cs.capture_pct == 50
+    # 10% of the time spent capturing events
+    cs.add_used_time(0, int(1e9))
+    assert cs.capture_pct == 5
+    # No time spent capturing events
+    cs.add_used_time(0, int(2e9))
+    assert cs.capture_pct == 10
+    cs.add_used_time(int(0.0001e9), int(3e9))
+    assert cs.capture_pct == 20
+    # Capture percentage is bounded
+    for i in range(4, 10):
+        cs.add_used_time(0, int(i * 1e9))
+    assert cs.capture_pct == 100
+    for i in range(10, 30):
+        cs.add_used_time(int(1e9), int(i * 1e9))
+    assert cs.capture_pct == collector.AdaptiveCaptureSampler.MIN_CAPTURE_PCT
+
+
+def test_adaptive_capture_sampler_bad_value():
+    with pytest.raises(ValueError):
+        collector.AdaptiveCaptureSampler(1, 0)
+
+    with pytest.raises(ValueError):
+        collector.AdaptiveCaptureSampler(1, 101)
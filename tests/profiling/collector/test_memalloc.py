@@ -325,6 +325,18 @@ def test_heap_stress():
     _memalloc.stop()
 
 
+def test_heap_many_allocations():
+    # Track (almost) every allocation, more than a traceback array can hold
+    _memalloc.start(1, 1, 1)
+    try:
+        x = [object() for _ in range(100000)]
+        assert len(_memalloc.heap()) > 90000
+        del x
+        assert len(_memalloc.heap()) < 10000
+    finally:
+        _memalloc.stop()
+
+
 @pytest.mark.parametrize("heap_sample_size", (0, 512 * 1024, 1024 * 1024, 2048 * 1024, 4096 * 1024))
 def test_memalloc_speed(benchmark, heap_sample_size):
     if heap_sample_size:
@@ -18,9 +18,9 @@ TESTING_GEVENT = os.getenv("DD_PROFILE_TEST_GEVENT", False)
 def test_repr():
     test_collector._test_repr(
         collector_threading.ThreadingLockCollector,
-        "ThreadingLockCollector(status=<ServiceStatus.STOPPED: 'stopped'>, "
-        "recorder=Recorder(default_max_events=16384, max_events={}), capture_pct=1.0, nframes=64, "
-        "endpoint_collection_enabled=True, tracer=None)",
+        "ThreadingLockCollector(status=<ServiceStatus.STOPPED: 'stopped'>, recorder=Recorder(default_max_events=16384, "
+        "max_events={}), capture_pct=1.0, nframes=64, endpoint_collection_enabled=True, tracer=None, "
+        "contention_only=False, contention_threshold=0.001, max_time_usage_pct=1.0)",
     )
 
 
@@ -350,3 +350,200 @@ def test_user_threads_have_native_id():
         raise AssertionError("Thread.native_id not set")
 
     t.join()
+
+
+def test_lock_contention_only():
+    import time
+
+    from ddtrace.profiling import collector
+
+    r = recorder.Recorder()
+    with collector_threading.ThreadingLockCollector(
+        r, capture_pct=100, contention_only=True, contention_threshold=0.05
+    ) as c:
+        assert isinstance(c._capture_sampler, collector.AdaptiveCaptureSampler)
+        lock = threading.Lock()
+        # Neither waiting for the lock nor holding it long enough
+        lock.acquire()
+        lock.release()
+        assert lock.acquire(False)
+        assert not lock.acquire(False)
+        assert not lock.acquire(timeout=0.001)
+        lock.release()
+
+        acquired = threading.Event()
+
+        def hold_lock():
+            lock.acquire()
+            acquired.set()
+            time.sleep(0.1)
+            lock.release()
+
+        t = threading.Thread(target=hold_lock)
+        t.start()
+        acquired.wait()
+        assert lock.acquire()
+        lock.release()
+        t.join()
+
+    this_file = __file__.replace(".pyc", ".py")
+
+    assert len(r.events[collector_threading.ThreadingLockAcquireEvent]) == 1
+    event = r.events[collector_threading.ThreadingLockAcquireEvent][0]
+    assert event.thread_id == _thread.get_ident()
+    assert event.wait_time_ns > 0
+    assert event.frames[0][0] == this_file
+    assert event.frames[0][2] == "test_lock_contention_only"
+    assert event.sampling_pct == 100
+
+    assert len(r.events[collector_threading.ThreadingLockReleaseEvent]) == 1
+    event = r.events[collector_threading.ThreadingLockReleaseEvent][0]
+    assert event.thread_id == t.ident
+    assert event.locked_for_ns >= 0.05e9
+    assert event.frames[0][0] == this_file
+    assert event.frames[0][2] == "hold_lock"
+
+
+def test_lock_export_libdd():
+    import mock
+
+    r = recorder.Recorder()
+    with mock.patch("ddtrace.internal.datadog.profiling.ddup.SampleHandle") as SampleHandle:
+        with collector_threading.ThreadingLockCollector(
+            r, capture_pct=100, export_libdd_enabled=True, export_py_enabled=False
+        ):
+            lock = threading.Lock()
+            lock.acquire()
+            lock.release()
+
+    # The samples are only fed to the native profile
+    assert not r.events[collector_threading.ThreadingLockAcquireEvent]
+    assert not r.events[collector_threading.ThreadingLockReleaseEvent]
+
+    handle = SampleHandle.return_value
+    assert SampleHandle.call_count == 2
+    assert handle.flush_sample.call_count == 2
+    assert handle.push_acquire.call_count == 1
+    assert handle.push_release.call_count == 1
+    lock_name = "test_threading.py:%d" % (sys._getframe().f_lineno - 13)
+    handle.push_lock_name.assert_called_with(lock_name)
+    handle.push_threadinfo.assert_called_with(_thread.get_ident(), mock.ANY, mock.ANY)
+    name, filename, address, line = handle.push_frame.call_args_list[0][0]
+    assert name == "test_lock_export_libdd"
+    assert filename == __file__.replace(".pyc", ".py")
+
+
+def _lock_export_libdd_worker(lock, n, sampled=None, timeout=10):
+    import time
+
+    # Keep taking the lock until the sampled event is set, for no longer than the timeout
+    deadline = time.time() + timeout
+    i = 0
+    while i < n or (sampled is not None and not sampled.is_set() and time.time() < deadline):
+        lock.acquire()
+        lock.release()
+        i += 1
+
+
+def test_lock_export_libdd_threads():
+    import collections
+
+    import mock
+
+    from ddtrace.profiling.collector import stack
+    from ddtrace.settings.profiling import config
+
+    samples = []
+    sampled = threading.Event()
+
+    class SampleHandle(object):
+        # Record the samples the way the native profile gets them: all at once, when flushed
+        def __init__(self):
+            self.values = collections.defaultdict(list)
+
+        def __getattr__(self, name):
+            if not name.startswith("push_"):
+                raise AttributeError(name)
+            return lambda *args: self.values[name[5:]].append(args)
+
+        def flush_sample(self):
+            samples.append(self.values)
+            if "walltime" in self.values:
+                sampled.set()
+
+    r = recorder.Recorder()
+    with mock.patch("ddtrace.internal.datadog.profiling.ddup.SampleHandle", SampleHandle), mock.patch.object(
+        config.export, "libdd_enabled", True
+    ):
+        with stack.StackCollector(r, max_time_usage_pct=100), collector_threading.ThreadingLockCollector(
+            r, capture_pct=100, export_libdd_enabled=True, export_py_enabled=False
+        ):
+            lock = threading.Lock()
+            # Keep taking the lock until the stack collector has sampled the threads
+            threads = [threading.Thread(target=_lock_export_libdd_worker, args=(lock, 500, sampled)) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+    assert sampled.is_set()
+    lock_samples = [s for s in samples if s.get("lock_name") == [(lock._self_name,)]]
+    assert sum(len(s["acquire"]) for s in lock_samples) >= 4 * 500
+    assert any("release" in s for s in lock_samples)
+    thread_ids = {t.ident for t in threads}
+    for sample in samples:
+        if sample.get("lock_name") == [(lock._self_name,)]:
+            assert len(sample["acquire"]) + len(sample["release"]) == 1
+            assert "walltime" not in sample
+            [(thread_id, _, _)] = sample["threadinfo"]
+            assert thread_id in thread_ids
+            assert sample["frame"][0][0] == "_lock_export_libdd_worker"
+        elif "lock_name" in sample:
+            assert len(sample["acquire"]) + len(sample["release"]) == 1
+            assert "walltime" not in sample
+        else:
+            assert len(sample["walltime"]) == 1
+            assert "acquire" not in sample and "release" not in sample
+            assert len(sample["threadinfo"]) == 1
+
+
+def test_lock_export_libdd_native_threads():
+    import mock
+
+    from ddtrace.profiling.collector import stack
+    from ddtrace.settings.profiling import config
+
+    _ddup = pytest.importorskip("ddtrace.internal.datadog.profiling._ddup")
+    _ddup.init(service="test", env=None, version=None, tags=None, max_nframes=64, url="http://localhost:8126")
+
+    r = recorder.Recorder()
+    with mock.patch.object(config.export, "libdd_enabled", True):
+        with stack.StackCollector(r, max_time_usage_pct=100), collector_threading.ThreadingLockCollector(
+            r, capture_pct=100, export_libdd_enabled=True, export_py_enabled=False
+        ):
+            lock = threading.Lock()
+            threads = [threading.Thread(target=_lock_export_libdd_worker, args=(lock, 2000)) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+
+def test_lock_export_libdd_span(tracer):
+    _ddup = pytest.importorskip("ddtrace.internal.datadog.profiling._ddup")
+    _ddup.init(service="test", env=None, version=None, tags=None, max_nframes=64, url="http://localhost:8126")
+
+    # The samples of a real span go through the native sample handle
+    r = recorder.Recorder()
+    with collector_threading.ThreadingLockCollector(
+        r, tracer=tracer, capture_pct=100, export_libdd_enabled=True, export_py_enabled=False
+    ):
+        lock = threading.Lock()
+        with tracer.trace("test", resource="resource", span_type="web"):
+            lock.acquire()
+            lock.release()
+
+    handle = _ddup.SampleHandle()
+    with tracer.trace("test", resource="resource", span_type="web") as span:
+        handle.push_span(span, True)
+    handle.flush_sample()
@@ -20,3 +20,62 @@ def test_check_traceback_to_frames():
         (this_file, 7, "_x", ""),
         (this_file, 15, "test_check_traceback_to_frames", ""),
     ]
+
+
+class Foobar(object):
+    def method(self):
+        return sys._getframe()
+
+    @classmethod
+    def class_method(cls):
+        return sys._getframe()
+
+
+class Subclass(Foobar):
+    pass
+
+
+def _frames(max_nframes=1):
+    return _traceback.pyframe_to_frames(sys._getframe(1), max_nframes)[0]
+
+
+def test_pyframe_to_frames_interned():
+    frames = [_frames(2) for _ in range(2)]
+    assert frames[0] == frames[1]
+    assert frames[0][0] is frames[1][0]
+    assert frames[0][1] is frames[1][1]
+
+
+def test_frame_table_class_name():
+    table = _traceback.FrameTable()
+    this_file = __file__.replace(".pyc", ".py")
+
+    assert table.get_frame(Foobar().method()) == (this_file, 27, "method", "Foobar")
+    assert table.get_frame(Subclass().method()) == (this_file, 27, "method", "Subclass")
+    assert table.get_frame(Foobar().method()) is table.get_frame(Foobar().method())
+    assert table.get_frame(Subclass.class_method()) == (this_file, 31, "class_method", "Subclass")
+    assert len(table) == 2
+
+
+def test_frame_table_lru():
+    table = _traceback.FrameTable(maxsize=2)
+    codes = [compile("import sys; frame = sys._getframe()", "<code %d>" % i, "exec") for i in range(3)]
+
+    def _frame(code):
+        namespace = {}
+        exec(code, namespace)
+        return namespace["frame"]
+
+    frame = table.get_frame(_frame(codes[0]))
+    assert frame == ("<code 0>", 1, "<module>", "")
+    table.get_frame(_frame(codes[1]))
+    assert table.get_frame(_frame(codes[0])) is frame
+    table.get_frame(_frame(codes[2]))
+
+    assert len(table) == 2
+    assert codes[0] in table
+    assert codes[1] not in table
+    assert codes[2] in table
+
+    table.clear()
+    assert len(table) == 0
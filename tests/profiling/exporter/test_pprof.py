@@ -1,3 +1,4 @@
+import copy
 import os
 import platform
 
@@ -5,6 +6,7 @@ import mock
 import six
 
 from ddtrace import ext
+from ddtrace.profiling import recorder
 from ddtrace.profiling.collector import _lock
 from ddtrace.profiling.collector import memalloc
 from ddtrace.profiling.collector import stack_event
@@ -698,6 +700,21 @@ def test_pprof_exporter(gan):
     assert all(_ in exports.string_table for _ in ("time", "nanoseconds", "bonjour"))
 
 
+@mock.patch("ddtrace.internal.utils.config.get_application_name")
+def test_pprof_exporter_aggregated_events(gan):
+    gan.return_value = "bonjour"
+    r = recorder.AggregatingRecorder()
+    # Push the events twice so that they are aggregated
+    for test_events in (copy.deepcopy(TEST_EVENTS), copy.deepcopy(TEST_EVENTS)):
+        for events in test_events.values():
+            r.push_events(events)
+
+    expected, _ = pprof.PprofExporter().export({k: v * 2 for k, v in TEST_EVENTS.items()}, 1, 7)
+    exports, _ = pprof.PprofExporter().export(r.reset(), 1, 7)
+
+    assert exports == expected
+
+
 @mock.patch("ddtrace.internal.utils.config.get_application_name")
 def test_pprof_exporter_libs(gan):
     gan.return_value = "bonjour"
@@ -180,6 +180,23 @@ def test_disable_memory():
     assert all(not isinstance(col, memalloc.MemoryCollector) for col in profiler.Profiler()._profiler._collectors)
 
 
+def test_default_recorder():
+    from ddtrace.profiling import profiler
+    from ddtrace.profiling import recorder
+
+    assert not isinstance(profiler.Profiler()._profiler._recorder, recorder.AggregatingRecorder)
+
+
+@pytest.mark.subprocess(env=dict(DD_PROFILING_AGGREGATE_EVENTS="true"))
+def test_aggregate_events():
+    from ddtrace.profiling import profiler
+    from ddtrace.profiling import recorder
+
+    prof = profiler.Profiler()
+    assert isinstance(prof._profiler._recorder, recorder.AggregatingRecorder)
+    assert prof._profiler._scheduler.recorder is prof._profiler._recorder
+
+
 @pytest.mark.subprocess(
     env=dict(DD_PROFILING_AGENTLESS="true", DD_API_KEY="foobar", DD_SITE=None),
     err=None,
@@ -55,6 +55,61 @@ def test_limit():
     assert r.events[stack_event.StackSampleEvent].maxlen == 24
 
 
+def test_aggregating_recorder():
+    r = recorder.AggregatingRecorder()
+    frames = [("foobar.py", 23, "func1", ""), ("foobar.py", 44, "func2", "")]
+    resource = ["myresource"]
+    r.push_events(
+        [
+            stack_event.StackSampleEvent(
+                timestamp=i,
+                thread_id=1,
+                frames=list(frames),
+                nframes=2,
+                trace_resource_container=resource,
+                cpu_time_ns=i,
+                wall_time_ns=2 * i,
+                sampling_period=10,
+            )
+            for i in range(1, 5)
+        ]
+    )
+    r.push_event(stack_event.StackSampleEvent(thread_id=1, frames=frames[:1], nframes=1, cpu_time_ns=5))
+    r.push_event(
+        stack_event.StackSampleEvent(
+            thread_id=1, frames=list(frames), nframes=2, trace_resource_container=["myresource"]
+        )
+    )
+    # The samples are aggregated as they are pushed
+    assert len(r.events[stack_event.StackSampleEvent]) == 3
+
+    events = r.reset()
+    assert isinstance(events, recorder.AggregatedEvents)
+    assert len(r.events[stack_event.StackSampleEvent]) == 0
+    (first, count), (other_stack, other_stack_count), (other_resource, other_resource_count) = events[
+        stack_event.StackSampleEvent
+    ]
+    assert count == 4
+    assert first.timestamp == 1
+    assert first.cpu_time_ns == 10
+    assert first.wall_time_ns == 20
+    assert first.sampling_period == 40
+    assert first.trace_resource_container is resource
+    assert (other_stack_count, other_stack.cpu_time_ns) == (1, 5)
+    assert other_resource_count == 1
+
+
+def test_aggregating_recorder_limit():
+    r = recorder.AggregatingRecorder(max_events={stack_event.StackSampleEvent: 2})
+    for _ in range(2):
+        r.push_events([stack_event.StackSampleEvent(thread_id=i, cpu_time_ns=1) for i in range(3)])
+    # Only the samples of the events already recorded are kept once the limit is reached
+    assert [(e.thread_id, e.cpu_time_ns, count) for e, count in r.reset()[stack_event.StackSampleEvent]] == [
+        (0, 2, 2),
+        (1, 2, 2),
+    ]
+
+
 @pytest.mark.skipif(sys.platform == "win32", reason="fork only available on Unix")
 def test_fork():
     stdout, stderr, exitcode, pid = call_program("python", os.path.join(os.path.dirname(__file__), "recorder_fork.py"))
@@ -621,6 +621,43 @@ def test_msgpack_string_table():
     assert "foobar" not in t
 
 
+def test_msgpack_string_table_interned():
+    t = MsgpackStringTable(1 << 10, 4)
+
+    foo = t.index("foo")
+    bar = t.index("bar")
+    assert decode(t.flush() + b"\xc0", reconstruct=False) == [[b"", _ORIGIN_KEY, b"foo", b"bar"], None]
+
+    # Strings are kept across flushes with the same ids
+    for _ in range(2):
+        assert len(t) == 4
+        assert t.index("foo") == foo and t.index("bar") == bar
+        assert decode(t.flush() + b"\xc0", reconstruct=False) == [[b"", _ORIGIN_KEY, b"foo", b"bar"], None]
+
+    # The least recently used strings are evicted when there are too many
+    t.flush()
+    ids = {string: t.index(string) for string in ("bar", "baz", "qux", "quux")}
+    strings = decode(t.flush() + b"\xc0", reconstruct=False)[0]
+    assert {string: strings[_id] for string, _id in ids.items()} == {
+        string: string.encode() for string in ids
+    }
+    assert "foo" not in t
+    assert "bar" in t and "baz" in t and "qux" in t
+    assert len(t) == 5
+
+
+def test_encoder_interned_strings():
+    encoder = MsgpackEncoderV05(1 << 20, 1 << 20, max_interned_strings=10)
+    for _ in range(3):
+        encoder.put([Span(name="op", service="svc", resource="res")])
+        items = encoder._decode(encoder.encode())
+        string_table, traces = items
+        span = traces[0][0]
+        assert string_table[span[0]] == b"svc"
+        assert string_table[span[1]] == b"op"
+        assert string_table[span[2]] == b"res"
+
+
 def test_list_string_table():
     t = ListStringTable()
 
@@ -699,6 +736,43 @@ def test_custom_msgpack_encode_thread_safe(encoding):
     assert unpacked is not None
 
 
+@allencodings
+def test_custom_msgpack_encode_concurrent_flush(encoding):
+    # Traces put while a payload is being flushed must end up in either the
+    # flushed payload or the next one, but never be lost or duplicated.
+    encoder = MSGPACK_ENCODERS[encoding](2 << 20, 2 << 20)
+    trace = [Span(name="span", service="threads", resource="TEST") for _ in range(5)]
+    done = threading.Event()
+    payloads = []
+
+    def flusher():
+        while not done.is_set():
+            payload = encoder.encode()
+            if payload is not None:
+                payloads.append(payload)
+
+    def producer():
+        for _ in range(200):
+            encoder.put(trace)
+
+    flush_thread = threading.Thread(target=flusher)
+    flush_thread.start()
+    producers = [threading.Thread(target=producer) for _ in range(8)]
+    for t in producers:
+        t.start()
+    for t in producers:
+        t.join()
+    done.set()
+    flush_thread.join()
+
+    payload = encoder.encode()
+    if payload is not None:
+        payloads.append(payload)
+
+    assert sum(len(decode(p, reconstruct=True)) for p in payloads) == 8 * 200
+    assert len(encoder) == 0
+
+
 @pytest.mark.subprocess(parametrize={"encoder_cls": ["JSONEncoder", "JSONEncoderV2"]})
 def test_json_encoder_traces_bytes():
     """
@@ -130,3 +130,27 @@ def test_awakeable_periodic_service():
     awake_me.stop()
 
     assert queue == list(range(n + 2))
+
+
+def test_wakeable_periodic_service():
+    woken_up = Event()
+    calls = []
+
+    class WakeMe(periodic.WakeablePeriodicService):
+        def periodic(self):
+            calls.append(None)
+            woken_up.set()
+
+    wake_me = WakeMe(60)
+    # Waking up a service that is not running is a no-op
+    wake_me.wakeup()
+
+    wake_me.start()
+    wake_me.wakeup()
+    assert woken_up.wait(5)
+
+    # Stopping does not wait for the interval to elapse
+    wake_me.stop()
+    wake_me.join(5)
+    assert not wake_me._worker.is_alive()
+    assert len(calls) == 1
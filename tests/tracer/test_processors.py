@@ -1,3 +1,4 @@
+import threading
 from typing import Any
 
 import attr
@@ -161,6 +162,138 @@ def test_aggregator_multi_span():
     assert writer.pop() == [parent, child]
 
 
+def test_aggregator_threads():
+    writer = DummyWriter()
+    aggr = SpanAggregator(partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer)
+
+    def create_traces():
+        for _ in range(50):
+            parent = Span("parent", on_finish=[aggr.on_span_finish])
+            aggr.on_span_start(parent)
+            for _ in range(5):
+                child = Span("child", on_finish=[aggr.on_span_finish])
+                child.trace_id = parent.trace_id
+                child.parent_id = parent.span_id
+                aggr.on_span_start(child)
+                child.finish()
+            parent.finish()
+
+    threads = [threading.Thread(target=create_traces) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    traces = writer.pop_traces()
+    assert len(traces) == 400
+    assert all(len(trace) == 6 and len({s.trace_id for s in trace}) == 1 for trace in traces)
+    assert not any(shard.traces for shard in aggr._shards)
+
+
+def test_aggregator_processors_run_without_lock():
+    acquired = []
+
+    class LockCheckingProcessor(TraceProcessor):
+        def process_trace(self, trace):
+            # Another thread can take the lock of the shard of the trace
+            lock = aggr._shards[trace[0].trace_id % len(aggr._shards)].lock
+
+            def acquire():
+                acquired.append(lock.acquire(timeout=1))
+                lock.release()
+
+            t = threading.Thread(target=acquire)
+            t.start()
+            t.join()
+            return trace
+
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False,
+        partial_flush_min_spans=0,
+        trace_processors=[LockCheckingProcessor()],
+        writer=writer,
+    )
+    span = Span("span", on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(span)
+    span.finish()
+
+    assert acquired == [True]
+    assert writer.pop() == [span]
+
+
+def test_aggregator_max_spans():
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer, max_spans=32
+    )
+
+    # Leak the root span of many traces whose children have finished
+    leaked = []
+    with mock.patch("ddtrace.internal.processor.trace.telemetry_writer.add_count_metric") as mock_tm:
+        for _ in range(100):
+            root = Span("root", on_finish=[aggr.on_span_finish])
+            aggr.on_span_start(root)
+            child = Span("child", on_finish=[aggr.on_span_finish])
+            child.trace_id = root.trace_id
+            child.parent_id = root.span_id
+            aggr.on_span_start(child)
+            child.finish()
+            leaked.append(root)
+
+    # The limit is enforced per shard, so it can be exceeded by at most the share of each shard
+    assert sum(shard.num_spans for shard in aggr._shards) <= 2 * 32
+    assert sum(len(trace.spans) for shard in aggr._shards for trace in shard.traces.values()) == sum(
+        shard.num_spans for shard in aggr._shards
+    )
+
+    # The finished children of the evicted traces are flushed
+    traces = writer.pop_traces()
+    assert traces
+    for trace in traces:
+        assert [s.name for s in trace] == ["child"]
+        assert trace[0].get_metric("_dd.py.partial_flush") == 1
+    num_dropped = sum(c.args[2] for c in mock_tm.call_args_list if c.args[1] == "spans_dropped")
+    assert num_dropped == len(traces)
+
+    # The dropped spans are ignored when they finish
+    for root in leaked:
+        root.finish()
+    assert len(writer.pop_traces()) == 100 - len(traces)
+    assert not any(shard.traces for shard in aggr._shards)
+
+
+def test_aggregator_max_trace_age():
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False,
+        partial_flush_min_spans=0,
+        trace_processors=[],
+        writer=writer,
+        max_trace_age_ns=1000,
+    )
+
+    old = Span("old", start=0, on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(old)
+    recent = Span("recent", start=0.0000015, on_finish=[aggr.on_span_finish])
+    recent.trace_id = old.trace_id + len(aggr._shards)
+    aggr.on_span_start(recent)
+    assert writer.pop() == []
+
+    # Starting a span in the same shard evicts the traces that are too old
+    new = Span("new", start=0.000002, on_finish=[aggr.on_span_finish])
+    new.trace_id = old.trace_id + 2 * len(aggr._shards)
+    aggr.on_span_start(new)
+    shard = aggr._shards[old.trace_id % len(aggr._shards)]
+    assert list(shard.traces) == [recent.trace_id, new.trace_id]
+    assert shard.num_spans == 2
+
+    old.finish()
+    recent.finish()
+    new.finish()
+    assert writer.pop() == [recent, new]
+
+
 def test_aggregator_partial_flush_0_spans():
     writer = DummyWriter()
     aggr = SpanAggregator(partial_flush_enabled=True, partial_flush_min_spans=0, trace_processors=[], writer=writer)
@@ -245,6 +245,40 @@ def test_inject_tags_previous_error(tracer):
         assert _HTTP_HEADER_TAGS not in headers
 
 
+def test_inject_tags_cached(tracer):
+    """The encoded tags are reused by the spans of the trace until the propagated tags change"""
+    ctx = Context(trace_id=1234, sampling_priority=2, meta={"_dd.p.test": "value"})
+    tracer.context_provider.activate(ctx)
+    with tracer.trace("global_root_span") as root:
+        with tracer.trace("child_span") as child:
+            headers = {}
+            HTTPPropagator.inject(root.context, headers)
+            assert headers[_HTTP_HEADER_TAGS] == "_dd.p.test=value"
+
+            headers = {}
+            HTTPPropagator.inject(child.context, headers)
+            assert headers[_HTTP_HEADER_TAGS] == "_dd.p.test=value"
+            assert child.context._encoded_headers is root.context._encoded_headers
+
+            child.context._meta["_dd.p.test"] = "other"
+            headers = {}
+            HTTPPropagator.inject(child.context, headers)
+            assert headers[_HTTP_HEADER_TAGS] == "_dd.p.test=other"
+            assert "dd=s:2;t.test:other" in headers[_HTTP_HEADER_TRACESTATE]
+
+            child.context._meta["_dd.p.dm"] = "-4"
+            headers = {}
+            HTTPPropagator.inject(root.context, headers)
+            assert headers[_HTTP_HEADER_TAGS] == "_dd.p.test=other,_dd.p.dm=-4"
+            assert "t.dm:-4" in headers[_HTTP_HEADER_TRACESTATE]
+
+            with override_global_config(dict(_x_datadog_tags_max_length=10)):
+                headers = {}
+                HTTPPropagator.inject(root.context, headers)
+                assert _HTTP_HEADER_TAGS not in headers
+                assert root.context._meta["_dd.propagation_error"] == "inject_max_size"
+
+
 def test_extract(tracer):
     headers = {
         "x-datadog-trace-id": "1234",
@@ -487,6 +521,27 @@ def test_WSGI_extract(tracer):
         }
 
 
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"X-Datadog-Trace-Id": "1234", "X-DATADOG-PARENT-ID": "5678", "x-datadog-sampling-priority": "1"},
+        {"Http_X_Datadog_Trace_Id": "1234", "HTTP_X_DATADOG_PARENT_ID": "5678", "x-datadog-sampling-priority": "1"},
+        {
+            "wsgi.version": (1, 0),
+            "REQUEST_METHOD": "GET",
+            "HTTP_X_DATADOG_TRACE_ID": "1234",
+            "HTTP_X_DATADOG_PARENT_ID": "5678",
+            "HTTP_X_DATADOG_SAMPLING_PRIORITY": "1",
+        },
+    ],
+)
+def test_extract_header_names_case(headers):
+    context = HTTPPropagator.extract(headers)
+    assert context.trace_id == 1234
+    assert context.span_id == 5678
+    assert context.sampling_priority == 1
+
+
 def test_extract_invalid_tags(tracer):
     # Malformed tags do not fail to extract the rest of the context
     headers = {
@@ -20,6 +20,7 @@ from ddtrace.internal.compat import iteritems
 from ddtrace.internal.rate_limiter import RateLimiter
 from ddtrace.internal.sampling import SAMPLING_DECISION_TRACE_TAG_KEY
 from ddtrace.internal.sampling import SamplingMechanism
+from ddtrace.internal.sampling import SamplingRuleIndex
 from ddtrace.internal.sampling import set_sampling_decision_maker
 from ddtrace.sampler import DatadogSampler
 from ddtrace.sampler import RateByServiceSampler
@@ -1023,3 +1024,55 @@ def context():
 def test_trace_tag(context, sampling_mechanism, expected):
     set_sampling_decision_maker(context, sampling_mechanism)
     assert context._meta["_dd.p.dm"] == expected
+
+
+def test_sampling_rule_index():
+    rules = [
+        SamplingRule(sample_rate=0.1, service="web", name="web.request", tags={"env": "prod*"}),
+        SamplingRule(sample_rate=0.2, service=re.compile("^db"), name="query"),
+        SamplingRule(sample_rate=0.3, service="web"),
+        SamplingRule(sample_rate=0.4, name=lambda name: name.startswith("db")),
+        SamplingRule(sample_rate=0.5, service="db", resource="SELECT 1"),
+        SamplingRule(sample_rate=0.6),
+    ]
+    index = SamplingRuleIndex(rules)
+
+    def match(**kwargs):
+        tags = kwargs.pop("tags", {})
+        span = Span(**kwargs)
+        span.set_tags(tags)
+        return index.match(span)
+
+    # The first matching rule wins, whether the rules are indexed or not
+    for _ in range(2):
+        assert match(service="web", name="web.request", tags={"env": "production"}) is rules[0]
+        assert match(service="web", name="web.request", tags={"env": "staging"}) is rules[2]
+        assert match(service="web", name="web.request") is rules[2]
+        assert match(service="dbm", name="query") is rules[1]
+        assert match(service="db", name="query", resource="SELECT 1") is rules[1]
+        assert match(service="db", name="db.query", resource="SELECT 1") is rules[3]
+        assert match(service="db", name="other", resource="SELECT 1") is rules[4]
+        assert match(service="db", name="other", resource="SELECT 2") is rules[5]
+        assert match(service=None, name=None) is rules[5]
+
+    assert SamplingRuleIndex([]).match(Span("test")) is None
+
+
+def test_sampling_rule_index_subclass():
+    class NeverMatchingRule(SamplingRule):
+        def matches(self, span):
+            return False
+
+    rules = [NeverMatchingRule(sample_rate=0.1, service="web"), SamplingRule(sample_rate=0.2)]
+    assert SamplingRuleIndex(rules).match(Span("test", service="web")) is rules[1]
+
+
+def test_datadog_sampler_rules_updated():
+    sampler = DatadogSampler(rules=[SamplingRule(sample_rate=0.5, service="web")])
+    span = Span("test", service="web")
+    assert sampler._rule_index.match(span) is sampler.rules[0]
+
+    # Rules added after the sampler was created are taken into account
+    sampler.rules.insert(0, SamplingRule(sample_rate=0.0, service="web"))
+    sampler.sample(span)
+    assert span.get_metric(SAMPLING_RULE_DECISION) == 0.0
@@ -17,6 +17,8 @@ from ddtrace.constants import SERVICE_VERSION_KEY
 from ddtrace.constants import SPAN_MEASURED_KEY
 from ddtrace.constants import VERSION_KEY
 from ddtrace.ext import SpanTypes
+from ddtrace.ext import http
+from ddtrace.internal import _tagging
 from ddtrace.span import Span
 from ddtrace.tracing._span_link import SpanLink
 from tests.subprocesstest import run_in_subprocess
@@ -481,6 +483,74 @@ def test_span_encoding_set_str_tag(span_log):
     assert span.get_tag("foo") == u"/?foo=bar&baz=����ó��"
 
 
+def test_span_lazy_tags_and_metrics():
+    span = Span("test.span")
+    assert span._meta_dict is None
+    assert span._metrics_dict is None
+    assert span._links is None
+
+    # Reading tags and metrics does not allocate them
+    assert span.get_tag("foo") is None
+    assert span.get_metric("bar") is None
+    assert span.get_tags() == {}
+    assert span.get_metrics() == {}
+    span._remove_tag("foo")
+    assert span._meta_dict is None
+    assert span._metrics_dict is None
+
+    span.set_tag("foo", "bar")
+    assert span._meta_dict == {"foo": "bar"}
+    assert span._metrics_dict is None
+
+    # Overriding a tag with a metric moves it over
+    span.set_tag("foo", 1)
+    assert span._meta_dict == {}
+    assert span._metrics_dict == {"foo": 1}
+
+
+@pytest.mark.parametrize(
+    "key,value,kind",
+    [
+        ("component", "redis", _tagging.TAG_KIND_META),
+        ("db.row_count", 42, _tagging.TAG_KIND_METRIC),
+        ("db.row_count", -42.5, _tagging.TAG_KIND_METRIC),
+        ("big", 2 ** 53 + 1, _tagging.TAG_KIND_SPECIAL),
+        ("flag", True, _tagging.TAG_KIND_SPECIAL),
+        ("none", None, _tagging.TAG_KIND_SPECIAL),
+        ("obj", object(), _tagging.TAG_KIND_SPECIAL),
+        (b"bytes", "value", _tagging.TAG_KIND_SPECIAL),
+        (http.STATUS_CODE, 200, _tagging.TAG_KIND_SPECIAL),
+        (SPAN_MEASURED_KEY, "1", _tagging.TAG_KIND_SPECIAL),
+        (SERVICE_VERSION_KEY, "1.0", _tagging.TAG_KIND_SPECIAL),
+    ],
+)
+def test_span_tag_kind(key, value, kind):
+    assert _tagging.tag_kind(key, value) == kind
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(1, True), (1.5, True), (float("nan"), False), (float("inf"), False), (True, False), ("1", False)],
+)
+def test_span_is_real_number(value, expected):
+    assert _tagging.is_real_number(value) is expected
+
+
+def test_span_set_tag_fast_path():
+    span = Span("test.span")
+    span.set_tag("foo", 1)
+    span.set_tag("foo", "bar")
+    assert span.get_tag("foo") == "bar"
+    assert span.get_metric("foo") is None
+
+    span.set_tag("foo", 1.5)
+    assert span.get_tag("foo") is None
+    assert span.get_metric("foo") == 1.5
+
+    span.set_tag("foo", float("nan"))
+    assert span.get_metric("foo") == 1.5
+
+
 def test_span_nonstring_set_str_tag_exc():
     span = Span(None)
     with pytest.raises(TypeError):
@@ -0,0 +1,47 @@
+import pytest
+
+from ddtrace.internal.sql import obfuscate_sql
+
+
+@pytest.mark.parametrize(
+    "query,expected",
+    [
+        ("SELECT * FROM users", "SELECT * FROM users"),
+        ("SELECT * FROM users WHERE id = 42", "SELECT * FROM users WHERE id = ?"),
+        ("SELECT * FROM users WHERE name = 'O''Brien'", "SELECT * FROM users WHERE name = ?"),
+        ("SELECT * FROM t1 WHERE price > 1.5e3 OR mask = 0xFF", "SELECT * FROM t1 WHERE price > ? OR mask = ?"),
+        ("SELECT * FROM users WHERE id IN (1, 2, 3)", "SELECT * FROM users WHERE id IN ( ? )"),
+        ("INSERT INTO users (id, name) VALUES (1, 'a'), (2, 'b')", "INSERT INTO users (id, name) VALUES ( ? )"),
+        ("SELECT $$1 'a'$$, $tag$b$tag$", "SELECT ?, ?"),
+        ('SELECT "col1", `col2` FROM "t 1"', 'SELECT "col1", `col2` FROM "t 1"'),
+        ("SELECT a -- the answer is 42\nFROM b /* 'c' */ WHERE d = 1", "SELECT a FROM b WHERE d = ?"),
+        (
+            "SELECT * FROM users WHERE id = %s AND name = %(name)s",
+            "SELECT * FROM users WHERE id = %s AND name = %(name)s",
+        ),
+        ("SELECT * FROM users WHERE id = $1 AND name = :name", "SELECT * FROM users WHERE id = $1 AND name = :name"),
+        ("SELECT   *\n\tFROM users  ", "SELECT * FROM users"),
+        (
+            "SELECT * FROM users WHERE name = 'it\\'s' AND password = 'hunter2'",
+            "SELECT * FROM users WHERE name = ? AND password = ?",
+        ),
+        ("SELECT * FROM users WHERE name = E'\\\\' AND id = 1", "SELECT * FROM users WHERE name = E? AND id = ?"),
+        # Nothing is kept from the queries with a literal that is not closed
+        ("SELECT * FROM users WHERE password = 'hunter2", "?"),
+        ("SELECT * FROM users WHERE name = 'it\\' AND password = 'hunter2'", "?"),
+        ("SELECT $$hunter2", "?"),
+        ("SELECT * FROM users /* password = 'hunter2'", "?"),
+    ],
+)
+def test_obfuscate_sql(query, expected):
+    obfuscated, query_hash = obfuscate_sql(query)
+    assert obfuscated == expected
+    assert len(query_hash) == 16
+
+
+def test_obfuscate_sql_hash():
+    _, h1 = obfuscate_sql("SELECT * FROM users WHERE id = 1")
+    _, h2 = obfuscate_sql("SELECT * FROM users WHERE id = 2")
+    _, h3 = obfuscate_sql("SELECT * FROM orders WHERE id = 1")
+    assert h1 == h2
+    assert h1 != h3
@@ -0,0 +1,76 @@
+import random
+import threading
+
+from ddsketch import LogCollapsingLowestDenseDDSketch
+from ddsketch.pb.ddsketch_pb2 import DDSketch as DDSketchPb
+from ddsketch.pb.proto import DDSketchProto
+import pytest
+
+from ddtrace.internal._sketch import SketchAccumulator
+from ddtrace.internal.processor.stats import SpanStatsProcessorV06
+from ddtrace.span import Span
+
+
+def test_sketch_accumulator():
+    values = [random.randint(0, 10 ** 10) for _ in range(1000)] + [0, 1, 2, 10 ** 15, -1.5]
+    accumulator = SketchAccumulator(0.00775)
+    expected = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
+    for value in values:
+        accumulator.add(value)
+        expected.add(value)
+    assert len(accumulator) == len(values)
+
+    sketch = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
+    accumulator.flush_into(sketch)
+    assert len(accumulator) == 0
+    assert sketch.count == expected.count
+    # The values land in the same bins as if they were added to the sketch directly
+    assert DDSketchProto.to_proto(sketch).SerializeToString() == DDSketchProto.to_proto(expected).SerializeToString()
+
+    # Flushing an empty accumulator leaves the sketch unchanged
+    accumulator.flush_into(sketch)
+    assert sketch.count == expected.count
+
+
+@pytest.mark.parametrize("relative_accuracy", [0, 1, -0.5])
+def test_sketch_accumulator_bad_relative_accuracy(relative_accuracy):
+    with pytest.raises(ValueError):
+        SketchAccumulator(relative_accuracy)
+
+
+def test_span_stats_processor_shards():
+    processor = SpanStatsProcessorV06("http://localhost:8126", interval=60.0)
+    try:
+
+        def finish_spans(error):
+            for _ in range(100):
+                span = Span("web.request", service="web", resource="GET /")
+                span._local_root = span
+                span.error = error
+                span.start_ns = 0
+                span.duration_ns = 1000
+                processor.on_span_finish(span)
+
+        threads = [threading.Thread(target=finish_spans, args=(i % 2,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # The stats of the same aggregation key finished in different threads are merged
+        buckets = processor._serialize_buckets()
+        assert len(buckets) == 1
+        (stats,) = buckets[0]["Stats"]
+        assert stats["Hits"] == 800
+        assert stats["TopLevelHits"] == 800
+        assert stats["Errors"] == 400
+        assert stats["Duration"] == 800000
+        for summary in ("OkSummary", "ErrorSummary"):
+            sketch = DDSketchProto.from_proto(DDSketchPb.FromString(stats[summary]))
+            assert sketch.count == 400
+
+        # Serialized stats are removed from the shards
+        assert processor._serialize_buckets() == []
+    finally:
+        processor.stop()
+        processor.join()
@@ -27,6 +27,7 @@ from ddtrace.constants import MANUAL_KEEP_KEY
 from ddtrace.constants import ORIGIN_KEY
 from ddtrace.constants import PID
 from ddtrace.constants import SAMPLING_PRIORITY_KEY
+from ddtrace.constants import SPAN_MEASURED_KEY
 from ddtrace.constants import USER_KEEP
 from ddtrace.constants import USER_REJECT
 from ddtrace.constants import VERSION_KEY
@@ -35,15 +36,18 @@ from ddtrace.contrib.trace_utils import set_user
 from ddtrace.ext import user
 from ddtrace.internal import telemetry
 from ddtrace.internal._encoding import MsgpackEncoderV03
+from ddtrace.internal.processor import SpanProcessor
 from ddtrace.internal.serverless import has_aws_lambda_agent_extension
 from ddtrace.internal.serverless import in_aws_lambda
 from ddtrace.internal.writer import AgentWriter
 from ddtrace.internal.writer import LogWriter
 from ddtrace.settings import Config
+from ddtrace.span import Span
 from ddtrace.span import _is_top_level
 from ddtrace.tracer import Tracer
 from tests.appsec.appsec.test_processor import tracer_appsec
 from tests.subprocesstest import run_in_subprocess
+from tests.utils import DummyWriter
 from tests.utils import TracerTestCase
 from tests.utils import override_global_config
 
@@ -874,6 +878,88 @@ def test_tracer_with_env():
             assert span.get_tag(ENV_KEY) == "config.env"
 
 
+def test_tracer_span_template():
+    t = ddtrace.Tracer()
+    t.configure(writer=DummyWriter())
+    t.set_tags({"str": "tag", "int": 42, SPAN_MEASURED_KEY: True})
+
+    with t.trace("root") as root:
+        with t.trace("child") as child:
+            pass
+    for span in (root, child):
+        assert span.get_tag("str") == "tag"
+        assert span.get_metric("int") == 42
+        assert span.get_metric(SPAN_MEASURED_KEY) == 1
+        assert span.get_tag(ENV_KEY) is None
+
+    # The template follows changes to the global configuration
+    template = t._span_template
+    with override_global_config(dict(env="prod")):
+        with t.trace("root") as root:
+            assert root.get_tag(ENV_KEY) == "prod"
+            assert root.get_tag("str") == "tag"
+        assert t._span_template is not template
+
+    # ... and to the span processors
+    processor = mock.Mock(spec=SpanProcessor)
+    t._span_processors.append(processor)
+    with t.trace("root") as root:
+        pass
+    processor.on_span_start.assert_called_once_with(root)
+    processor.on_span_finish.assert_called_once_with(root)
+
+    template = t._span_template
+    with t.trace("root"):
+        pass
+    assert t._span_template is template
+
+
+def test_tracer_span_template_swapped_processors():
+    t = ddtrace.Tracer()
+    t.configure(writer=DummyWriter())
+    a = mock.Mock(spec=SpanProcessor)
+    b = mock.Mock(spec=SpanProcessor)
+
+    SpanProcessor.register(a)
+    try:
+        with t.trace("root"):
+            pass
+    finally:
+        SpanProcessor.unregister(a)
+    # Same number of processors, but not the same ones
+    SpanProcessor.register(b)
+    try:
+        with t.trace("root"):
+            pass
+    finally:
+        SpanProcessor.unregister(b)
+
+    assert a.on_span_start.call_count == 1
+    assert a.on_span_finish.call_count == 1
+    assert b.on_span_start.call_count == 1
+    assert b.on_span_finish.call_count == 1
+
+
+def test_tracer_span_template_replaces_metrics():
+    t = ddtrace.Tracer()
+    t.configure(writer=DummyWriter())
+    t.set_tags({"key": "tag"})
+
+    span_init = Span.__init__
+
+    def __init__(self, *args, **kwargs):
+        span_init(self, *args, **kwargs)
+        self.set_metric("key", 42)
+
+    with mock.patch.object(Span, "__init__", __init__):
+        with t.trace("root") as root:
+            pass
+
+    # Like with Span.set_tag, the tag replaces the metric
+    assert root.get_tag("key") == "tag"
+    assert root.get_metric("key") is None
+
+
 class EnvTracerTestCase(TracerTestCase):
     """Tracer test cases requiring environment variables."""
 
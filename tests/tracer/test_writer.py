@@ -1,4 +1,5 @@
 import contextlib
+import gzip
 import os
 import socket
 import sys
@@ -26,6 +27,7 @@ from ddtrace.internal.writer import AgentWriter
 from ddtrace.internal.writer import LogWriter
 from ddtrace.internal.writer import Response
 from ddtrace.internal.writer import _human_size
+from ddtrace.internal.writer.compression import PayloadCompressor
 from ddtrace.span import Span
 from tests.utils import AnyInt
 from tests.utils import BaseTestCase
@@ -645,6 +647,293 @@ def test_racing_start(writer_class):
     assert len(writer._encoder) == 100
 
 
+@pytest.mark.parametrize("writer_class", (AgentWriter,))
+def test_writer_pipelined_send(writer_class):
+    statsd = mock.Mock()
+    sending = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    with override_global_config(dict(health_metrics_enabled=True)):
+        writer = writer_class("http://dne:1234", dogstatsd=statsd, max_inflight_payloads=1)
+
+        def send_payload(payload, count, client, content_encoding=None):
+            sending.set()
+            release.wait()
+            sent.append(count)
+            return Response(status=200)
+
+        writer._send_payload_with_backoff = send_payload
+
+        # The first payload is picked up by the sender thread, which blocks
+        writer.write([Span(name="name", trace_id=1, span_id=1, parent_id=None)])
+        writer.flush_queue()
+        assert sending.wait(5)
+
+        # The second payload waits in the queue while the third one does not
+        # fit and is dropped, without blocking the flush.
+        writer.write([Span(name="name", trace_id=2, span_id=1, parent_id=None)])
+        writer.flush_queue()
+        writer.write([Span(name="name", trace_id=3, span_id=1, parent_id=None)])
+        writer._encoder.put([Span(name="name", trace_id=4, span_id=1, parent_id=None)])
+        writer.flush_queue()
+        statsd.distribution.assert_has_calls(
+            [
+                mock.call("datadog.%s.http.inflight.payloads" % writer.STATSD_NAMESPACE, 2),
+                mock.call("datadog.%s.http.dropped.traces" % writer.STATSD_NAMESPACE, 2, tags=["reason:queue_full"]),
+            ],
+            any_order=True,
+        )
+
+        release.set()
+        writer.stop()
+        writer.join()
+
+    assert sent == [1, 1]
+    statsd.distribution.assert_has_calls(
+        [mock.call("datadog.%s.http.queue.wait_time" % writer.STATSD_NAMESPACE, mock.ANY)], any_order=True
+    )
+
+
+@pytest.mark.parametrize("writer_class", (AgentWriter,))
+def test_writer_pipelined_send_reports_sender_metrics(writer_class):
+    statsd = mock.Mock()
+    with override_global_config(dict(health_metrics_enabled=True)):
+        writer = writer_class("http://localhost:1", dogstatsd=statsd, max_inflight_payloads=2)
+        writer._send_payload_with_backoff = mock.Mock(side_effect=IOError)
+        for i in range(3):
+            writer.write([Span(name="name", trace_id=i, span_id=1, parent_id=None)])
+            writer.flush_queue()
+            writer._payload_queue.join()
+        writer.stop()
+        writer.join()
+
+    # The errors recorded by the sender thread are reported even though the
+    # periodic thread had nothing to send in the meantime.
+    errors = [
+        c
+        for c in statsd.distribution.call_args_list
+        if c == mock.call("datadog.%s.http.errors" % writer.STATSD_NAMESPACE, 1, tags=["type:err"])
+    ]
+    assert len(errors) == 3
+
+
+@pytest.mark.parametrize("writer_class", (AgentWriter,))
+def test_writer_pipelined_send_raise_exc(writer_class):
+    writer = writer_class("http://localhost:1", max_inflight_payloads=1)
+    writer._send_payload_with_backoff = mock.Mock(side_effect=IOError)
+    try:
+        writer.write([Span(name="name", trace_id=1, span_id=1, parent_id=None)])
+        assert writer._sender is not None
+
+        # The payload is sent from the calling thread so that the error can
+        # be raised to the caller.
+        with pytest.raises(IOError):
+            writer.flush_queue(raise_exc=True)
+        assert writer._payload_queue.unfinished_tasks == 0
+    finally:
+        writer.stop()
+        writer.join()
+
+
+def test_writer_pipelined_send_disabled_in_sync_mode():
+    writer = AgentWriter("http://dne:1234", sync_mode=True, max_inflight_payloads=1)
+    assert writer._payload_queue is None
+
+
+def test_writer_payload_compression():
+    statsd = mock.Mock()
+    with override_global_config(
+        dict(health_metrics_enabled=True, _trace_writer_compression="gzip", _trace_writer_compression_min_size=0)
+    ):
+        writer = AgentWriter("http://dne:1234", dogstatsd=statsd)
+        with mock.patch.object(writer, "_put", return_value=Response(status=200)) as put:
+            writer._encoder.put([Span("foobar")])
+            writer.flush_queue(raise_exc=True)
+
+    payload, headers = put.call_args[0][:2]
+    assert headers["Content-Encoding"] == "gzip"
+    assert msgpack.unpackb(gzip.decompress(payload))[0][0]["name"] == "foobar"
+    statsd.distribution.assert_has_calls(
+        [
+            mock.call(
+                "datadog.%s.http.sent.bytes.compression_ratio" % writer.STATSD_NAMESPACE,
+                mock.ANY,
+                tags=["compression:gzip"],
+            ),
+            mock.call(
+                "datadog.%s.http.sent.bytes.compression_time" % writer.STATSD_NAMESPACE,
+                mock.ANY,
+                tags=["compression:gzip"],
+            ),
+        ],
+        any_order=True,
+    )
+
+
+def test_writer_payload_compression_min_size():
+    with override_global_config(dict(_trace_writer_compression="gzip", _trace_writer_compression_min_size=1 << 20)):
+        writer = AgentWriter("http://dne:1234")
+        with mock.patch.object(writer, "_put", return_value=Response(status=200)) as put:
+            writer._encoder.put([Span("foobar")])
+            writer.flush_queue(raise_exc=True)
+
+    payload, headers = put.call_args[0][:2]
+    assert "Content-Encoding" not in headers
+    assert msgpack.unpackb(payload)[0][0]["name"] == "foobar"
+
+
+def test_writer_payload_compression_unsupported():
+    with override_global_config(dict(_trace_writer_compression="gzip", _trace_writer_compression_min_size=0)):
+        writer = AgentWriter("http://dne:1234")
+        with mock.patch.object(
+            writer, "_put", side_effect=[Response(status=415), Response(status=200), Response(status=200)]
+        ) as put:
+            writer._encoder.put([Span("foobar")])
+            writer.flush_queue(raise_exc=True)
+            writer._encoder.put([Span("foobar")])
+            writer.flush_queue(raise_exc=True)
+
+    # The rejected payload is sent again uncompressed and compression stays disabled
+    assert writer._compressor is None
+    assert [call[0][1].get("Content-Encoding") for call in put.call_args_list] == ["gzip", None, None]
+    assert msgpack.unpackb(put.call_args_list[1][0][0])[0][0]["name"] == "foobar"
+
+
+def test_writer_payload_compression_unsupported_endpoint():
+    with override_global_config(dict(_trace_writer_compression="gzip", _trace_writer_compression_min_size=0)):
+        writer = AgentWriter("http://dne:1234", api_version="v0.4")
+        with mock.patch.object(
+            writer, "_put", side_effect=[Response(status=415), Response(status=415), Response(status=200)]
+        ) as put:
+            writer._encoder.put([Span("foobar")])
+            writer.flush_queue(raise_exc=True)
+
+    # The uncompressed payload is rejected as well, so the endpoint is
+    # downgraded once and compression stays enabled.
+    assert writer._compressor is not None
+    assert [client.ENDPOINT for client in writer._clients] == ["v0.3/traces"]
+    assert [call[0][1].get("Content-Encoding") for call in put.call_args_list] == ["gzip", None, "gzip"]
+
+
+def test_payload_compressor_is_abstract():
+    with pytest.raises(TypeError):
+        PayloadCompressor()
+
+
+def test_writer_spill_and_drain(tmpdir):
+    statsd = mock.Mock()
+    with override_global_config(
+        dict(_trace_writer_spill_dir=str(tmpdir), _trace_writer_spill_drain_payloads=1, health_metrics_enabled=True)
+    ):
+        writer = AgentWriter("http://dne:1234", dogstatsd=statsd)
+
+        with mock.patch.object(writer, "_put", side_effect=OSError("agent unavailable")):
+            for i in range(2):
+                writer._encoder.put([Span("foobar-%d" % i)])
+                writer.flush_queue()
+
+        # Payloads that could not be sent are spilled instead of dropped
+        assert len(writer._spill_queue) == 2
+        statsd.distribution.assert_has_calls(
+            [mock.call("datadog.%s.http.spilled.traces" % writer.STATSD_NAMESPACE, 1, tags=[])], any_order=True
+        )
+        dropped = mock.call("datadog.%s.http.dropped.traces" % writer.STATSD_NAMESPACE, 1, tags=[])
+        assert dropped not in statsd.distribution.call_args_list
+
+        # Spilled payloads are drained at the configured rate once the agent is back
+        with mock.patch.object(writer, "_put", return_value=Response(status=200)) as put:
+            writer.flush_queue()
+            assert len(writer._spill_queue) == 1
+            writer.flush_queue()
+            assert len(writer._spill_queue) == 0
+
+    assert [msgpack.unpackb(call[0][0])[0][0]["name"] for call in put.call_args_list] == ["foobar-0", "foobar-1"]
+    statsd.distribution.assert_has_calls(
+        [mock.call("datadog.%s.http.spill.drained.traces" % writer.STATSD_NAMESPACE, 1)], any_order=True
+    )
+    writer.on_shutdown()
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_writer_spill_dropped_on_shutdown(tmpdir):
+    statsd = mock.Mock()
+    with override_global_config(dict(_trace_writer_spill_dir=str(tmpdir), health_metrics_enabled=True)):
+        writer = AgentWriter("http://dne:1234", dogstatsd=statsd)
+        with mock.patch.object(writer, "_put", side_effect=OSError("agent unavailable")):
+            writer._encoder.put([Span("foobar")])
+            writer.on_shutdown()
+
+    # The spill queue does not outlive the process
+    assert os.listdir(str(tmpdir)) == []
+    statsd.distribution.assert_has_calls(
+        [mock.call("datadog.%s.http.dropped.traces" % writer.STATSD_NAMESPACE, 1, tags=["reason:shutdown"])],
+        any_order=True,
+    )
+
+
+def test_writer_spill_drain_pipelined(tmpdir):
+    with override_global_config(dict(_trace_writer_spill_dir=str(tmpdir))):
+        writer = AgentWriter("http://dne:1234", max_inflight_payloads=2)
+        try:
+            with mock.patch.object(writer, "_put", side_effect=OSError("agent unavailable")):
+                writer.write([Span("foobar")])
+                writer.flush_queue()
+                writer._payload_queue.join()
+            assert len(writer._spill_queue) == 1
+
+            # The spilled payloads are sent by the sender thread
+            threads = []
+
+            def put(*args, **kwargs):
+                threads.append(threading.current_thread())
+                return Response(status=200)
+
+            with mock.patch.object(writer, "_put", side_effect=put):
+                writer.flush_queue()
+                writer._payload_queue.join()
+            assert len(writer._spill_queue) == 0
+            assert threads == [writer._sender]
+        finally:
+            writer.stop()
+            writer.join()
+
+
+def test_writer_adaptive_interval():
+    statsd = mock.Mock()
+    with override_global_config(dict(_trace_writer_max_interval_seconds=4.0, health_metrics_enabled=True)):
+        writer = AgentWriter("http://dne:1234", dogstatsd=statsd, processing_interval=1.0, adaptive_interval=True)
+
+        # The interval backs off while there is nothing to flush
+        for expected in (2.0, 4.0, 4.0):
+            writer.periodic()
+            assert writer.interval == expected
+        statsd.distribution.assert_has_calls(
+            [mock.call("datadog.%s.writer.interval" % writer.STATSD_NAMESPACE, 4.0)], any_order=True
+        )
+
+        # and goes back to the configured one as soon as traces are flushed
+        with mock.patch.object(writer, "_put", return_value=Response(status=200)):
+            writer._encoder.put([Span("foobar")])
+            writer.periodic()
+        assert writer.interval == 1.0
+    assert writer.recreate().interval == 1.0
+
+
+def test_writer_adaptive_interval_flush_watermark():
+    with override_global_config(dict(_trace_writer_flush_watermark=0.5)):
+        writer = AgentWriter("http://dne:1234", buffer_size=1 << 12, adaptive_interval=True)
+
+    with mock.patch.object(writer, "start"), mock.patch.object(writer, "wakeup") as wakeup:
+        writer.write([Span("foobar")])
+        wakeup.assert_not_called()
+
+        # Crossing the watermark flushes the buffer without waiting for the next interval
+        while writer._encoder.size < writer._encoder.max_size / 2:
+            writer.write([Span("foobar")])
+        wakeup.assert_called_once_with()
+
+
 @pytest.mark.subprocess(
     env={"_DD_TRACE_WRITER_ADDITIONAL_HEADERS": "additional-header:additional-value,header2:value2"}
 )
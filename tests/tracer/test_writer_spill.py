@@ -0,0 +1,98 @@
+import os
+
+from ddtrace.internal.writer.spill import PayloadSpillQueue
+
+
+def test_spill_queue_fifo(tmpdir):
+    spill_queue = PayloadSpillQueue(str(tmpdir), max_size=1 << 20)
+    assert spill_queue.peek() is None
+
+    for i in range(10):
+        assert spill_queue.put("v0.4/traces", b"payload-%d" % i, i)
+    assert len(spill_queue) == 10
+
+    for i in range(10):
+        assert spill_queue.peek() == ("v0.4/traces", b"payload-%d" % i, i)
+        # Peeking does not consume the payload
+        assert spill_queue.peek() == ("v0.4/traces", b"payload-%d" % i, i)
+        spill_queue.consume()
+
+    assert len(spill_queue) == 0
+    assert spill_queue.size == 0
+    assert spill_queue.peek() is None
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_spill_queue_put_while_reading(tmpdir):
+    spill_queue = PayloadSpillQueue(str(tmpdir), max_size=1 << 20)
+    spill_queue.put("v0.4/traces", b"first", 1)
+    assert spill_queue.peek() == ("v0.4/traces", b"first", 1)
+
+    # Payloads put after a segment was opened for reading go to a new segment
+    spill_queue.put("v0.4/traces", b"second", 2)
+    spill_queue.consume()
+    assert spill_queue.peek() == ("v0.4/traces", b"second", 2)
+    spill_queue.consume()
+    assert spill_queue.peek() is None
+
+
+def test_spill_queue_segments(tmpdir):
+    payload = b"x" * 100
+    spill_queue = PayloadSpillQueue(str(tmpdir), max_size=1 << 20, segment_size=256)
+    for _ in range(10):
+        spill_queue.put("v0.4/traces", payload, 1)
+
+    assert len(os.listdir(str(tmpdir))) == 5
+
+    for _ in range(5):
+        spill_queue.peek()
+        spill_queue.consume()
+    assert len(os.listdir(str(tmpdir))) < 5
+
+    spill_queue.close()
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_spill_queue_max_size(tmpdir):
+    spill_queue = PayloadSpillQueue(str(tmpdir), max_size=256)
+    assert spill_queue.put("v0.4/traces", b"x" * 100, 1)
+    assert spill_queue.put("v0.4/traces", b"x" * 100, 1)
+    assert not spill_queue.put("v0.4/traces", b"x" * 100, 1)
+    assert len(spill_queue) == 2
+
+
+def test_spill_queue_fork(tmpdir):
+    spill_queue = PayloadSpillQueue(str(tmpdir), max_size=1 << 20)
+    spill_queue.put("v0.4/traces", b"parent", 1)
+
+    pid = os.fork()
+    if pid == 0:
+        # The child does not see nor touch the payloads of the parent
+        try:
+            assert len(spill_queue) == 0
+            assert spill_queue.peek() is None
+            assert spill_queue.put("v0.4/traces", b"child", 1)
+            spill_queue.close()
+        except AssertionError:
+            os._exit(1)
+        os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert spill_queue.peek() == ("v0.4/traces", b"parent", 1)
+
+
+def test_spill_queue_close(tmpdir):
+    spill_queue = PayloadSpillQueue(str(tmpdir), max_size=1 << 20, segment_size=256)
+    for i in range(4):
+        spill_queue.put("v0.4/traces", b"x" * 100, i)
+    spill_queue.peek()
+    spill_queue.consume()
+    assert len(spill_queue) == 3
+    assert spill_queue.traces == 6
+    size = spill_queue.size
+
+    # Closing the queue reports what it discards
+    assert spill_queue.close() == (size, 6)
+    assert spill_queue.traces == 0
+    assert os.listdir(str(tmpdir)) == []
@@ -137,8 +137,22 @@ def override_global_config(values):
         "_trace_writer_buffer_size",
         "_trace_writer_payload_size",
         "_trace_writer_interval_seconds",
+        "_trace_writer_adaptive_interval",
+        "_trace_writer_max_interval_seconds",
+        "_trace_writer_flush_watermark",
         "_trace_writer_connection_reuse",
         "_trace_writer_log_err_payload",
+        "_trace_writer_max_inflight_payloads",
+        "_trace_writer_compression",
+        "_trace_writer_compression_min_size",
+        "_trace_writer_spill_dir",
+        "_trace_writer_spill_max_size",
+        "_trace_writer_spill_drain_payloads",
+        "_trace_writer_interned_strings",
+        "_span_aggregator_max_spans",
+        "_span_aggregator_max_trace_age",
+        "_sql_obfuscation_enabled",
+        "_data_streams_high_throughput_enabled",
     ]
 
     # Grab the current values of all keys